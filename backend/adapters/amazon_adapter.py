@@ -4,6 +4,8 @@ from typing import Dict, Any, Optional
 import httpx
 from backend.utils.price import to_decimal, normalize_currency
 from backend.utils.error import ExternalAPIError
+from backend.utils.hedging import hedged
+from backend.utils.limiter import source_limited, parse_retry_after
 
 AMAZON_BASE_URL = "https://real-time-amazon-data.p.rapidapi.com/search"
 AMAZON_API_KEY = os.getenv("AMAZON_API_KEY")
@@ -11,6 +13,8 @@ AMAZON_API_HOST = "real-time-amazon-data.p.rapidapi.com"
 
 
 
+@hedged("amazon")
+@source_limited("amazon")
 async def search_amazon(query: str, limit: int = 120) -> Dict[str, Any]:
     """
     Execute a search query on Amazon via RapidAPI.
@@ -43,7 +47,11 @@ async def search_amazon(query: str, limit: int = 120) -> Dict[str, Any]:
     except httpx.HTTPStatusError as e:
         # Amazon side error
         logging.error(f"[Amazon] HTTP error: {e.response.status_code} {e.response.text}")
-        raise ExternalAPIError(f"Amazon HTTP error: {e.response.status_code}") from e
+        raise ExternalAPIError(
+            f"Amazon HTTP error: {e.response.status_code}",
+            status_code=e.response.status_code,
+            retry_after=parse_retry_after(e.response.headers.get("Retry-After")),
+        ) from e
     except Exception as e:
         # Genereal log error
         logging.error(f"[Amazon] request failed: {e}")
@@ -5,10 +5,14 @@ import httpx
 
 from backend.utils.price import to_decimal, normalize_currency
 from backend.utils.error import ExternalAPIError
+from backend.utils.hedging import hedged
+from backend.utils.limiter import source_limited, parse_retry_after
 
 # DummyJSON base URL for product search
 DUMMYJSON_BASE_URL = "https://dummyjson.com/products/search"
 
+@hedged("dummyjson")
+@source_limited("dummyjson")
 async def search_dummyjson(query: str, limit: int = 120) -> Dict[str, Any]:
     """
     Execute a search query on DummyJSON.
@@ -25,7 +29,11 @@ async def search_dummyjson(query: str, limit: int = 120) -> Dict[str, Any]:
             data = resp.json()
     except httpx.HTTPStatusError as e:
         logging.error(f"[DummyJSON] HTTP error: {e.response.status_code} {e.response.text}")
-        raise ExternalAPIError(f"DummyJSON HTTP error: {e.response.status_code}") from e
+        raise ExternalAPIError(
+            f"DummyJSON HTTP error: {e.response.status_code}",
+            status_code=e.response.status_code,
+            retry_after=parse_retry_after(e.response.headers.get("Retry-After")),
+        ) from e
     except Exception as e:
         logging.error(f"[DummyJSON] request failed: {e}")
         raise ExternalAPIError("DummyJSON request failed") from e
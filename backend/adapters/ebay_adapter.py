@@ -1,5 +1,4 @@
 # backend/adapters/ebay_adapter.py
-import time
 import logging
 from typing import Optional
 
@@ -8,6 +7,9 @@ import httpx
 from backend.services.ebay_auth import get_ebay_token
 from backend.utils.price import to_decimal, normalize_currency
 from backend.utils.error import ExternalAPIError, ValidationError
+from backend.utils.hedging import hedged
+from backend.utils.limiter import source_limited, parse_retry_after
+from backend.utils.shared_cache import Cache
 
 # Ebay base api GET request struture for Search
 EBAY_BASE_URL = "https://api.ebay.com/buy/browse/v1/item_summary/search"
@@ -19,27 +21,23 @@ EBAY_BASE_URL = "https://api.ebay.com/buy/browse/v1/item_summary/search"
 #     "used": 3000
 # }
 
-# Ebay token data, reusable 
-ebay_token_cache: Optional[str] = None
-ebay_token_expiry: float = 0
+# Ebay token data, reusable - shared so only one worker refreshes it
+ebay_token_cache = Cache("ebay_token", ttl=3600, maxsize=1)
 
 async def get_valid_ebay_token() -> str:
     """
     Get a valid eBay OAuth2 token, refreshing it if necessary.
     """
-    global ebay_token_cache, ebay_token_expiry
-    current_time = time.time()
-    
     try:
-        # Check if the token is cached and valid, refreshing if necessary
-        if ebay_token_cache is None or current_time >= ebay_token_expiry:
-            ebay_token_cache, expires_in = await get_ebay_token()
-            ebay_token_expiry = current_time + expires_in - 60
+        # Cached until a minute before it expires, concurrent refreshes wait for a single one
+        token, _ = await ebay_token_cache.get_or_set(
+            "access_token", get_ebay_token, ttl=lambda token_data: token_data[1] - 60
+        )
     except Exception as e:
        logging.error(f"Failed to refresh eBay token: {e}")
        raise ExternalAPIError("Could not refresh eBay token") from e
 
-    return ebay_token_cache
+    return token
 
 
 def build_ebay_search_url(query: str, limit: int = 120) -> str:
@@ -53,6 +51,8 @@ def build_ebay_search_url(query: str, limit: int = 120) -> str:
 
     return url
 
+@hedged("ebay")
+@source_limited("ebay")
 async def search_ebay(query: str, limit: int = 120, token: Optional[str] = None) -> dict:
     """
     Execute a search query on eBay.
@@ -78,7 +78,11 @@ async def search_ebay(query: str, limit: int = 120, token: Optional[str] = None)
     except httpx.HTTPStatusError as e:
         # Ebay API returned an error response
         logging.error(f"eBay API HTTP error: {e.response.status_code} {e.response.text}")
-        raise ExternalAPIError(f"eBay API HTTP error: {e.response.status_code}") from e
+        raise ExternalAPIError(
+            f"eBay API HTTP error: {e.response.status_code}",
+            status_code=e.response.status_code,
+            retry_after=parse_retry_after(e.response.headers.get("Retry-After")),
+        ) from e
     except Exception as e:
         # General error handling- there was a problem in the request
         logging.error(f"eBay API request failed: {e}")
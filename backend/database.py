@@ -1,28 +1,215 @@
 # backend/database.py
 import os
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, TypeDecorator, create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from typing import AsyncGenerator
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from typing import AsyncGenerator, Optional
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bestprice.db")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./bestprice.db")
+# Read-only sessions - a replica on PostgreSQL, unset means the primary (SQLite opens it with mode=ro)
+ASYNC_READ_DATABASE_URL = os.getenv("ASYNC_READ_DATABASE_URL")
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Engine profile per environment - pool sizing and, on SQLite, pragmas applied to every new connection
+DB_PROFILE = os.getenv("DB_PROFILE", "development")  # development | production | test | default
 
-# Use async engine 
-ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./bestprice.db")
-async_engine = create_async_engine(ASYNC_DATABASE_URL)
+_SQLITE_WAL_PRAGMAS = {
+    "journal_mode": "WAL",          # readers don't block the writer and vice versa
+    "synchronous": "NORMAL",        # safe with WAL, fsync only at checkpoints
+    "busy_timeout": 5000,           # wait (ms) for the write lock instead of failing with "database is locked"
+    "temp_store": "MEMORY",
+}
+
+DB_PROFILES = {
+    "development": {
+        "pool_size": 5, "max_overflow": 5, "pool_timeout": 30,
+        "pragmas": {**_SQLITE_WAL_PRAGMAS, "cache_size": -16000},  # 16MB page cache
+    },
+    "production": {
+        "pool_size": 10, "max_overflow": 20, "pool_timeout": 10, "pool_recycle": 1800,
+        "pragmas": {**_SQLITE_WAL_PRAGMAS, "cache_size": -64000, "mmap_size": 268435456},  # 64MB cache, 256MB mmap
+    },
+    # Tests run every case on a new event loop, so connections aren't pooled across them
+    "test": {
+        "pool": "null",
+        "pragmas": {**_SQLITE_WAL_PRAGMAS, "synchronous": "OFF"},
+    },
+    # SQLAlchemy's own defaults, kept for comparison (scripts/bench_db_engine.py)
+    "default": {"pool": "dialect", "pragmas": {}},
+}
+
+
+def get_profile(name: str = DB_PROFILE) -> dict:
+    """
+    Engine profile by name, DB_POOL_SIZE / DB_MAX_OVERFLOW override its pool sizing
+    """
+    if name not in DB_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{name}', expected one of {', '.join(DB_PROFILES)}")
+    profile = dict(DB_PROFILES[name])
+    if os.getenv("DB_POOL_SIZE"):
+        profile["pool_size"] = int(os.getenv("DB_POOL_SIZE"))
+    if os.getenv("DB_MAX_OVERFLOW"):
+        profile["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW"))
+    return profile
+
+
+def engine_options(url: str, profile: dict, is_async: bool) -> dict:
+    """
+    create_engine keyword arguments for a URL under a profile
+    """
+    url = make_url(url)
+    options = {}
+    pool = profile.get("pool", "queue")
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if pool == "dialect":
+            return options
+        if url.database in (None, "", ":memory:"):
+            # One shared connection, or every session would see its own empty database
+            options["poolclass"] = StaticPool
+            return options
+        if pool == "null":
+            options["poolclass"] = NullPool
+            return options
+        options["poolclass"] = AsyncAdaptedQueuePool if is_async else QueuePool
+    elif pool == "dialect":
+        return options
+    elif pool == "null":
+        # A connection per session, so none outlives the event loop it was opened on
+        options["poolclass"] = NullPool
+        return options
+    else:
+        options["pool_pre_ping"] = True
+
+    for key in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle"):
+        if key in profile:
+            options[key] = profile[key]
+    return options
+
+
+def read_only_pragmas(pragmas: dict) -> dict:
+    """
+    Pragmas for read-only connections - the journal mode can't be changed from them, and query_only
+    guards against writes even where mode=ro isn't possible (in-memory databases)
+    """
+    return {**{name: value for name, value in pragmas.items() if name != "journal_mode"}, "query_only": "ON"}
+
+
+def read_database_url(url: str = ASYNC_DATABASE_URL, read_url: Optional[str] = ASYNC_READ_DATABASE_URL) -> str:
+    """
+    URL for read-only sessions: the replica if one is configured, on SQLite the same file opened with mode=ro
+    """
+    if read_url:
+        return read_url
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:") \
+            or parsed.database.startswith("file:"):
+        return url
+    return str(parsed.set(database=f"file:{parsed.database}", query={**parsed.query, "mode": "ro", "uri": "true"}))
+
+
+def apply_sqlite_pragmas(sync_engine, pragmas: dict) -> None:
+    """
+    Run the PRAGMA statements on every new DBAPI connection of a SQLite engine
+    """
+    if not pragmas or sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def build_engine(url: str = DATABASE_URL, profile_name: Optional[str] = None):
+    """
+    Sync engine configured by the profile
+    """
+    profile = get_profile(profile_name or DB_PROFILE)
+    sync_engine = create_engine(url, **engine_options(url, profile, is_async=False))
+    apply_sqlite_pragmas(sync_engine, profile["pragmas"])
+    return sync_engine
+
+
+def build_async_engine(url: str = ASYNC_DATABASE_URL, profile_name: Optional[str] = None,
+                       read_only: bool = False) -> AsyncEngine:
+    """
+    Async engine configured by the profile
+    """
+    profile = get_profile(profile_name or DB_PROFILE)
+    async_engine = create_async_engine(url, **engine_options(url, profile, is_async=True))
+    pragmas = read_only_pragmas(profile["pragmas"]) if read_only else profile["pragmas"]
+    apply_sqlite_pragmas(async_engine.sync_engine, pragmas)
+    if read_only and async_engine.dialect.name == "postgresql":
+        # Transactions are started READ ONLY, so a write through this engine fails on the primary too
+        async_engine = async_engine.execution_options(postgresql_readonly=True)
+    return async_engine
+
+
+engine = build_engine(DATABASE_URL)
+
+# Use async engine
+async_engine = build_async_engine(ASYNC_DATABASE_URL)
 AsyncSessionLocal = sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+# Separate pool for read-only sessions, so reads don't wait behind ingestion writes.
+# An in-memory SQLite database only exists on its one connection, reads share it
+READ_DATABASE_URL = read_database_url()
+if READ_DATABASE_URL == ASYNC_DATABASE_URL and make_url(READ_DATABASE_URL).get_backend_name() == "sqlite":
+    read_async_engine = async_engine
+else:
+    read_async_engine = build_async_engine(READ_DATABASE_URL, read_only=True)
+AsyncReadSessionLocal = sessionmaker(
+    bind=read_async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 Base = declarative_base()
 
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Timezone-aware UTC datetime, naive values are taken as UTC
+    """
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    DateTime(timezone=True) holding naive UTC like the rest of the app (datetime.utcnow()).
+    Naive values are bound as UTC - asyncpg would read them as local time - and timestamptz
+    results come back as naive UTC, so they compare with datetime.utcnow()
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return as_utc(value)
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 # Dependency for getting a database session
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+# Dependency for routes that only read - the session can't write
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as session:
+        yield session
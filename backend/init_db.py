@@ -1,12 +1,36 @@
 # backend/init_db.py
 import asyncio
+from pathlib import Path
+from typing import Optional
 
-from backend.database import async_engine, Base
-from backend.models import offers, pricehistory, searches, search_offer_link, users
+from alembic import command
+from alembic.config import Config
 
-async def async_init_db():
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+from backend.database import ASYNC_DATABASE_URL
+
+MIGRATIONS_PATH = Path(__file__).parent / "migrations"
+
+
+def alembic_config(url: Optional[str] = None) -> Config:
+    """
+    Alembic config for the app's migrations, without needing alembic.ini (the Docker image only has backend/)
+    """
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_PATH))
+    config.set_main_option("sqlalchemy.url", url or ASYNC_DATABASE_URL)
+    return config
+
+
+def upgrade_db(url: Optional[str] = None, revision: str = "head") -> None:
+    """
+    Migrate the database to a revision - tables made by the old create_all are adopted
+    """
+    command.upgrade(alembic_config(url), revision)
+
+
+async def async_init_db(url: Optional[str] = None):
+    # Alembic's env.py runs its own event loop, so migrate from a worker thread
+    await asyncio.to_thread(upgrade_db, url)
 
 if __name__ == "__main__":
-    asyncio.run(async_init_db())
+    upgrade_db()
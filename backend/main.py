@@ -8,8 +8,11 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from backend.routers import search_router, offer_router, auth_router, user_router, deals_router
-from backend.utils.error import ValidationError, NotFoundError, ExternalAPIError
+from backend.utils.error import ValidationError, NotFoundError, ExternalAPIError, ServiceOverloadedError
 from backend.scheduler import start_scheduler, stop_scheduler
+from backend.utils import metrics
+from backend.utils.shared_cache import start_cache_listeners, stop_cache_listeners
+from backend.utils.write_behind import search_write_behind
 
 # Global scheduler instance
 scheduler = None
@@ -18,13 +21,17 @@ scheduler = None
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events.
-    Starts the background scheduler on startup and stops it on shutdown.
+    Starts the background scheduler and the shared cache invalidation listeners on startup,
+    and stops them on shutdown - staged write-behind searches are flushed first.
     """
     global scheduler
     # Startup: Start the scheduler
     scheduler = start_scheduler()
+    start_cache_listeners()
     yield
-    # Shutdown: Stop the scheduler
+    # Shutdown: Write out staged searches, then stop the scheduler
+    await search_write_behind.close()
+    await stop_cache_listeners()
     stop_scheduler(scheduler)
 
 app = FastAPI(lifespan=lifespan)
@@ -52,10 +59,21 @@ async def not_found_exception_handler(request: Request, exc: NotFoundError):
 async def external_api_exception_handler(request: Request, exc: ExternalAPIError):
     return JSONResponse(status_code=502, content={"detail": str(exc)})
 
+@app.exception_handler(ServiceOverloadedError)
+async def overloaded_exception_handler(request: Request, exc: ServiceOverloadedError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def get_metrics():
+    """
+    Cache hit rates and other runtime counters
+    """
+    return metrics.collect()
+
 app.include_router(search_router.router, prefix="/search", tags=["search"])
 app.include_router(offer_router.router, prefix="/offers", tags=["offers"])
 app.include_router(auth_router.router, prefix="/auth", tags=["authentication"])
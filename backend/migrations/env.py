@@ -0,0 +1,69 @@
+# backend/migrations/env.py
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from backend.database import ASYNC_DATABASE_URL, Base
+from backend.models import offers, pricehistory, searches, search_offer_link, search_source_fetch, users  # noqa: F401
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def database_url() -> str:
+    """
+    URL to migrate - set on the config by init_db / tests, ASYNC_DATABASE_URL otherwise
+    """
+    return config.get_main_option("sqlalchemy.url") or ASYNC_DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """
+    Emit the migration SQL instead of running it (alembic upgrade head --sql)
+    """
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    if connection.dialect.name == "sqlite":
+        # Only takes effect on a new file - db_maintenance converts existing ones with a VACUUM
+        connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.commit()
+
+    # SQLite can't ALTER most things in place, batch mode recreates the table instead
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    """
+    Run the migrations on an async connection, like the app's engine
+    """
+    connectable = create_async_engine(database_url(), poolclass=NullPool)
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,125 @@
+"""initial schema - the tables init_db used to create with create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def existing_tables() -> set:
+    """
+    Tables already in the database - ones made by the old create_all are adopted, not recreated
+    """
+    if op.get_context().as_sql:
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    existing = existing_tables()
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(50), nullable=False),
+            sa.Column("email", sa.String(100), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("full_name", sa.String(100), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "offers" not in existing:
+        op.create_table(
+            "offers",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("source", sa.String(50), nullable=False),
+            sa.Column("source_offer_id", sa.String(100), nullable=False),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("last_price", sa.Numeric(12, 2), nullable=False),
+            sa.Column("currency", sa.String(3), nullable=False),
+            sa.Column("url", sa.String(500), nullable=False),
+            sa.Column("image_url", sa.String(500), nullable=True),
+            sa.Column("rating", sa.Numeric(3, 2), nullable=True),
+            sa.Column("seller", sa.String(100), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=True),
+            sa.UniqueConstraint("source", "source_offer_id", name="uix_source_offer"),
+        )
+        op.create_index("ix_offers_id", "offers", ["id"])
+        op.create_index("ix_offers_source", "offers", ["source"])
+        op.create_index("ix_offers_seller", "offers", ["seller"])
+        op.create_index("idx_offers_source_price", "offers", ["source", "last_price"])
+        op.create_index("idx_offers_last_seen_at", "offers", ["last_seen_at"])
+
+    if "price_history" not in existing:
+        op.create_table(
+            "price_history",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("offer_id", sa.Integer(), sa.ForeignKey("offers.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("price", sa.Numeric(12, 2), nullable=False),
+            sa.Column("currency", sa.String(3), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_price_history_id", "price_history", ["id"])
+        op.create_index("ix_price_history_offer_id", "price_history", ["offer_id"])
+        op.create_index("idx_offer_time", "price_history", ["offer_id", "fetched_at"])
+
+    if "searches" not in existing:
+        op.create_table(
+            "searches",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("query", sa.String(255), nullable=False),
+            sa.Column("normalized_query", sa.String(255), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        )
+        op.create_index("ix_searches_id", "searches", ["id"])
+        op.create_index("ix_searches_query", "searches", ["query"])
+        op.create_index("ix_searches_normalized_query", "searches", ["normalized_query"])
+
+    if "search_offer_link" not in existing:
+        op.create_table(
+            "search_offer_link",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("search_id", sa.Integer(), sa.ForeignKey("searches.id"), nullable=False),
+            sa.Column("offer_id", sa.Integer(), sa.ForeignKey("offers.id"), nullable=False),
+            sa.UniqueConstraint("search_id", "offer_id", name="uix_search_offer"),
+        )
+
+    if "user_watchlist" not in existing:
+        op.create_table(
+            "user_watchlist",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("offer_id", sa.Integer(), sa.ForeignKey("offers.id"), nullable=True),
+            sa.Column("product_title", sa.String(255), nullable=False),
+            sa.Column("product_url", sa.Text(), nullable=True),
+            sa.Column("current_price", sa.Float(), nullable=True),
+            sa.Column("source", sa.String(50), nullable=True),
+            sa.Column("product_image_url", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        )
+        op.create_index("ix_user_watchlist_id", "user_watchlist", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("user_watchlist")
+    op.drop_table("search_offer_link")
+    op.drop_table("searches")
+    op.drop_table("price_history")
+    op.drop_table("offers")
+    op.drop_table("users")
@@ -0,0 +1,60 @@
+"""searches.canonical_query, searches.is_warmup and the search_source_fetches table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def existing_schema() -> tuple:
+    """
+    Columns and indexes of searches, and the table names, already in the database -
+    scripts/canonical_queries.py or the old create_all may have added some of them
+    """
+    if op.get_context().as_sql:
+        return set(), set(), set()
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("searches")}
+    indexes = {index["name"] for index in inspector.get_indexes("searches")}
+    return columns, indexes, set(inspector.get_table_names())
+
+
+def upgrade() -> None:
+    columns, indexes, tables = existing_schema()
+    with op.batch_alter_table("searches") as batch:
+        if "canonical_query" not in columns:
+            batch.add_column(sa.Column("canonical_query", sa.String(255), nullable=True))
+        if "is_warmup" not in columns:
+            batch.add_column(sa.Column("is_warmup", sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    if "ix_searches_canonical_query" not in indexes:
+        op.create_index("ix_searches_canonical_query", "searches", ["canonical_query"])
+
+    if "search_source_fetches" not in tables:
+        op.create_table(
+            "search_source_fetches",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("search_id", sa.Integer(), sa.ForeignKey("searches.id"), nullable=False),
+            sa.Column("source", sa.String(50), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("offer_count", sa.Integer(), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_search_source_fetches_search_id", "search_source_fetches", ["search_id"])
+        op.create_index("idx_source_fetch_source_time", "search_source_fetches", ["source", "fetched_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("search_source_fetches")
+    op.drop_index("ix_searches_canonical_query", table_name="searches")
+    with op.batch_alter_table("searches") as batch:
+        batch.drop_column("is_warmup")
+        batch.drop_column("canonical_query")
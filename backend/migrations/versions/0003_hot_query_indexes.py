@@ -0,0 +1,47 @@
+"""composite indexes for the hot queries
+
+searches: (normalized_query, created_at) for get_cached_offers, (canonical_query, created_at) for
+get_fresh_source_fetches, created_at for the deals window and recent searches, (user_id, created_at)
+for a user's recent searches - the single-column query indexes they lead with are dropped.
+search_offer_link: (offer_id, search_id) - search_id already leads uix_search_offer.
+user_watchlist: (user_id, created_at) for the watchlist page, offer_id for removals by offer.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_searches_normalized_created", "searches", ["normalized_query", "created_at"])
+    op.create_index("idx_searches_canonical_created", "searches", ["canonical_query", "created_at"])
+    op.create_index("idx_searches_created_at", "searches", ["created_at"])
+    op.create_index("idx_searches_user_created", "searches", ["user_id", "created_at"])
+    op.drop_index("ix_searches_normalized_query", table_name="searches")
+    op.drop_index("ix_searches_canonical_query", table_name="searches")
+
+    op.create_index("idx_search_offer_link_offer", "search_offer_link", ["offer_id", "search_id"])
+
+    op.create_index("idx_watchlist_user_created", "user_watchlist", ["user_id", "created_at"])
+    op.create_index("idx_watchlist_offer", "user_watchlist", ["offer_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_watchlist_offer", table_name="user_watchlist")
+    op.drop_index("idx_watchlist_user_created", table_name="user_watchlist")
+
+    op.drop_index("idx_search_offer_link_offer", table_name="search_offer_link")
+
+    op.create_index("ix_searches_canonical_query", "searches", ["canonical_query"])
+    op.create_index("ix_searches_normalized_query", "searches", ["normalized_query"])
+    op.drop_index("idx_searches_user_created", table_name="searches")
+    op.drop_index("idx_searches_created_at", table_name="searches")
+    op.drop_index("idx_searches_canonical_created", table_name="searches")
+    op.drop_index("idx_searches_normalized_created", table_name="searches")
@@ -0,0 +1,55 @@
+"""fill searches.canonical_query on rows from before the column
+
+The deals groups and the search cache key on canonical_query alone, so the
+(canonical_query, created_at) index serves them - rows left null would drop out.
+Re-run scripts/canonical_queries.py backfill after changing the vocabulary.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.utils.query_keys import canonicalize_query, load_query_vocabulary
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+searches = sa.table(
+    "searches",
+    sa.column("id", sa.Integer),
+    sa.column("normalized_query", sa.String),
+    sa.column("canonical_query", sa.String),
+)
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        return
+    bind = op.get_bind()
+    vocabulary = load_query_vocabulary()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(searches.c.id, searches.c.normalized_query)
+            .where(searches.c.canonical_query.is_(None), searches.c.id > last_id)
+            .order_by(searches.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for search_id, normalized_query in rows:
+            canonical = canonicalize_query(normalized_query, vocabulary) or normalized_query
+            bind.execute(searches.update().where(searches.c.id == search_id).values(canonical_query=canonical))
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    # Data only - the filled keys are valid on the older schema too
+    pass
@@ -1,10 +1,10 @@
 # models/offers.py
 from sqlalchemy import (
-    Column, Integer, String, Numeric, DateTime, JSON, UniqueConstraint, Index, ForeignKey
+    Column, Integer, String, Numeric, JSON, UniqueConstraint, Index, ForeignKey
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from backend.database import Base
+from backend.database import Base, UTCDateTime
 
 
 class Offer(Base):
@@ -22,9 +22,9 @@ class Offer(Base):
     seller = Column(String(100), nullable=True, index=True)
   
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now()) # for the cache
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    last_seen_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(UTCDateTime, server_default=func.now()) # for the cache
+    updated_at = Column(UTCDateTime, onupdate=func.now())
+    last_seen_at = Column(UTCDateTime, nullable=True)
 
     __table_args__ = (
         UniqueConstraint("source", "source_offer_id", name="uix_source_offer"),
@@ -1,10 +1,10 @@
 # models/pricehistory.py
 from sqlalchemy import (
-    Column, Integer, String, Numeric, DateTime, JSON, ForeignKey, Index
+    Column, Integer, String, Numeric, JSON, ForeignKey, Index
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from backend.database import Base
+from backend.database import Base, UTCDateTime
 
 class PriceHistory(Base):
     __tablename__ = "price_history"
@@ -13,7 +13,7 @@ class PriceHistory(Base):
     offer_id = Column( Integer, ForeignKey("offers.id", ondelete="CASCADE") , nullable=False, index=True)
     price = Column(Numeric(12, 2), nullable=False)
     currency = Column(String(3), nullable=False)
-    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    fetched_at = Column(UTCDateTime, server_default=func.now(), nullable=False)
 
     offer = relationship("Offer", back_populates="price_history")
 
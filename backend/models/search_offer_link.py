@@ -1,5 +1,5 @@
 # models/search_offer_link.py
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from backend.database import Base
 
@@ -8,7 +8,10 @@ class SearchOfferLink(Base):
     id = Column(Integer, primary_key=True)
     search_id = Column(Integer, ForeignKey("searches.id"), nullable=False)
     offer_id = Column(Integer, ForeignKey("offers.id"), nullable=False)
-    __table_args__ = (UniqueConstraint("search_id", "offer_id", name="uix_search_offer"),)
+    __table_args__ = (
+        UniqueConstraint("search_id", "offer_id", name="uix_search_offer"),  # also serves lookups by search_id
+        Index("idx_search_offer_link_offer", "offer_id", "search_id"),       # searches an offer appeared in
+    )
 
     offer = relationship("Offer", back_populates="search_links")
     search = relationship("Search", back_populates="offer_links")
\ No newline at end of file
@@ -0,0 +1,22 @@
+# models/search_source_fetch.py
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from backend.database import Base, UTCDateTime
+
+
+class SearchSourceFetch(Base):
+    __tablename__ = "search_source_fetches"
+
+    id = Column(Integer, primary_key=True)
+    search_id = Column(Integer, ForeignKey("searches.id"), nullable=False, index=True)    # search the source's offers are linked to
+    source = Column(String(50), nullable=False)                                          # ebay / amazon / dummyjson
+    status = Column(String(20), nullable=False)                                          # "ok", or why the source was skipped
+    offer_count = Column(Integer, nullable=False, default=0)
+    fetched_at = Column(UTCDateTime, server_default=func.now(), nullable=False)   # when the upstream was actually called (kept when reused)
+
+    search = relationship("Search", back_populates="source_fetches")
+
+    __table_args__ = (
+        Index("idx_source_fetch_source_time", "source", "fetched_at"),
+    )
@@ -1,8 +1,8 @@
 # models/searches.py
-from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, JSON, ForeignKey, Boolean, Index, false
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from backend.database import Base
+from backend.database import Base, UTCDateTime
 
 
 class Search(Base):
@@ -10,10 +10,20 @@ class Search(Base):
 
     id = Column(Integer, primary_key=True, index=True)                         # search id
     query = Column(String(255), nullable=False, index=True)                    # query that the user searched
-    normalized_query = Column(String(255), nullable=False, index=True)         # normalized query (lowercase, no extra spaces)
+    normalized_query = Column(String(255), nullable=False)                     # normalized query (lowercase, no extra spaces)
+    canonical_query = Column(String(255), nullable=True)                       # cache key (NFKC, no punctuation, sorted tokens) - deals group on it too
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)           # which user made this search (nullable for backward compatibility)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())    # when the search was made
+    created_at = Column(UTCDateTime, server_default=func.now())    # when the search was made
+    is_warmup = Column(Boolean, nullable=False, default=False, server_default=false())  # made by the cache warmer, not a user
 
     # Relationships 
     offer_links = relationship("SearchOfferLink", back_populates="search")     # link to offers in the search
-    user = relationship("User", back_populates="searches")                     # link to user who made the search
\ No newline at end of file
+    source_fetches = relationship("SearchSourceFetch", back_populates="search")  # per-source fetch status and time
+    user = relationship("User", back_populates="searches")                     # link to user who made the search
+
+    __table_args__ = (
+        Index("idx_searches_normalized_created", "normalized_query", "created_at"),  # latest search for a query (cache)
+        Index("idx_searches_canonical_created", "canonical_query", "created_at"),    # fresh source fetches per cache key
+        Index("idx_searches_created_at", "created_at"),                              # deals window, recent searches
+        Index("idx_searches_user_created", "user_id", "created_at"),                 # a user's recent searches
+    )
@@ -1,8 +1,8 @@
 # backend/models/users.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from backend.database import Base
+from backend.database import Base, UTCDateTime
 
 
 class User(Base):
@@ -14,7 +14,7 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)                      # bcrypt hashed password
     full_name = Column(String(100), nullable=True)                             # optional full name
     is_active = Column(Boolean, default=True)                                  # account status
-    created_at = Column(DateTime(timezone=True), server_default=func.now())    # account creation time
+    created_at = Column(UTCDateTime, server_default=func.now())    # account creation time
 
     # Relationships - connects to user's data
     searches = relationship("Search", back_populates="user")                    # user's search history
@@ -35,8 +35,13 @@ class UserWatchlist(Base):
     source = Column(String(50), nullable=True)                                 # ebay, amazon, etc.
     product_image_url = Column(Text, nullable=True)                            # product image
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())    # when added to watchlist
+    created_at = Column(UTCDateTime, server_default=func.now())    # when added to watchlist
     
     # Relationships
     user = relationship("User", back_populates="watchlist_items")
     offer = relationship("Offer")                                              # optional link to current offer data
+
+    __table_args__ = (
+        Index("idx_watchlist_user_created", "user_id", "created_at"),  # a user's watchlist, newest first
+        Index("idx_watchlist_offer", "offer_id"),
+    )
@@ -1,14 +1,19 @@
-from typing import List
+from typing import Dict, List
 from backend.models.searches import Search
 from backend.models.offers import Offer
 from backend.models.pricehistory import PriceHistory
 from backend.models.search_offer_link import SearchOfferLink
+from backend.models.search_source_fetch import SearchSourceFetch
+from backend.models.users import UserWatchlist
 from backend.schemas.search_schema import SearchCreate
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select,desc
+from sqlalchemy import select, desc, or_, and_, func, insert, delete, exists, text
+from sqlalchemy.dialects import postgresql
 from datetime import datetime, timedelta
 import re
 from backend.utils.error import  ValidationError
+from backend.utils.query_keys import canonicalize_query
+from backend.database import as_utc
 
 class Repository:
     @staticmethod
@@ -20,7 +25,27 @@ class Repository:
             raise ValidationError("Query must be a non-empty string.")
         return re.sub(r"\s+", " ", query.strip().lower())
 
-    async def create_search(self, search_data: SearchCreate, session: AsyncSession, user_id: int = None) -> Search:
+    @staticmethod
+    def dialect_name(session: AsyncSession) -> str:
+        """
+        Name of the database behind a session ("sqlite", "postgresql"), used to pick fast paths
+        """
+        try:
+            return session.get_bind().dialect.name
+        except Exception:
+            return ""
+
+    @classmethod
+    def canonical_query(cls, query: str) -> str:
+        """
+        Canonical cache key - word order, punctuation and spacing don't matter.
+        Falls back to the normalized query if nothing is left after canonicalization
+        """
+        normalized_query = cls.normalize_query(query)
+        return canonicalize_query(normalized_query) or normalized_query
+
+    async def create_search(self, search_data: SearchCreate, session: AsyncSession, user_id: int = None,
+                            is_warmup: bool = False) -> Search:
         """
         Create a new search record with optional user association
         """
@@ -28,17 +53,33 @@ class Repository:
         search = Search(
             query=search_data.query,
             normalized_query=normalized_query,
+            canonical_query=self.canonical_query(search_data.query),
             user_id=user_id,  # link to user if provided
+            is_warmup=is_warmup,
         )
         session.add(search)
         await session.flush()
         await session.refresh(search)
         return search
 
-    async def update_or_create_offer_with_history(self, offers_data: List[dict], search_id: int, session: AsyncSession) -> List[Offer]:
+    async def update_or_create_offer_with_history(self, offers_data: List[dict], search_id: int, session: AsyncSession,
+                                                  commit: bool = True) -> List[Offer]:
         """
         Update existing offers or create new ones with their price history.
+        With commit=False the rows are only flushed, the caller commits.
         """
+        if self.dialect_name(session) == "postgresql":
+            # One upsert, one link insert and one COPY instead of a round trip per offer
+            offers = await self.upsert_offers(offers_data, session)
+            await self.link_offers(search_id, [offer.id for offer in offers], session)
+            await self.bulk_insert_price_history(
+                [{"offer_id": offer.id, "price": offer.last_price, "currency": offer.currency} for offer in offers],
+                session,
+            )
+            if commit:
+                await session.commit()
+            return offers
+
         offers = []
         search_offer_links = []
         price_histories = []
@@ -53,7 +94,10 @@ class Repository:
         # Add all search_offer_links and price_histories to the session
         session.add_all(search_offer_links)
         session.add_all(price_histories)
-        await session.commit()
+        if commit:
+            await session.commit()
+        else:
+            await session.flush()
         return offers
 
     async def get_or_create_offer(self, data: dict, session: AsyncSession) -> Offer:
@@ -86,12 +130,87 @@ class Repository:
                 seller=data.get("seller"),
                 image_url=data.get("image_url"),
                 rating=data.get("rating"),
-                last_seen_at=None
+                last_seen_at=None,
+                # Set here rather than by the server default, so the new offer is fully loaded after the flush
+                created_at=datetime.utcnow()
             )
             session.add(offer)
             await session.flush()
         return offer
 
+    async def upsert_offers(self, offers_data: List[dict], session: AsyncSession) -> List[Offer]:
+        """
+        PostgreSQL: insert or update all offers in one INSERT ... ON CONFLICT statement.
+        Same rules as get_or_create_offer - existing offers only get a new price, rating and last_seen_at
+        """
+        rows = {}
+        for data in offers_data:
+            # An offer listed twice in one batch can't be upserted twice by one statement, the last one wins
+            rows[(data["source"], data["source_offer_id"])] = {
+                "title": data["title"],
+                "last_price": data["last_price"],
+                "currency": data["currency"],
+                "url": data["url"],
+                "source": data["source"],
+                "source_offer_id": data["source_offer_id"],
+                "seller": data.get("seller"),
+                "image_url": data.get("image_url"),
+                "rating": data.get("rating"),
+                "last_seen_at": None,
+            }
+        if not rows:
+            return []
+
+        stmt = postgresql.insert(Offer).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            constraint="uix_source_offer",
+            set_={
+                "last_price": stmt.excluded.last_price,
+                "rating": stmt.excluded.rating,
+                "last_seen_at": func.now(),
+                "updated_at": func.now(),
+            },
+        ).returning(Offer.id, Offer.source, Offer.source_offer_id)
+        result = await session.execute(stmt)
+        ids = {(source, source_offer_id): offer_id for offer_id, source, source_offer_id in result.all()}
+
+        # Load the rows as ORM objects, refreshing any already in the session
+        query = select(Offer).where(Offer.id.in_(ids.values())).execution_options(populate_existing=True)
+        by_id = {offer.id: offer for offer in (await session.execute(query)).scalars().all()}
+        return [by_id[ids[(data["source"], data["source_offer_id"])]] for data in offers_data]
+
+    async def link_offers(self, search_id: int, offer_ids: List[int], session: AsyncSession) -> None:
+        """
+        PostgreSQL: link offers to a search in one statement, links that already exist are skipped
+        """
+        if not offer_ids:
+            return
+        stmt = postgresql.insert(SearchOfferLink).values(
+            [{"search_id": search_id, "offer_id": offer_id} for offer_id in dict.fromkeys(offer_ids)]
+        ).on_conflict_do_nothing(constraint="uix_search_offer")
+        await session.execute(stmt)
+
+    async def bulk_insert_price_history(self, rows: List[dict], session: AsyncSession) -> None:
+        """
+        Insert many price history rows ({offer_id, price, currency[, fetched_at]}, same keys in every row).
+        PostgreSQL streams them with COPY, other databases use one executemany INSERT
+        """
+        if not rows:
+            return
+        if self.dialect_name(session) == "postgresql":
+            columns = list(rows[0])
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                PriceHistory.__tablename__,
+                # COPY bypasses the column types, so naive fetched_at values are made UTC here
+                records=[tuple(as_utc(row[column]) if column == "fetched_at" else row[column] for column in columns)
+                         for row in rows],
+                columns=columns,
+            )
+        else:
+            await session.execute(insert(PriceHistory), rows)
+
     def create_search_offer_link(self, search_id: int, offer_id: int) -> SearchOfferLink:
         """
         Create a SearchOfferLink object.
@@ -176,4 +295,211 @@ class Repository:
 
         return search
 
+    async def get_search_offers(self, search_id: int, session: AsyncSession) -> List[Offer]:
+        """
+        Return all offers linked to a search.
+        """
+        query = (
+            select(Offer)
+            .join(SearchOfferLink, SearchOfferLink.offer_id == Offer.id)
+            .where(SearchOfferLink.search_id == search_id)
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    async def get_search_snapshot_rows(self, search_id: int, session: AsyncSession) -> List[tuple]:
+        """
+        (offer_id, last_price, rating, source) of every offer linked to a search, for its snapshot
+        """
+        query = (
+            select(Offer.id, Offer.last_price, Offer.rating, Offer.source)
+            .join(SearchOfferLink, SearchOfferLink.offer_id == Offer.id)
+            .where(SearchOfferLink.search_id == search_id)
+        )
+        result = await session.execute(query)
+        return result.all()
+
+    async def get_offers_by_ids(self, offer_ids: List[int], session: AsyncSession) -> List[Offer]:
+        """
+        Offers by id in the order given, ids that no longer exist are left out
+        """
+        if not offer_ids:
+            return []
+        result = await session.execute(select(Offer).where(Offer.id.in_(offer_ids)))
+        offers = {offer.id: offer for offer in result.scalars().all()}
+        return [offers[offer_id] for offer_id in offer_ids if offer_id in offers]
+
+    async def get_search(self, search_id: int, session: AsyncSession) -> Search:
+        """
+        Return a search by id, or None.
+        """
+        return await session.get(Search, search_id)
+
+    async def get_fresh_source_fetches(self, canonical_query: str, max_age_minutes: Dict[str, Dict[str, float]],
+                                       session: AsyncSession) -> Dict[str, SearchSourceFetch]:
+        """
+        Most recent fetch per source for the canonical query that is still within the max age for its status.
+        max_age_minutes maps source -> {status: minutes}, statuses not listed are never reused.
+        """
+        now = datetime.utcnow()
+        windows = [
+            and_(
+                SearchSourceFetch.source == source,
+                SearchSourceFetch.status == status,
+                SearchSourceFetch.fetched_at >= now - timedelta(minutes=minutes),
+            )
+            for source, statuses in max_age_minutes.items()
+            for status, minutes in statuses.items()
+            if minutes > 0
+        ]
+        if not windows:
+            return {}
 
+        query = (
+            select(SearchSourceFetch)
+            .join(Search, Search.id == SearchSourceFetch.search_id)
+            .where(Search.canonical_query == canonical_query, or_(*windows))
+            .order_by(desc(SearchSourceFetch.fetched_at))
+        )
+        result = await session.execute(query)
+
+        fresh = {}
+        for fetch in result.scalars().all():
+            fresh.setdefault(fetch.source, fetch)
+        return fresh
+
+    def record_source_fetch(self, search_id: int, source: str, status: str, offer_count: int,
+                            session: AsyncSession, fetched_at: datetime = None) -> SearchSourceFetch:
+        """
+        Add a SearchSourceFetch row, committed with the search.
+        """
+        fetch = SearchSourceFetch(search_id=search_id, source=source, status=status, offer_count=offer_count)
+        if fetched_at is not None:
+            fetch.fetched_at = fetched_at
+        session.add(fetch)
+        return fetch
+
+    async def reuse_source_offers(self, fetch: SearchSourceFetch, search_id: int, session: AsyncSession) -> List[Offer]:
+        """
+        Link a fresh source's offers from an earlier search to a new search.
+        The original fetch time is kept, so reuse doesn't extend the source's freshness.
+        """
+        query = (
+            select(Offer)
+            .join(SearchOfferLink, SearchOfferLink.offer_id == Offer.id)
+            .where(SearchOfferLink.search_id == fetch.search_id, Offer.source == fetch.source)
+        )
+        result = await session.execute(query)
+        offers = result.scalars().all()
+
+        session.add_all([self.create_search_offer_link(search_id, offer.id) for offer in offers])
+        self.record_source_fetch(search_id, fetch.source, fetch.status, len(offers), session, fetched_at=fetch.fetched_at)
+        return offers
+
+    async def get_popular_queries(self, since: datetime, limit: int, min_count: int, session: AsyncSession) -> List[tuple]:
+        """
+        Most searched canonical queries since a time, as (canonical_query, normalized_query, count).
+        Cache warmer searches are not counted.
+        """
+        search_count = func.count(Search.id)
+        query = (
+            select(Search.canonical_query, func.max(Search.normalized_query), search_count)
+            .where(
+                Search.created_at >= since,
+                Search.is_warmup == False,  # noqa: E712
+                Search.canonical_query.isnot(None),
+            )
+            .group_by(Search.canonical_query)
+            .having(search_count >= min_count)
+            .order_by(desc(search_count))
+            .limit(limit)
+        )
+        result = await session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def get_expired_search_ids(self, created_before: datetime, limit: int, session: AsyncSession) -> List[int]:
+        """
+        Oldest anonymous searches made before a time - searches of a user are their history and are kept
+        """
+        query = (
+            select(Search.id)
+            .where(Search.created_at < created_before, Search.user_id.is_(None))
+            .order_by(Search.created_at)
+            .limit(limit)
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    async def delete_searches(self, search_ids: List[int], session: AsyncSession) -> Dict[str, int]:
+        """
+        Delete searches with their offer links and source fetches, returns the rows deleted per table
+        """
+        if not search_ids:
+            return {}
+        deleted = {}
+        for model, column in ((SearchOfferLink, SearchOfferLink.search_id),
+                              (SearchSourceFetch, SearchSourceFetch.search_id),
+                              (Search, Search.id)):
+            result = await session.execute(
+                delete(model).where(column.in_(search_ids)).execution_options(synchronize_session=False)
+            )
+            deleted[model.__tablename__] = result.rowcount
+        return deleted
+
+    @staticmethod
+    def orphan_offer_conditions(seen_before: datetime) -> list:
+        """
+        Offers no search links to and no watchlist holds, that haven't been seen since a time
+        """
+        return [
+            func.coalesce(Offer.last_seen_at, Offer.created_at) < seen_before,
+            ~exists().where(SearchOfferLink.offer_id == Offer.id),
+            ~exists().where(UserWatchlist.offer_id == Offer.id),
+        ]
+
+    async def get_orphan_offer_ids(self, seen_before: datetime, limit: int, session: AsyncSession) -> List[int]:
+        """
+        Offers no search links to and no watchlist holds, that haven't been seen since a time
+        """
+        query = (
+            select(Offer.id)
+            .where(*self.orphan_offer_conditions(seen_before))
+            .order_by(Offer.id)
+            .limit(limit)
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    async def delete_offers(self, offer_ids: List[int], seen_before: datetime, session: AsyncSession) -> Dict[str, int]:
+        """
+        Delete offers and their price history, of those ids only the ones still orphaned - an offer
+        ingestion linked or saw again since the ids were selected is kept
+        """
+        if not offer_ids:
+            return {}
+        orphans = [Offer.id.in_(offer_ids), *self.orphan_offer_conditions(seen_before)]
+        # PostgreSQL: lock the offers still orphaned, so ingestion can't link or see them again until this
+        # commits. SQLite has no FOR UPDATE, but its writers are serialized from the first delete on
+        await session.execute(select(Offer.id).where(*orphans).with_for_update(of=Offer))
+        history = await session.execute(
+            delete(PriceHistory)
+            .where(PriceHistory.offer_id.in_(select(Offer.id).where(*orphans)))
+            .execution_options(synchronize_session=False)
+        )
+        offers = await session.execute(delete(Offer).where(*orphans).execution_options(synchronize_session=False))
+        return {PriceHistory.__tablename__: history.rowcount, Offer.__tablename__: offers.rowcount}
+
+    async def get_database_used_bytes(self, session: AsyncSession):
+        """
+        Bytes in use by the database - SQLite pages minus the free list, PostgreSQL's database size.
+        None on other databases
+        """
+        dialect = self.dialect_name(session)
+        if dialect == "sqlite":
+            page_size = (await session.execute(text("PRAGMA page_size"))).scalar()
+            page_count = (await session.execute(text("PRAGMA page_count"))).scalar()
+            free_pages = (await session.execute(text("PRAGMA freelist_count"))).scalar()
+            return (page_count - free_pages) * page_size
+        if dialect == "postgresql":
+            return (await session.execute(text("SELECT pg_database_size(current_database())"))).scalar()
+        return None
@@ -7,7 +7,7 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.schemas.user_schema import UserCreate, UserLogin, UserResponse, Token
 from backend.services.user_service import UserService
-from backend.database import get_session
+from backend.database import get_read_session, get_session
 from backend.utils.error import ValidationError
 from backend.utils.auth import require_current_user_id
 
@@ -54,15 +54,15 @@ async def login_user(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     user_service: UserService = Depends(get_user_service),
     current_user_id: int = Depends(require_current_user_id)
 ):
     """
     Get current user profile (requires authentication)
     """
-    user = await user_service.get_user_by_id(current_user_id, session)
+    user = await user_service.get_user_response(current_user_id, session)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return UserResponse.from_orm(user)
+    return user
@@ -7,7 +7,7 @@ from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.schemas.deal_schema import DealResponse
 from backend.services.deals_service import get_recent_best_deals
-from backend.database import get_session
+from backend.database import get_read_session
 
 router = APIRouter()
 
@@ -15,7 +15,7 @@ router = APIRouter()
 async def get_recent_deals(
     limit: int = Query(15, ge=1, le=50, description="Number of deals to return"),
     hours: int = Query(48, ge=24, le=168, description="Time window in hours"),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Get the best deals from recent searches
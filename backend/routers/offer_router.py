@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, Query
-from backend.services.offer_service import get_offers_for_search
+from fastapi.responses import StreamingResponse
+from backend.services.offer_service import get_offers_for_search, export_search_offers_csv
 from backend.services.pricehistory_service import get_price_history_for_offer
 from backend.schemas.offer_schema import OfferResponse
 from backend.schemas.pricehistory_schema import PriceHistoryResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from backend.database import get_session
+from backend.database import get_read_session
+from backend.repositories.repository import Repository
+from backend.utils.error import NotFoundError
 from typing import Dict, List, Any
 
 
@@ -21,7 +24,7 @@ async def offers(
     max_price: float = Query(None),
     source: str = Query(None),
     min_rating: float = Query(None),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Fetch offers for a specific search ID with pagination.
@@ -36,8 +39,21 @@ async def offers(
         filters["min_rating"] = min_rating
     return await get_offers_for_search(search_id, session, page, page_size, sort_by, sort_order, filters)
 
+@router.get("/export")
+async def export_offers(search_id: int, session: AsyncSession = Depends(get_read_session)) -> StreamingResponse:
+    """
+    Download all offers of a search as CSV, streamed as rows are read.
+    """
+    if await Repository().get_search(search_id, session) is None:
+        raise NotFoundError(f"Search {search_id} not found")
+    return StreamingResponse(
+        export_search_offers_csv(search_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="search_{search_id}_offers.csv"'},
+    )
+
 @router.get("/price/{offer_id}", response_model=list[PriceHistoryResponse])
-async def offer_price_history(offer_id: int, session: AsyncSession = Depends(get_session)):
+async def offer_price_history(offer_id: int, session: AsyncSession = Depends(get_read_session)):
     """
     Fetch price history for a specific offer ID.
     """
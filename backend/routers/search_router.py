@@ -2,15 +2,18 @@
 """
 Controller Layer - Handles HTTP requests and dependency injection
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+import json
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.schemas.search_schema import SearchResponse, SearchCreate
 from backend.services.search_services import SearchService
 from backend.repositories.repository import Repository
 from backend.services.data_transformation_service import transform_search_results
-from backend.database import get_session
+from backend.database import get_read_session, get_session
 from backend.utils.error import handle_api_errors
 from backend.utils.auth import get_current_user_id
 
@@ -27,7 +30,7 @@ def get_search_service() -> SearchService:
     )
 
 @router.get("/recent", response_model= List[SearchResponse])
-async def recent_searches(limit: int = 10, session: AsyncSession = Depends(get_session),
+async def recent_searches(limit: int = 10, session: AsyncSession = Depends(get_read_session),
                           search_service: SearchService = Depends(get_search_service)):
     """
     Get recent searches.
@@ -35,13 +38,41 @@ async def recent_searches(limit: int = 10, session: AsyncSession = Depends(get_s
     return await search_service.get_recent_searches(session, limit)
 
 @router.post("/", response_model=SearchResponse)
-async def create_search(search_data: SearchCreate, session: AsyncSession = Depends(get_session),
+async def create_search(search_data: SearchCreate, include_offers: Optional[int] = Query(None),
+                        session: AsyncSession = Depends(get_session),
                         search_service: SearchService = Depends(get_search_service),
                         current_user_id: Optional[int] = Depends(get_current_user_id)) -> SearchResponse:
     """
-    Create a new search and return results - optionally associates with user if authenticated
+    Create a new search and return results - optionally associates with user if authenticated.
+    include_offers=<page_size> adds the first page of offers, saving the GET /offers round trip
     """
-    return await search_service.perform_search(search_data, session, current_user_id)
-   
-   
-    
+    return await search_service.perform_search(search_data, session, current_user_id, include_offers)
+
+def format_sse(event: str, data: dict) -> str:
+    """
+    Format one Server-Sent Event
+    """
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@router.get("/stream")
+async def stream_search(q: str = Query(..., min_length=1), search_service: SearchService = Depends(get_search_service),
+                        current_user_id: Optional[int] = Depends(get_current_user_id)) -> StreamingResponse:
+    """
+    Search and stream offers as Server-Sent Events, one "source" event per source as it answers,
+    then a "done" event with the search_id
+    """
+    events = search_service.stream_search(SearchCreate(query=q), current_user_id)
+
+    # Run up to the first event here, so validation and overload errors still get their status code
+    first_event = await events.__anext__()
+
+    async def event_stream():
+        yield format_sse(*first_event)
+        async for event, data in events:
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -9,7 +9,7 @@ from backend.schemas.user_schema import WatchlistItemCreate, WatchlistItemRespon
 from backend.schemas.search_schema import SearchResponse
 from backend.services.user_service import UserService
 from backend.repositories.repository import Repository
-from backend.database import get_session
+from backend.database import get_read_session, get_session
 from backend.utils.auth import require_current_user_id
 from backend.utils.error import ValidationError, NotFoundError
 
@@ -29,7 +29,7 @@ def get_repository() -> Repository:
 
 @router.get("/watchlist", response_model=List[WatchlistItemResponse])
 async def get_user_watchlist(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     user_service: UserService = Depends(get_user_service),
     current_user_id: int = Depends(require_current_user_id)
 ):
@@ -70,7 +70,7 @@ async def remove_from_watchlist(
 @router.get("/recent-searches", response_model=List[SearchResponse])
 async def get_user_recent_searches(
     limit: int = 10,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     repository: Repository = Depends(get_repository),
     current_user_id: int = Depends(require_current_user_id)
 ):
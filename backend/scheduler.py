@@ -1,14 +1,19 @@
 """
 Background scheduler for periodic tasks.
 
-This module sets up scheduled tasks like price tracking for watchlist items.
+This module sets up scheduled tasks like price tracking for watchlist items,
+warming the cache for popular searches, deleting expired data and database maintenance.
 """
 
 import asyncio
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from backend.tasks.price_tracker import update_watchlist_prices
+from backend.tasks.cache_warmer import CACHE_WARM_ENABLED, CACHE_WARM_INTERVAL_MINUTES, warm_popular_queries
+from backend.tasks.retention import RETENTION_ENABLED, purge_expired_data
+from backend.tasks.db_maintenance import DB_MAINTENANCE_ENABLED, DB_MAINTENANCE_HOUR, run_db_maintenance
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,6 +25,9 @@ def start_scheduler():
     
     Tasks:
     - Price tracking: Runs daily at 2:00 AM
+    - Cache warming: Runs every CACHE_WARM_INTERVAL_MINUTES (if CACHE_WARM_ENABLED)
+    - Retention: Runs daily at 3:30 AM (if RETENTION_ENABLED)
+    - Database maintenance: Runs daily at DB_MAINTENANCE_HOUR (if DB_MAINTENANCE_ENABLED)
     """
     scheduler = AsyncIOScheduler()
     
@@ -32,8 +40,50 @@ def start_scheduler():
         replace_existing=True
     )
     
+    # Keep popular searches warm - one run at a time, missed runs are merged
+    if CACHE_WARM_ENABLED:
+        scheduler.add_job(
+            warm_popular_queries,
+            trigger=IntervalTrigger(minutes=CACHE_WARM_INTERVAL_MINUTES),
+            id='warm_popular_queries',
+            name='Warm popular search queries',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+    # Delete expired searches and orphaned offers, after the price tracking run
+    if RETENTION_ENABLED:
+        scheduler.add_job(
+            purge_expired_data,
+            trigger=CronTrigger(hour=3, minute=30),
+            id='purge_expired_data',
+            name='Delete expired searches and orphaned offers',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+    # ANALYZE / vacuum / checkpoint in the low-traffic window, after retention freed the pages
+    if DB_MAINTENANCE_ENABLED:
+        scheduler.add_job(
+            run_db_maintenance,
+            trigger=CronTrigger(hour=DB_MAINTENANCE_HOUR, minute=0),
+            id='run_db_maintenance',
+            name='Database maintenance',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
     scheduler.start()
     logger.info("✓ Scheduler started - Price tracking will run daily at 2:00 AM")
+    if CACHE_WARM_ENABLED:
+        logger.info(f"✓ Cache warming will run every {CACHE_WARM_INTERVAL_MINUTES:g} minutes")
+    if RETENTION_ENABLED:
+        logger.info("✓ Retention will run daily at 3:30 AM")
+    if DB_MAINTENANCE_ENABLED:
+        logger.info(f"✓ Database maintenance will run daily at {DB_MAINTENANCE_HOUR}:00")
     
     return scheduler
 
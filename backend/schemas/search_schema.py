@@ -1,6 +1,6 @@
 # backend/schemas/search_schema.py
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 from backend.schemas.offer_schema import OfferResponse
@@ -14,7 +14,11 @@ class SearchCreate(SearchBase):
 class SearchResponse(SearchBase):
     id: int
     normalized_query: str
+    canonical_query: Optional[str] = None
     created_at: datetime
+    skipped_sources: Dict[str, str] = {}    # source -> reason it was left out ("circuit_open", "deadline", "error")
+    offers: Optional[List[OfferResponse]] = None    # first page, only when asked for with include_offers
+    pagination: Optional[Dict[str, int]] = None     # same shape as GET /offers
 
     class Config:
         orm_mode = True
\ No newline at end of file
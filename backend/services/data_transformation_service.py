@@ -13,7 +13,7 @@ def transform_search_results(raw_results: Dict[str, List[dict]]) -> List[dict]:
      """
     all_offers = []
     # Transform eBay results
-    for item in raw_results.get('ebay', []):
+    for item in raw_results.get('ebay') or []:
         try:
             offer_data = ebay_to_offer(item)
             all_offers.append(offer_data)
@@ -21,7 +21,7 @@ def transform_search_results(raw_results: Dict[str, List[dict]]) -> List[dict]:
             print(f"Error transforming eBay item {item.get('itemId', 'unknown')}: {e}")
 
     # Transform DummyJSON results
-    for item in raw_results.get('dummyjson', {}).get('items_filtered', []):
+    for item in (raw_results.get('dummyjson') or {}).get('items_filtered', []):
         try:
             offer_data = dummyjson_to_offer(item)
             all_offers.append(offer_data)
@@ -29,7 +29,7 @@ def transform_search_results(raw_results: Dict[str, List[dict]]) -> List[dict]:
             print(f"Error transforming DummyJSON item {item.get('id', 'unknown')}: {e}")
 
      # Amazon
-    for item in raw_results.get('amazon', {}).get('products', []):
+    for item in (raw_results.get('amazon') or {}).get('products', []):
         try:
             offer_data = amazon_to_offer(item)
             all_offers.append(offer_data)
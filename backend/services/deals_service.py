@@ -5,13 +5,14 @@ Analyzes recent searches to find the best deals based on price, rating, and rece
 """
 import statistics
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.searches import Search
 from backend.models.offers import Offer
 from backend.models.search_offer_link import SearchOfferLink
+from backend.repositories.repository import Repository
 from decimal import Decimal
 
 # Configure logging
@@ -24,7 +25,7 @@ async def get_recent_best_deals(session: AsyncSession, limit: int = 15, hours: i
     
     Algorithm:
     1. Get all searches from last N hours
-    2. Group offers by normalized_query
+    2. Group offers by canonical query
     3. For each group:
        a. Remove low-price outliers 
        b. Calculate avg_price and std_dev using filtered prices
@@ -40,96 +41,20 @@ async def get_recent_best_deals(session: AsyncSession, limit: int = 15, hours: i
     # Calculate cutoff time
     cutoff_time = datetime.utcnow() - timedelta(hours=hours)
     
-    # 1+2: Get all unique normalized queries from recent searches
-    query_stmt = (
-        select(Search.normalized_query)
-        .where(Search.created_at >= cutoff_time)
-        .distinct()
-    )
-    result = await session.execute(query_stmt)
-    normalized_queries = result.scalars().all()
+    # 1+2: Offers of every query group with at least 5 offers
+    if Repository.dialect_name(session) == "postgresql":
+        query_groups = await get_query_group_offers_postgres(session, cutoff_time)
+    else:
+        query_groups = await get_query_group_offers(session, cutoff_time)
     
-    if not normalized_queries:
+    if not query_groups:
         return []
     
     # 3: Process each query group
     all_candidates = []
     
-    for normalized_query in normalized_queries:
-        # Get all offers for this query group with their search dates
-        offers_stmt = (
-            select(Offer, func.max(Search.created_at).label('search_date'))
-            .join(SearchOfferLink, Offer.id == SearchOfferLink.offer_id)
-            .join(Search, SearchOfferLink.search_id == Search.id)
-            .where(
-                and_(
-                    Search.normalized_query == normalized_query,
-                    Search.created_at >= cutoff_time
-                )
-            )
-            .group_by(Offer.id)
-        )
-        offers_result = await session.execute(offers_stmt)
-        offers_with_dates = offers_result.all()
-        
-        # Skip if less than 5 offers in this group
-        if len(offers_with_dates) < 5:
-            continue
-        
-        # Extract offers and calculate statistics
-        offers = [row[0] for row in offers_with_dates]
-        prices = [float(offer.last_price) for offer in offers]
-        
-        # Remove low-price outliers using median method before calculating statistics
-        # This prevents cheap accessories from skewing the average
-        filtered_prices = remove_low_price_outliers(prices)
-        
-        # Use filtered prices for statistics
-        avg_price = statistics.mean(filtered_prices)
-        std_dev = statistics.stdev(filtered_prices) if len(filtered_prices) > 1 else 0
-        
-        # Create a set of filtered prices for quick lookup
-        filtered_price_set = set(filtered_prices)
-        
-        # 4: Score each offer in this group (if not filtered out)
-        scored_offers = []
-        for offer, search_date in offers_with_dates:
-            offer_price = float(offer.last_price)
-            
-            # Skip offers that were filtered out as low-price outliers
-            if offer_price not in filtered_price_set:
-                continue
-            # Calculate discount score (60% weight) using standard deviation
-            discount_score = calculate_discount_score(
-                float(offer.last_price), 
-                avg_price, 
-                std_dev
-            )
-            
-            # 5: Calculate rating score
-            # Calculate rating score (30% weight)
-            rating_score = calculate_rating_score(offer.rating)
-            
-            # Calculate recency score (10% weight)
-            recency_score = calculate_recency_score(search_date)
-            
-            # Meta-Score = weighted sum
-            meta_score = (discount_score * 0.60) + (rating_score * 0.30) + (recency_score * 0.10)
-            
-            # Calculate discount percentage for display
-            discount_pct = ((avg_price - float(offer.last_price)) / avg_price * 100) if avg_price > 0 else 0
-            
-            scored_offers.append({
-                'offer': offer,
-                'meta_score': meta_score,
-                'avg_price': Decimal(str(round(avg_price, 2))),
-                'discount_percentage': round(discount_pct, 2),
-                'search_date': search_date
-            })
-        
-        # 6: Get top 3 candidates from this query group
-        scored_offers.sort(key=lambda x: x['meta_score'], reverse=True)
-        all_candidates.extend(scored_offers[:3])
+    for offers_with_dates in query_groups.values():
+        all_candidates.extend(score_query_group(offers_with_dates))
     
     # 7: Global ranking and deduplication
     all_candidates.sort(key=lambda x: x['meta_score'], reverse=True)
@@ -171,6 +96,161 @@ async def get_recent_best_deals(session: AsyncSession, limit: int = 15, hours: i
     return unique_deals
 
 
+def recent_query_key():
+    """
+    Query group of a search - "iphone 15 pro" and "pro iphone15" are one group.
+    The bare column, so a group's searches are a seek on (canonical_query, created_at);
+    migration 0004 fills it on rows from before the column
+    """
+    return Search.canonical_query
+
+
+async def get_query_group_offers(session: AsyncSession, cutoff_time: datetime) -> Dict[str, list]:
+    """
+    Offers of each recent query group with the date of their latest search, as
+    {query_group: [(offer, search_date), ...]} - groups with less than 5 offers are left out.
+    One query per group, works on any database
+    """
+    query_key = recent_query_key()
+    # Bounded on both sides, so SQLite walks the window on created_at rather than
+    # the whole (canonical_query, created_at) index in DISTINCT order
+    query_stmt = (
+        select(query_key)
+        .where(Search.created_at.between(cutoff_time, datetime.utcnow()))
+        .distinct()
+    )
+    result = await session.execute(query_stmt)
+
+    query_groups = {}
+    for query_group in result.scalars().all():
+        if query_group is None:
+            continue
+        # Get all offers for this query group with their search dates
+        offers_stmt = (
+            select(Offer, func.max(Search.created_at).label('search_date'))
+            .join(SearchOfferLink, Offer.id == SearchOfferLink.offer_id)
+            .join(Search, SearchOfferLink.search_id == Search.id)
+            .where(
+                and_(
+                    query_key == query_group,
+                    Search.created_at >= cutoff_time
+                )
+            )
+            .group_by(Offer.id)
+        )
+        offers_result = await session.execute(offers_stmt)
+        offers_with_dates = offers_result.all()
+
+        # Skip if less than 5 offers in this group
+        if len(offers_with_dates) >= 5:
+            query_groups[query_group] = offers_with_dates
+    return query_groups
+
+
+def query_group_offers_postgres_stmt(cutoff_time: datetime):
+    """
+    PostgreSQL: every recent (query group, offer) pair in one statement. DISTINCT ON keeps each
+    offer's latest search per group, a window count drops groups with less than 5 offers
+    """
+    query_key = recent_query_key()
+    latest = (
+        select(
+            query_key.label("query_group"),
+            SearchOfferLink.offer_id.label("offer_id"),
+            Search.created_at.label("search_date"),
+        )
+        .join(SearchOfferLink, SearchOfferLink.search_id == Search.id)
+        .where(Search.created_at >= cutoff_time, query_key.isnot(None))
+        .distinct(query_key, SearchOfferLink.offer_id)
+        .order_by(query_key, SearchOfferLink.offer_id, desc(Search.created_at))
+        .subquery("latest")
+    )
+    counted = select(
+        latest,
+        func.count().over(partition_by=latest.c.query_group).label("group_size"),
+    ).subquery("counted")
+    return (
+        select(Offer, counted.c.query_group, counted.c.search_date)
+        .join(counted, counted.c.offer_id == Offer.id)
+        .where(counted.c.group_size >= 5)
+        .order_by(counted.c.query_group, Offer.id)
+    )
+
+
+async def get_query_group_offers_postgres(session: AsyncSession, cutoff_time: datetime) -> Dict[str, list]:
+    """
+    Same result as get_query_group_offers, in a single round trip
+    """
+    result = await session.execute(query_group_offers_postgres_stmt(cutoff_time))
+    query_groups = {}
+    for offer, query_group, search_date in result.all():
+        # timestamptz comes back timezone-aware, scoring works on naive UTC like the rest of the app
+        if search_date.tzinfo is not None:
+            search_date = search_date.astimezone(timezone.utc).replace(tzinfo=None)
+        query_groups.setdefault(query_group, []).append((offer, search_date))
+    return query_groups
+
+
+def score_query_group(offers_with_dates: list) -> List[Dict[str, Any]]:
+    """
+    Score the offers of one query group, returns its top 3 candidates
+    """
+    # Extract offers and calculate statistics
+    offers = [row[0] for row in offers_with_dates]
+    prices = [float(offer.last_price) for offer in offers]
+    
+    # Remove low-price outliers using median method before calculating statistics
+    # This prevents cheap accessories from skewing the average
+    filtered_prices = remove_low_price_outliers(prices)
+    
+    # Use filtered prices for statistics
+    avg_price = statistics.mean(filtered_prices)
+    std_dev = statistics.stdev(filtered_prices) if len(filtered_prices) > 1 else 0
+    
+    # Create a set of filtered prices for quick lookup
+    filtered_price_set = set(filtered_prices)
+    
+    # 4: Score each offer in this group (if not filtered out)
+    scored_offers = []
+    for offer, search_date in offers_with_dates:
+        offer_price = float(offer.last_price)
+        
+        # Skip offers that were filtered out as low-price outliers
+        if offer_price not in filtered_price_set:
+            continue
+        # Calculate discount score (60% weight) using standard deviation
+        discount_score = calculate_discount_score(
+            float(offer.last_price), 
+            avg_price, 
+            std_dev
+        )
+        
+        # 5: Calculate rating score
+        # Calculate rating score (30% weight)
+        rating_score = calculate_rating_score(offer.rating)
+        
+        # Calculate recency score (10% weight)
+        recency_score = calculate_recency_score(search_date)
+        
+        # Meta-Score = weighted sum
+        meta_score = (discount_score * 0.60) + (rating_score * 0.30) + (recency_score * 0.10)
+        
+        # Calculate discount percentage for display
+        discount_pct = ((avg_price - float(offer.last_price)) / avg_price * 100) if avg_price > 0 else 0
+        
+        scored_offers.append({
+            'offer': offer,
+            'meta_score': meta_score,
+            'avg_price': Decimal(str(round(avg_price, 2))),
+            'discount_percentage': round(discount_pct, 2),
+            'search_date': search_date
+        })
+    
+    # 6: Get top 3 candidates from this query group
+    scored_offers.sort(key=lambda x: x['meta_score'], reverse=True)
+    return scored_offers[:3]
+
+
 def remove_low_price_outliers(prices: List[float]) -> List[float]:
     """
     Remove low-price outliers using median-based filtering
@@ -1,8 +1,19 @@
+import csv
+import io
+import os
 from sqlalchemy import select, func, desc, asc, and_, nulls_last, nulls_first
+from backend.database import AsyncReadSessionLocal
 from backend.models.offers import Offer
 from backend.models.search_offer_link import SearchOfferLink
+from backend.repositories.repository import Repository
 from backend.schemas.offer_schema import OfferResponse
 from backend.utils.error import NotFoundError, ValidationError
+from backend.utils.search_snapshot import SearchSnapshot, search_snapshots
+from backend.utils.write_behind import search_write_behind
+
+# Offer columns in CSV exports, and how many rows are fetched from the cursor at a time
+EXPORT_COLUMNS = ["id", "source", "source_offer_id", "title", "last_price", "currency", "rating", "seller", "url", "last_seen_at"]
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
 
 async def get_offers_for_search(search_id: int, session, page: int = 1, page_size: int = 20,
                                 sort_by: str = "last_price", sort_order: str = "asc", filters: dict = None):
@@ -13,6 +24,13 @@ async def get_offers_for_search(search_id: int, session, page: int = 1, page_siz
     if page < 1 or page_size < 1 or page_size > 100:
         raise ValidationError("Invalid pagination parameters, must be positive integers and page_size <= 100.")
 
+    # Offers of a search still in the write-behind staging area are written first
+    written = await search_write_behind.wait_for(key=search_id)
+
+    if search_snapshots.enabled:
+        return await get_offers_from_snapshot(search_id, session, page, page_size, sort_by, sort_order, filters,
+                                              keep=written)
+
     # Calculate offset for pagination
     offset = (page - 1) * page_size
     
@@ -66,7 +84,40 @@ async def get_offers_for_search(search_id: int, session, page: int = 1, page_siz
     paginated_query = base_query.offset(offset).limit(page_size)
     result = await session.execute(paginated_query)
     offers = result.scalars().all()
+    return offers_page(offers, page, page_size, total_count)
+
 
+async def get_offers_from_snapshot(search_id: int, session, page: int, page_size: int, sort_by: str,
+                                   sort_order: str, filters: dict = None, keep: bool = True):
+    """
+    Filter, sort and page a search's offers from its snapshot, only the offers on the page are read.
+    A missing or stale snapshot is built from one narrow query and kept unless keep is False
+    """
+    repository = Repository()
+    offset = (page - 1) * page_size
+    snapshot = await search_snapshots.get(search_id)
+    if snapshot is not None:
+        offer_ids, total_count = snapshot.page(filters, sort_by, sort_order, offset, page_size)
+        offers = await repository.get_offers_by_ids(offer_ids, session)
+        if snapshot.agrees_with(offer_ids, offers):
+            return offers_page(offers, page, page_size, total_count)
+        # Prices and ratings moved (or offers were deleted) since the snapshot was taken
+        await search_snapshots.delete(search_id)
+
+    snapshot = SearchSnapshot.from_rows(await repository.get_search_snapshot_rows(search_id, session))
+    # No offers may just mean ingestion hasn't committed yet (streamed searches), so those aren't kept
+    if keep and len(snapshot):
+        await search_snapshots.store(search_id, snapshot)
+
+    offer_ids, total_count = snapshot.page(filters, sort_by, sort_order, offset, page_size)
+    offers = await repository.get_offers_by_ids(offer_ids, session)
+    return offers_page(offers, page, page_size, total_count)
+
+
+def offers_page(offers, page: int, page_size: int, total_count: int) -> dict:
+    """
+    Response body for one page of offers
+    """
     if not offers:
         return {
             "offers": [],
@@ -95,17 +146,31 @@ async def get_offers_for_search(search_id: int, session, page: int = 1, page_siz
     }
 
 
+async def export_search_offers_csv(search_id: int, session_factory=None, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    CSV of all offers of a search, yielded in chunks of batch_size rows. Rows are streamed from a
+    server-side cursor on PostgreSQL, so large exports aren't held in memory.
+    Uses its own session, since it outlives the request handler.
+    """
+    session_factory = session_factory or AsyncReadSessionLocal
+    query = (
+        select(*[getattr(Offer, column) for column in EXPORT_COLUMNS])
+        .join(SearchOfferLink, Offer.id == SearchOfferLink.offer_id)
+        .where(SearchOfferLink.search_id == search_id)
+        .order_by(Offer.id)
+        .execution_options(yield_per=batch_size)
+    )
 
-
-
-
-
-
-
-
-
-
-
-
-
-
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    await search_write_behind.wait_for(key=search_id)
+    async with session_factory() as session:
+        result = await session.stream(query)
+        async for rows in result.partitions(batch_size):
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows(rows)
+            yield buffer.getvalue()
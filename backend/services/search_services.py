@@ -3,101 +3,552 @@
 Service Layer - Contains business logic and orchestration
 """
 import asyncio
-from typing import Dict, List
+import os
+import time
+from collections import Counter
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 import logging
 from backend.schemas.search_schema import SearchCreate, SearchResponse
+from backend.schemas.offer_schema import OfferBase, OfferResponse
 from backend.adapters.ebay_adapter import search_ebay
 from backend.adapters.dummyjson_adapter import search_dummyjson
 from backend.adapters.amazon_adapter import search_amazon
 from backend.services.data_transformation_service import transform_search_results
+from backend.services.offer_service import get_offers_for_search, offers_page
 from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import AsyncSessionLocal
 from backend.utils.error import ValidationError, NotFoundError, ExternalAPIError
+from backend.utils.admission import AdmissionController
+from backend.utils.circuit_breaker import get_circuit_breaker
+from backend.utils.metrics import register_collector
+from backend.utils.raw_cache import RawResponseCache, raw_response_cache
+from backend.utils.search_snapshot import SearchSnapshot, SearchSnapshotCache, search_snapshots
+from backend.utils.write_behind import SEARCH_WRITE_BEHIND, WriteBehindQueue, search_write_behind
+
+# Admission control for upstream fan-out - cached searches are never limited
+SEARCH_MAX_IN_FLIGHT = int(os.getenv("SEARCH_MAX_IN_FLIGHT", "16"))
+SEARCH_MAX_QUEUE = int(os.getenv("SEARCH_MAX_QUEUE", "32"))
+SEARCH_QUEUE_TIMEOUT_SECONDS = float(os.getenv("SEARCH_QUEUE_TIMEOUT_SECONDS", "5"))
+SEARCH_RETRY_AFTER_SECONDS = int(os.getenv("SEARCH_RETRY_AFTER_SECONDS", "2"))
+
+search_admission = AdmissionController(
+    max_in_flight=SEARCH_MAX_IN_FLIGHT,
+    max_queue=SEARCH_MAX_QUEUE,
+    queue_timeout=SEARCH_QUEUE_TIMEOUT_SECONDS,
+    retry_after=SEARCH_RETRY_AFTER_SECONDS,
+)
+register_collector("search_admission", search_admission.stats)
+
+# Per-search deadline - sources that haven't answered by then are cancelled and skipped
+SEARCH_DEADLINE_SECONDS = float(os.getenv("SEARCH_DEADLINE_SECONDS", "10"))
+
+# Offer batches waiting for the writer stage - transform waits when the writer falls behind
+SEARCH_WRITE_QUEUE_SIZE = int(os.getenv("SEARCH_WRITE_QUEUE_SIZE", "2"))
+
+SOURCES = ("ebay", "dummyjson", "amazon")
+SOURCE_LABELS = {"ebay": "eBay", "dummyjson": "DummyJSON", "amazon": "Amazon"}
+
+# How long a source's offers are reused before it is fetched again (minutes) -
+# Amazon (RapidAPI) is paid per call, DummyJSON is free and static
+SOURCE_CACHE_TTL_DEFAULTS = {"ebay": 60, "amazon": 360, "dummyjson": 1440}
+
+
+def source_cache_ttl_minutes(source: str) -> float:
+    """
+    Freshness window for a source's offers, overridable with <SOURCE>_CACHE_TTL_MINUTES
+    """
+    return float(os.getenv(f"{source.upper()}_CACHE_TTL_MINUTES", SOURCE_CACHE_TTL_DEFAULTS.get(source, 60)))
+
+# Negative caching - a source that returned nothing, failed or timed out isn't asked again
+# for the same query until this short window passes (never longer than the source's TTL)
+NEGATIVE_CACHE_TTL_MINUTES = float(os.getenv("NEGATIVE_CACHE_TTL_MINUTES", "10"))
+ERROR_CACHE_TTL_MINUTES = float(os.getenv("ERROR_CACHE_TTL_MINUTES", "1"))
+
+
+def source_cache_windows(source: str) -> Dict[str, float]:
+    """
+    Reuse window in minutes per fetch status for a source
+    """
+    ttl = source_cache_ttl_minutes(source)
+    return {
+        "ok": ttl,
+        "empty": min(ttl, NEGATIVE_CACHE_TTL_MINUTES),
+        "error": min(ttl, ERROR_CACHE_TTL_MINUTES),
+        "deadline": min(ttl, ERROR_CACHE_TTL_MINUTES),
+    }
+
+
+# Fetch statuses that mean the source was left out of a search
+FAILED_STATUSES = ("error", "deadline", "circuit_open")
+
+
+def failed_sources(fresh: Dict[str, object]) -> Dict[str, str]:
+    """
+    Reused sources whose last fetch failed, as source -> status (the search's skipped_sources)
+    """
+    return {source: fetch.status for source, fetch in fresh.items() if fetch.status in FAILED_STATUSES}
+
+# Reuse counters for /metrics
+search_cache_stats = {"full_hits": 0, "sources_reused": 0, "negative_reused": 0, "sources_fetched": 0}
+register_collector("search_cache", lambda: dict(search_cache_stats))
+
+# Full cache hits don't create a search row, so demand for cached queries is counted here
+# per (canonical_query, normalized_query) - the cache warmer reads and resets it every run
+cache_hit_counts: Counter = Counter()
+
+# Streamed searches still running - held so a search whose client disconnected isn't garbage collected
+background_searches: Set[asyncio.Task] = set()
+
+# What a source contributes when it is skipped or fails
+EMPTY_SOURCE_RESULTS = {"ebay": [], "dummyjson": [], "amazon": {"products": []}}
+
+
+def shape_source_payload(source: str, response):
+    """
+    A source's raw response in the shape transform expects
+    """
+    if source == "ebay":
+        return response.get("itemSummaries", [])
+    if source == "dummyjson":
+        response["items_filtered"] = response.get("products", [])
+    return response
+
+
+def count_source_items(source: str, payload) -> int:
+    """
+    Number of items in a source's raw payload
+    """
+    if source == "ebay":
+        return len(payload)
+    if source == "dummyjson":
+        return len(payload.get("items_filtered", []))
+    return len(payload.get("products", []))
+
+
+class SourceResults(dict):
+    """
+    Raw results per source, plus the sources that were skipped and why
+    ("circuit_open", "deadline" or "error")
+    """
+    def __init__(self, *args, skipped: Dict[str, str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skipped: Dict[str, str] = dict(skipped or {})
+
 
 class SearchService:
-    def __init__(self, repository, transform_service):
+    def __init__(self, repository, transform_service, admission: AdmissionController = None,
+                 deadline_seconds: float = None, session_factory=None, raw_cache: RawResponseCache = None,
+                 write_behind: WriteBehindQueue = None, snapshots: SearchSnapshotCache = None):
         self.repository = repository
         self.transform_service = transform_service
+        self.admission = admission or search_admission
+        self.deadline_seconds = deadline_seconds or SEARCH_DEADLINE_SECONDS
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.raw_cache = raw_cache or raw_response_cache
+        # Stage fetched offers for the background writer instead of committing them in the request
+        self.write_behind = write_behind or (search_write_behind if SEARCH_WRITE_BEHIND else None)
+        self.snapshots = snapshots or search_snapshots
+
+    async def call_source(self, source: str, query: str):
+        """
+        Call one source's adapter and return its raw response
+        """
+        if source == "ebay":
+            return await search_ebay(query)
+        if source == "dummyjson":
+            return await search_dummyjson(query)
+        if source == "amazon":
+            return await search_amazon(query)
+        raise ValidationError(f"Unknown source: {source}")
+
+    async def fetch_source(self, source: str, query: str):
+        """
+        Raw payload for one source in the shape transform expects -
+        served from the raw response cache when possible, else from the adapter
+        """
+        response = await self.raw_cache.get(source, query)
+        if response is None:
+            response = await self.call_source(source, query)
+            await self.raw_cache.set(source, query, response)
+        return shape_source_payload(source, response)
+
+    async def search_source_safe(self, source: str, query: str):
+        """
+        Search one source behind its circuit breaker, never raises.
+        Returns (source, payload, skip_reason) - skip_reason is None on success
+        """
+        label = SOURCE_LABELS[source]
+        # A cached payload costs no upstream call, so it's served even with the circuit open
+        # and doesn't count as a call in the breaker's window
+        cached = await self.raw_cache.get(source, query)
+        if cached is not None:
+            payload = shape_source_payload(source, cached)
+            logging.info(f"{label} served from the raw cache: {count_source_items(source, payload)} items")
+            return source, payload, None
+
+        breaker = get_circuit_breaker(source)
+        if not breaker.allow_request():
+            logging.warning(f"{label} circuit open (skipping)")
+            return source, EMPTY_SOURCE_RESULTS[source], "circuit_open"
+
+        start = time.perf_counter()
+        try:
+            response = await self.call_source(source, query)
+        except asyncio.CancelledError:
+            # Cancelled at the search deadline - counts against the source
+            breaker.record_failure(time.perf_counter() - start)
+            raise
+        except Exception as e:
+            breaker.record_failure(time.perf_counter() - start)
+            logging.warning(f"{label} search failed (skipping): {e}")
+            return source, EMPTY_SOURCE_RESULTS[source], "error"
+
+        breaker.record_success(time.perf_counter() - start)
+        await self.raw_cache.set(source, query, response)
+        payload = shape_source_payload(source, response)
+        logging.info(f"{label} search successful: {count_source_items(source, payload)} items")
+        return source, payload, None
+
+    async def iter_sources(self, query: str, sources: Tuple[str, ...] = SOURCES) -> AsyncIterator[Tuple[str, object, str]]:
+        """
+        Search all external sources concurrently, yielding (source, payload, skip_reason)
+        as each one completes. Sources still running at the search deadline are cancelled
+        and yielded last with an empty payload and skip_reason "deadline"
+        """
+        tasks = {
+            asyncio.create_task(self.search_source_safe(source, query)): source
+            for source in sources
+        }
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                # Keep the SOURCES order among sources that finished together
+                for task in sorted(done, key=lambda t: SOURCES.index(tasks[t])):
+                    yield task.result()
+
+            # Cancel the stragglers and wait for them to unwind
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for task in sorted(pending, key=lambda t: SOURCES.index(tasks[t])):
+                source = tasks[task]
+                logging.warning(f"{SOURCE_LABELS[source]} search exceeded the {self.deadline_seconds}s deadline (skipping)")
+                yield source, EMPTY_SOURCE_RESULTS[source], "deadline"
+        finally:
+            # Consumer stopped early - don't leave upstream calls running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
 
     async def search_all_sources(self, query: str) -> Dict[str, List[dict]]:
         """
-        Search all external sources concurrently and return raw results
-        """
-        # Search ebay
-        async def search_ebay_safe():
-            try:
-                ebay_results = await search_ebay(query)
-                ebay_items = ebay_results.get("itemSummaries", [])
-                logging.info(f"eBay search successful: {len(ebay_items)} items")
-                return ('ebay', ebay_items)
-            except Exception as e:
-                logging.warning(f"eBay search failed (skipping): {e}")
-                return ('ebay', [])
-
-        # Search dummyjson
-        async def search_dummyjson_safe():
-            try:
-                dummyjson_results = await search_dummyjson(query)
-                dummy_items = dummyjson_results.get("products", [])
-                dummyjson_results["items_filtered"] = dummy_items
-                logging.info(f"DummyJSON search successful: {len(dummy_items)} items")
-                return ('dummyjson', dummyjson_results)
-            except Exception as e:
-                logging.warning(f"DummyJSON search failed (skipping): {e}")
-                return ('dummyjson', [])
-        
-        # Search amazon
-        async def search_amazon_safe():
-            try:
-                amazon_results = await search_amazon(query)
-                logging.info(f"Amazon search successful: {len(amazon_results.get('products', []))} items")
-                return ('amazon', amazon_results)
-            except Exception as e:
-                logging.warning(f"Amazon search failed (skipping): {e}")
-                return ('amazon', {"products": []})
-
-        # Run all searches concurrently
-        tasks = [
-            search_ebay_safe(),
-            search_dummyjson_safe(),
-            search_amazon_safe()
-        ]
-        
-        # Wait for all tasks to complete
-        results_list = await asyncio.gather(*tasks)
-        
-        # Convert list of tuples back to dict
-        results = dict(results_list)
-        
-        return results
+        Search all external sources concurrently and return raw results.
+        Sources still running at the search deadline are cancelled, the ones that
+        completed are returned - skipped sources are listed in results.skipped
+        """
+        results = SourceResults()
+        async for source, payload, skip_reason in self.iter_sources(query):
+            results[source] = payload
+            if skip_reason:
+                results.skipped[source] = skip_reason
+        return SourceResults({source: results[source] for source in SOURCES}, skipped=results.skipped)
 
-    
+    async def ingest_sources(self, search, session: AsyncSession, sources: Tuple[str, ...] = SOURCES,
+                             linked: List = None) -> AsyncIterator[Tuple[str, List[dict], str]]:
+        """
+        Pipelined ingestion - fetch -> transform -> write as concurrent stages.
+        Each source is transformed as soon as it answers and handed to the writer through
+        a bounded queue (backpressure), while the other sources are still fetching.
+        Yields (source, offers_data, skip_reason) per source, and commits once at the end.
+        linked holds the offers already linked to the search, the written ones are added to it
+        and the search's snapshot is taken from the lot
+        """
+        linked = [] if linked is None else linked
+        if self.write_behind is not None:
+            async for item in self._ingest_write_behind(search, session, sources):
+                yield item
+            return
 
-    async def perform_search(self, search_data: SearchCreate, session: AsyncSession, user_id: int = None) -> SearchResponse:
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=SEARCH_WRITE_QUEUE_SIZE)
+        writer_task = asyncio.create_task(self._write_offers(write_queue, search.id, session))
+        try:
+            async for source, payload, skip_reason in self.iter_sources(search.normalized_query, sources):
+                offers_data = self.transform_service({source: payload})
+                await self._stage_offers(write_queue, (source, offers_data, skip_reason or "ok"), writer_task)
+                yield source, offers_data, skip_reason
+
+            # Drain the writer, then commit the whole search at once
+            await self._stage_offers(write_queue, None, writer_task)
+            linked.extend(await writer_task)
+            await session.commit()
+            await self.snapshots.store_offers(search.id, linked)
+        finally:
+            if not writer_task.done():
+                writer_task.cancel()
+
+    async def _ingest_write_behind(self, search, session: AsyncSession,
+                                   sources: Tuple[str, ...]) -> AsyncIterator[Tuple[str, List[dict], str]]:
         """
-        Orchestrates the search process - this is the business logic layer
+        Write-behind ingestion - each source is transformed and yielded as it answers, then the
+        search row (and any reused links) is committed and the offers are staged for the writer
         """
-        
-        # Check cache, if available in the time limit- uses cached result
-        normalized_query = self.repository.normalize_query(search_data.query)
-        cached_search = await self.repository.get_cached_offers(normalized_query, max_age_minutes=60, session=session)
+        batches = []
+        async for source, payload, skip_reason in self.iter_sources(search.normalized_query, sources):
+            offers_data = self.transform_service({source: payload})
+            batches.append((source, offers_data, skip_reason or "ok"))
+            yield source, offers_data, skip_reason
+
+        await session.commit()
+        search_id = search.id
+
+        async def write(write_session: AsyncSession):
+            for batch in batches:
+                await self._write_batch(search_id, batch, write_session)
+
+        # Tagged with the cache key, so a repeat of the query waits for these instead of refetching
+        await self.write_behind.stage(search_id, write, tags=(search.canonical_query,))
+
+    async def _write_offers(self, write_queue: asyncio.Queue, search_id: int, session: AsyncSession):
+        """
+        Writer stage - upserts staged source batches and records each fetch until it gets None,
+        returns the written offers
+        """
+        written = []
+        while True:
+            batch = await write_queue.get()
+            if batch is None:
+                return written
+            written.extend(await self._write_batch(search_id, batch, session))
+
+    async def _write_batch(self, search_id: int, batch: Tuple[str, List[dict], str], session: AsyncSession):
+        """
+        Upsert one source's offers for a search and record its fetch, without committing
+        """
+        source, offers_data, status = batch
+        offers = []
+        if offers_data:
+            offers = await self.repository.update_or_create_offer_with_history(offers_data, search_id, session, commit=False)
+        if status == "ok" and not offers_data:
+            status = "empty"
+        self.repository.record_source_fetch(search_id, source, status, len(offers_data), session)
+        return offers
+
+    @staticmethod
+    async def _stage_offers(write_queue: asyncio.Queue, batch, writer_task: asyncio.Task):
+        """
+        Put a batch on the write queue, waiting while it's full - fails if the writer died
+        """
+        put = asyncio.ensure_future(write_queue.put(batch))
+        await asyncio.wait({put, writer_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            # Writer stopped - surface its error instead of waiting forever
+            writer_task.result()
+
+    async def find_fresh_sources(self, canonical_query: str, session: AsyncSession) -> Dict[str, object]:
+        """
+        Latest fetch per source that is still within its reuse window - offers for the
+        source's TTL, empty and failed results for the shorter negative-cache windows
+        """
+        if self.write_behind is not None:
+            # Searches for the same query still in the staging area count as fresh once written
+            await self.write_behind.wait_for(tag=canonical_query)
+        windows = {source: source_cache_windows(source) for source in SOURCES}
+        fresh = await self.repository.get_fresh_source_fetches(canonical_query, windows, session)
+        search_cache_stats["sources_reused"] += len(fresh)
+        search_cache_stats["negative_reused"] += sum(1 for fetch in fresh.values() if fetch.status != "ok")
+        search_cache_stats["sources_fetched"] += len(SOURCES) - len(fresh)
+        return fresh
+
+    async def get_fully_cached_search(self, canonical_query: str, fresh: Dict[str, object], session: AsyncSession):
+        """
+        The earlier search to return as is, when every source is fresh from that same search.
+        Hits are counted per query since they create no search row the cache warmer could rank
+        """
+        search_ids = {fetch.search_id for fetch in fresh.values()}
+        if set(fresh) != set(SOURCES) or len(search_ids) != 1:
+            return None
+        search_cache_stats["full_hits"] += 1
+        search = await self.repository.get_search(search_ids.pop(), session)
+        if search is not None:
+            cache_hit_counts[(canonical_query, search.normalized_query)] += 1
+        return search
+
+    async def perform_search(self, search_data: SearchCreate, session: AsyncSession, user_id: int = None,
+                             include_offers: int = None) -> SearchResponse:
+        """
+        Orchestrates the search process - this is the business logic layer.
+        With include_offers the first page of that many offers (cheapest first) comes with the response
+        """
+        if include_offers is not None and not 1 <= include_offers <= 100:
+            raise ValidationError("include_offers must be between 1 and 100.")
+
+        # Check cache - every source has its own TTL, fresh ones are reused and only expired ones refetched.
+        # Lookups use the canonical key, so word order and punctuation variants share results
+        canonical_query = self.repository.canonical_query(search_data.query)
+        fresh = await self.find_fresh_sources(canonical_query, session)
+        cached_search = await self.get_fully_cached_search(canonical_query, fresh, session)
         if cached_search:
             print("Using cached results")
-            return SearchResponse.from_orm(cached_search)
-        
-        # Create search record with optional user association
-        search = await self.repository.create_search(search_data, session, user_id)
+            # Sources that failed within their short error window are still left out of the cached search
+            response = SearchResponse.from_orm(cached_search).copy(update={"skipped_sources": failed_sources(fresh)})
+            if include_offers:
+                response = response.copy(update=await get_offers_for_search(cached_search.id, session, 1, include_offers))
+            return response
+        stale_sources = tuple(source for source in SOURCES if source not in fresh)
 
-        # Fetch from external APIs
-        raw_data = await self.search_all_sources(search.normalized_query)
+        # Upstream fan-out is expensive, wait for a slot or shed the request
+        async with (self.admission.admit() if stale_sources else nullcontext()):
+            # Create search record with optional user association
+            search = await self.repository.create_search(search_data, session, user_id)
 
-        # Transform and validate data
-        offers_data = self.transform_service(raw_data)
+            # Link the still-fresh sources' offers to the new search, recent failures stay skipped
+            skipped_sources: Dict[str, str] = {}
+            linked = []
+            for source, fetch in fresh.items():
+                linked.extend(await self.repository.reuse_source_offers(fetch, search.id, session))
+                if fetch.status in FAILED_STATUSES:
+                    skipped_sources[source] = fetch.status
 
-        # Store results
-        await self.repository.update_or_create_offer_with_history(offers_data, search.id, session)
+            # Fetch, transform and store each expired source as it arrives
+            async for source, _, skip_reason in self.ingest_sources(search, session, stale_sources, linked):
+                if skip_reason:
+                    skipped_sources[source] = skip_reason
+
+        # Report sources left out of this search (circuit open, deadline, error)
+        response = SearchResponse.from_orm(search).copy(update={"skipped_sources": skipped_sources})
+        if include_offers:
+            response = response.copy(update=await self.first_offers_page(search, linked, include_offers, session))
+        return response
+
+    async def first_offers_page(self, search, offers: List, page_size: int, session: AsyncSession) -> dict:
+        """
+        First page of a just ingested search, from the offers ingestion still holds in memory.
+        Write-behind searches haven't written theirs yet, so those are read once written
+        """
+        if self.write_behind is not None:
+            return await get_offers_for_search(search.id, session, 1, page_size)
+        snapshot = await self.snapshots.get(search.id) or SearchSnapshot.from_offers(offers)
+        offer_ids, total_count = snapshot.page(offset=0, limit=page_size)
+        offers_by_id = {offer.id: offer for offer in offers}
+        return offers_page([offers_by_id[offer_id] for offer_id in offer_ids], 1, page_size, total_count)
+
+    async def stream_search(self, search_data: SearchCreate, user_id: int = None) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Streaming variant of perform_search - yields (event, data) pairs:
+        "search" once the search exists, "source" with each source's offers as soon as
+        that source answers (fresh cached sources first), and "done" with the search_id
+        once everything is stored.
+        The search runs in its own task and hands events over a queue, so its session and admission
+        slot are released when it's stored - not when a slow client reads the last event. A client
+        that disconnects leaves the search to finish and be cached
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._queue_search_events(search_data, user_id, events))
+        background_searches.add(producer)
+        producer.add_done_callback(background_searches.discard)
+        while True:
+            item = await events.get()
+            if item is None:
+                break
+            yield item
+        # Surface the search's error, if it failed
+        await producer
+
+    async def _queue_search_events(self, search_data: SearchCreate, user_id: Optional[int], events: asyncio.Queue):
+        """
+        Run a streamed search, putting its events on the queue and None once it's over
+        """
+        try:
+            async for item in self._search_events(search_data, user_id):
+                events.put_nowait(item)
+        finally:
+            events.put_nowait(None)
+
+    async def _search_events(self, search_data: SearchCreate, user_id: Optional[int]) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        stream_search's events, produced as fast as the search goes. Uses its own session,
+        since it outlives the request handler
+        """
+        canonical_query = self.repository.canonical_query(search_data.query)
+
+        async with self.session_factory() as session:
+            fresh = await self.find_fresh_sources(canonical_query, session)
+            cached_search = await self.get_fully_cached_search(canonical_query, fresh, session)
+            if cached_search:
+                yield "search", {"search_id": cached_search.id, "query": cached_search.query, "cached": True}
+                offers = await self.repository.get_search_offers(cached_search.id, session)
+                skipped_sources = failed_sources(fresh)
+                for source in SOURCES:
+                    source_offers = [OfferResponse.from_orm(o).dict() for o in offers if o.source == source]
+                    yield "source", {"source": source, "offers": source_offers, "count": len(source_offers),
+                                     "skipped": skipped_sources.get(source)}
+                yield "done", {"search_id": cached_search.id, "total": len(offers), "skipped_sources": skipped_sources}
+                return
+            stale_sources = tuple(source for source in SOURCES if source not in fresh)
+
+            async with (self.admission.admit() if stale_sources else nullcontext()):
+                search = await self.repository.create_search(search_data, session, user_id)
+                yield "search", {"search_id": search.id, "query": search.query, "cached": False}
+
+                skipped_sources: Dict[str, str] = {}
+                total = 0
+                linked = []
+                for source, fetch in fresh.items():
+                    offers = await self.repository.reuse_source_offers(fetch, search.id, session)
+                    linked.extend(offers)
+                    skip_reason = fetch.status if fetch.status in FAILED_STATUSES else None
+                    if skip_reason:
+                        skipped_sources[source] = skip_reason
+                    total += len(offers)
+                    yield "source", {
+                        "source": source,
+                        "offers": [OfferResponse.from_orm(o).dict() for o in offers],
+                        "count": len(offers),
+                        "skipped": skip_reason,
+                    }
+
+                async for source, offers_data, skip_reason in self.ingest_sources(search, session, stale_sources, linked):
+                    if skip_reason:
+                        skipped_sources[source] = skip_reason
+                    total += len(offers_data)
+                    yield "source", {
+                        "source": source,
+                        "offers": [OfferBase(**data).dict() for data in offers_data],
+                        "count": len(offers_data),
+                        "skipped": skip_reason,
+                    }
+
+        yield "done", {"search_id": search.id, "total": total, "skipped_sources": skipped_sources}
+
+    async def warm_query(self, query: str, sources: Tuple[str, ...], session: AsyncSession):
+        """
+        Refetch some sources of a popular query through the normal ingestion path (cache warmer).
+        The other still-fresh sources are linked too, so the warm search is a complete cache entry
+        """
+        search = await self.repository.create_search(SearchCreate(query=query), session, None, is_warmup=True)
+        windows = {source: source_cache_windows(source) for source in SOURCES}
+        fresh = await self.repository.get_fresh_source_fetches(search.canonical_query, windows, session)
+        linked = []
+        for source, fetch in fresh.items():
+            if source not in sources:
+                linked.extend(await self.repository.reuse_source_offers(fetch, search.id, session))
+
+        skipped_sources: Dict[str, str] = {}
+        async for source, _, skip_reason in self.ingest_sources(search, session, sources, linked):
+            if skip_reason:
+                skipped_sources[source] = skip_reason
+        return search, skipped_sources
 
-        return SearchResponse.from_orm(search)
-    
     async def get_recent_searches(self, session: AsyncSession, limit: int = 10) -> List[SearchResponse]:
         """
         Return most recent searches made
@@ -2,16 +2,25 @@
 """
 User Service Layer - Contains user business logic and orchestration
 """
+import os
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from backend.models.users import User, UserWatchlist
 from backend.models.offers import Offer
 from backend.schemas.user_schema import UserCreate, UserResponse, WatchlistItemCreate, WatchlistItemResponse
-from backend.utils.auth import get_password_hash, verify_password, create_access_token
+from backend.utils.auth import get_password_hash_async, verify_password_async, password_needs_rehash, create_access_token
 from backend.utils.error import ValidationError, NotFoundError
+from backend.utils.shared_cache import Cache
+from backend.utils.metrics import register_collector
 from datetime import timedelta
 
+# Profiles of recently authenticated users, keyed by user id - invalidated on user writes
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+user_cache = Cache("user", ttl=USER_CACHE_TTL_SECONDS, maxsize=USER_CACHE_SIZE)
+register_collector("user_cache", user_cache.stats)
+
 
 class UserService:
     def __init__(self):
@@ -32,7 +41,7 @@ class UserService:
             raise ValidationError("Email already exists")
         
         # Create user with hashed password
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         user = User(
             username=user_data.username,
             email=user_data.email,
@@ -45,6 +54,7 @@ class UserService:
         await session.flush()
         await session.refresh(user)
         await session.commit()
+        await self.invalidate_user_cache(user.id)
         return user
 
     async def authenticate_user(self, username: str, password: str, session: AsyncSession) -> Optional[User]:
@@ -57,9 +67,15 @@ class UserService:
             return None
         
         # Verify password, return user if valid
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         
+        # Upgrade the stored hash if the bcrypt cost changed since it was made
+        if password_needs_rehash(user.hashed_password):
+            user.hashed_password = await get_password_hash_async(password)
+            await session.commit()
+            await self.invalidate_user_cache(user.id)
+        
         return user
 
     async def create_access_token_for_user(self, user: User) -> str:
@@ -86,6 +102,30 @@ class UserService:
         result = await session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_user_response(self, user_id: int, session: AsyncSession) -> Optional[UserResponse]:
+        """
+        Get the user's profile, served from the user cache when possible
+        """
+        cached = await user_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        user = await self.get_user_by_id(user_id, session)
+        if not user:
+            return None
+
+        # Cache the detached response model, not the session-bound ORM object
+        user_response = UserResponse.from_orm(user)
+        await user_cache.set(user_id, user_response)
+        return user_response
+
+    @staticmethod
+    async def invalidate_user_cache(user_id: int) -> None:
+        """
+        Drop a user's cached profile (in every worker), call after any write to the users row
+        """
+        await user_cache.delete(user_id)
+
     async def get_user_by_username(self, username: str, session: AsyncSession) -> Optional[User]:
         """
         Get user by username
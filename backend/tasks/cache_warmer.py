@@ -0,0 +1,192 @@
+"""
+Background task to keep popular searches warm.
+
+Traffic is skewed toward a small set of queries, so instead of letting each one go cold
+when its sources expire, this task ranks recent queries by frequency and refetches the
+top ones shortly before their cached sources expire. Refreshes go through the normal
+ingestion path and are capped by a per-source hourly quota budget.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from backend.database import AsyncSessionLocal
+from backend.repositories.repository import Repository
+from backend.services.data_transformation_service import transform_search_results
+from backend.services.search_services import (
+    SOURCES, SearchService, cache_hit_counts, source_cache_ttl_minutes, source_cache_windows,
+)
+from backend.utils.metrics import register_collector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_WARM_ENABLED = os.getenv("CACHE_WARM_ENABLED", "false").lower() == "true"
+CACHE_WARM_TOP_K = int(os.getenv("CACHE_WARM_TOP_K", "50"))                       # warm-set size
+CACHE_WARM_INTERVAL_MINUTES = float(os.getenv("CACHE_WARM_INTERVAL_MINUTES", "10"))  # refresh cadence
+CACHE_WARM_LEAD_MINUTES = float(os.getenv("CACHE_WARM_LEAD_MINUTES", "15"))       # refetch this long before expiry
+CACHE_WARM_LOOKBACK_HOURS = float(os.getenv("CACHE_WARM_LOOKBACK_HOURS", "24"))   # window for ranking queries
+CACHE_WARM_MIN_SEARCHES = int(os.getenv("CACHE_WARM_MIN_SEARCHES", "3"))          # ignore queries asked for less often
+
+# Upstream calls the warmer may spend per source per hour - Amazon (RapidAPI) is paid per call
+CACHE_WARM_BUDGET_DEFAULTS = {"ebay": 200, "amazon": 20, "dummyjson": 500}
+
+
+class QuotaBudget:
+    """
+    Per-source token buckets refilled continuously up to calls_per_hour.
+    """
+
+    def __init__(self, calls_per_hour: Dict[str, float]):
+        self.calls_per_hour = calls_per_hour
+        self._tokens = dict(calls_per_hour)
+        self._updated = time.monotonic()
+        self.spent = {source: 0 for source in calls_per_hour}
+        self.denied = {source: 0 for source in calls_per_hour}
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed_hours = (now - self._updated) / 3600
+        self._updated = now
+        for source, per_hour in self.calls_per_hour.items():
+            self._tokens[source] = min(per_hour, self._tokens[source] + per_hour * elapsed_hours)
+
+    def try_spend(self, source: str) -> bool:
+        """
+        Take one call from the source's budget, False if it's used up
+        """
+        self._refill()
+        if self._tokens.get(source, 0) < 1:
+            self.denied[source] = self.denied.get(source, 0) + 1
+            return False
+        self._tokens[source] -= 1
+        self.spent[source] += 1
+        return True
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            source: {"remaining": int(self._tokens[source]), "spent": self.spent[source], "denied": self.denied[source]}
+            for source in self.calls_per_hour
+        }
+
+
+warm_budget = QuotaBudget({
+    source: float(os.getenv(f"{source.upper()}_WARM_BUDGET_PER_HOUR", default))
+    for source, default in CACHE_WARM_BUDGET_DEFAULTS.items()
+})
+
+# Outcome of the last run, for /metrics
+last_run: dict = {}
+register_collector("cache_warmer", lambda: {"last_run": dict(last_run), "budget": warm_budget.stats()})
+
+
+async def rank_popular_queries(repository: Repository, session, top_k: int) -> List[tuple]:
+    """
+    Top-K queries by recent demand, as (canonical_query, normalized_query, count).
+    Demand is user searches in the lookback window plus cache hits since the last run
+    """
+    since = datetime.utcnow() - timedelta(hours=CACHE_WARM_LOOKBACK_HOURS)
+    rows = await repository.get_popular_queries(since, top_k * 4, 1, session)
+
+    demand = {canonical: [query, count] for canonical, query, count in rows}
+    hits = dict(cache_hit_counts)
+    cache_hit_counts.clear()
+    for (canonical, query), count in hits.items():
+        demand.setdefault(canonical, [query, 0])[1] += count
+
+    ranked = sorted(
+        ((canonical, query, count) for canonical, (query, count) in demand.items() if count >= CACHE_WARM_MIN_SEARCHES),
+        key=lambda row: row[2],
+        reverse=True,
+    )
+    return ranked[:top_k]
+
+
+async def find_due_sources(repository: Repository, canonical_query: str, session,
+                           lead_minutes: float = CACHE_WARM_LEAD_MINUTES) -> List[str]:
+    """
+    Sources of a query worth refetching now: offers that expire within the lead time, or no
+    usable fetch at all. Sources inside a negative-cache window (empty/failed) are left alone
+    """
+    reusable = await repository.get_fresh_source_fetches(
+        canonical_query, {source: source_cache_windows(source) for source in SOURCES}, session
+    )
+    lasting = await repository.get_fresh_source_fetches(
+        canonical_query, {source: {"ok": source_cache_ttl_minutes(source) - lead_minutes} for source in SOURCES}, session
+    )
+    return [
+        source for source in SOURCES
+        if source not in lasting and (source not in reusable or reusable[source].status == "ok")
+    ]
+
+
+async def affordable_sources(search_service: SearchService, budget: QuotaBudget, query: str,
+                             sources: List[str]) -> Tuple[str, ...]:
+    """
+    Due sources the warmer can refetch. A source whose raw response is still cached is served
+    without an upstream call, so only the others are charged to the budget
+    """
+    affordable = []
+    for source in sources:
+        if await search_service.raw_cache.get(source, query) is not None or budget.try_spend(source):
+            affordable.append(source)
+    return tuple(affordable)
+
+
+async def warm_popular_queries(session_factory=None, search_service: Optional[SearchService] = None,
+                               budget: QuotaBudget = None, top_k: int = None) -> dict:
+    """
+    Main task - refresh the top-K recent queries whose cached sources are about to expire.
+    Runs every CACHE_WARM_INTERVAL_MINUTES via scheduler.
+    """
+    session_factory = session_factory or AsyncSessionLocal
+    budget = budget or warm_budget
+    top_k = top_k or CACHE_WARM_TOP_K
+    repository = Repository()
+    search_service = search_service or SearchService(repository=repository, transform_service=transform_search_results)
+
+    summary = {"started_at": datetime.utcnow().isoformat(), "ranked": 0, "warmed": 0, "source_fetches": 0,
+               "budget_skipped": 0, "failed": 0}
+
+    async with session_factory() as session:
+        popular = await rank_popular_queries(repository, session, top_k)
+    summary["ranked"] = len(popular)
+
+    for canonical_query, query, count in popular:
+        try:
+            # Each query gets its own session, a failure doesn't undo the others
+            async with session_factory() as session:
+                due = await find_due_sources(repository, canonical_query, session)
+                affordable = await affordable_sources(search_service, budget, query, due)
+                summary["budget_skipped"] += len(due) - len(affordable)
+                if not affordable:
+                    continue
+
+                logger.info(f"Warming '{query}' ({count} searches): {', '.join(affordable)}")
+                await search_service.warm_query(query, affordable, session)
+                summary["warmed"] += 1
+                summary["source_fetches"] += len(affordable)
+        except Exception as e:
+            logger.error(f"Error warming query '{query}': {e}")
+            summary["failed"] += 1
+
+    last_run.clear()
+    last_run.update(summary)
+    logger.info(f"Cache warming done: {summary['warmed']}/{summary['ranked']} queries warmed, "
+                f"{summary['source_fetches']} source fetches, {summary['budget_skipped']} skipped for budget")
+    return summary
+
+
+async def main():
+    """Run the cache warming task manually."""
+    await warm_popular_queries()
+
+
+if __name__ == "__main__":
+    # For manual testing
+    asyncio.run(main())
@@ -0,0 +1,201 @@
+"""
+Background task to keep the database's statistics fresh and its file from only ever growing.
+
+Retention deletes rows every night, which leaves free pages in the SQLite file and stale
+planner statistics. This task runs in the low-traffic window after retention:
+- SQLite: ANALYZE the first time, PRAGMA optimize afterwards, incremental vacuum in bounded
+  steps and a WAL checkpoint. Files created by the migrations use auto_vacuum=INCREMENTAL, older
+  ones are switched once by hand with a full VACUUM (--convert-auto-vacuum), never by the schedule.
+- PostgreSQL: VACUUM (ANALYZE) on the tables ingestion and retention churn.
+Steps that need the write lock are skipped while searches are in flight.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.database import async_engine
+from backend.services.search_services import search_admission
+from backend.utils.metrics import register_collector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DB_MAINTENANCE_ENABLED = os.getenv("DB_MAINTENANCE_ENABLED", "true").lower() == "true"
+DB_MAINTENANCE_HOUR = int(os.getenv("DB_MAINTENANCE_HOUR", "4"))                          # daily, after retention (3:30)
+DB_MAINTENANCE_VACUUM_PAGES = int(os.getenv("DB_MAINTENANCE_VACUUM_PAGES", "1000"))      # free pages released per step
+DB_MAINTENANCE_VACUUM_MAX_STEPS = int(os.getenv("DB_MAINTENANCE_VACUUM_MAX_STEPS", "50"))  # bounds one run
+DB_MAINTENANCE_PAUSE_SECONDS = float(os.getenv("DB_MAINTENANCE_PAUSE_SECONDS", "0.1"))    # between vacuum steps
+DB_MAINTENANCE_MAX_ACTIVE_SEARCHES = int(os.getenv("DB_MAINTENANCE_MAX_ACTIVE_SEARCHES", "2"))  # busier than this, skip locking steps
+
+# Tables ingestion and retention churn
+HOT_TABLES = ["searches", "search_offer_link", "search_source_fetches", "offers", "price_history"]
+
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+# Outcome of the last run, for /metrics
+last_run: dict = {}
+register_collector("db_maintenance", lambda: dict(last_run))
+
+
+def is_busy(max_active_searches: int = DB_MAINTENANCE_MAX_ACTIVE_SEARCHES) -> bool:
+    """
+    True while more searches are running than maintenance should compete with for the write lock
+    """
+    return search_admission.in_flight > max_active_searches
+
+
+async def pragma(conn, statement: str):
+    """
+    Run a PRAGMA and return its first row
+    """
+    result = await conn.execute(text(f"PRAGMA {statement}"))
+    rows = result.all() if result.returns_rows else []
+    return rows[0] if rows else None
+
+
+async def incremental_vacuum(conn, pages: int) -> None:
+    """
+    Release up to pages free pages. The pragma frees one page per step and the sqlite3 module
+    only steps a statement without results once, executescript runs it to completion
+    """
+    raw_connection = await conn.get_raw_connection()
+    await raw_connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+
+
+async def maintain_sqlite(conn, summary: dict, pages_per_step: int, max_steps: int, pause: float) -> None:
+    # Planner statistics - a full ANALYZE the first time, afterwards optimize only re-analyzes what changed
+    step_start = time.perf_counter()
+    has_stats = (await conn.execute(
+        text("SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    )).scalar()
+    await conn.execute(text("PRAGMA optimize" if has_stats else "ANALYZE"))
+    summary["analyze"] = "optimize" if has_stats else "full"
+    summary["analyze_seconds"] = round(time.perf_counter() - step_start, 3)
+
+    if is_busy():
+        summary["skipped"].extend(["vacuum", "checkpoint"])
+        return
+
+    page_size = (await pragma(conn, "page_size"))[0]
+    free_before = (await pragma(conn, "freelist_count"))[0]
+    summary["free_pages_before"] = free_before
+
+    step_start = time.perf_counter()
+    if (await pragma(conn, "auto_vacuum"))[0] != SQLITE_AUTO_VACUUM_INCREMENTAL:
+        # Converting takes a full VACUUM that rewrites the file under the write lock, not something to schedule
+        logger.warning("SQLite file isn't in incremental auto-vacuum mode, free pages are kept - convert it once with "
+                       "python -m backend.tasks.db_maintenance --convert-auto-vacuum")
+        summary["skipped"].append("vacuum")
+    else:
+        for _ in range(max_steps):
+            if (await pragma(conn, "freelist_count"))[0] == 0 or is_busy():
+                break
+            await incremental_vacuum(conn, pages_per_step)
+            summary["vacuum_steps"] += 1
+            await asyncio.sleep(pause)
+    summary["vacuum_seconds"] = round(time.perf_counter() - step_start, 3)
+
+    free_after = (await pragma(conn, "freelist_count"))[0]
+    summary["pages_reclaimed"] = max(0, free_before - free_after)
+    summary["bytes_reclaimed"] = summary["pages_reclaimed"] * page_size
+    summary["free_pages_after"] = free_after
+
+    # Fold the WAL back into the database and truncate it
+    busy, wal_pages, checkpointed = await pragma(conn, "wal_checkpoint(TRUNCATE)")
+    summary["checkpoint"] = {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed": checkpointed}
+
+
+async def maintain_postgres(conn, summary: dict, tables: List[str]) -> None:
+    dead_tuples = (await conn.execute(
+        text("SELECT relname, n_dead_tup FROM pg_stat_user_tables WHERE relname = ANY(:tables)"),
+        {"tables": tables},
+    )).all()
+    summary["dead_tuples_before"] = {name: count for name, count in dead_tuples}
+    summary["analyze"] = "vacuum_analyze"
+
+    for table in tables:
+        if is_busy():
+            summary["skipped"].append(f"vacuum {table}")
+            continue
+        step_start = time.perf_counter()
+        await conn.execute(text(f'VACUUM (ANALYZE) "{table}"'))
+        summary["tables"][table] = round(time.perf_counter() - step_start, 3)
+
+
+async def run_db_maintenance(engine: Optional[AsyncEngine] = None, pages_per_step: int = None,
+                             max_steps: int = None, pause: float = None) -> dict:
+    """
+    Main task - refresh planner statistics, release free pages in bounded steps, checkpoint the WAL.
+    Runs daily at DB_MAINTENANCE_HOUR via scheduler.
+    """
+    engine = engine or async_engine
+    pages_per_step = pages_per_step or DB_MAINTENANCE_VACUUM_PAGES
+    max_steps = max_steps or DB_MAINTENANCE_VACUUM_MAX_STEPS
+    pause = DB_MAINTENANCE_PAUSE_SECONDS if pause is None else pause
+    start = time.perf_counter()
+    summary = {"started_at": datetime.utcnow().isoformat(), "dialect": engine.dialect.name, "skipped": [],
+               "vacuum_steps": 0, "pages_reclaimed": 0, "bytes_reclaimed": 0, "tables": {}}
+
+    # VACUUM can't run inside a transaction
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if engine.dialect.name == "sqlite":
+            await maintain_sqlite(conn, summary, pages_per_step, max_steps, pause)
+        elif engine.dialect.name == "postgresql":
+            await maintain_postgres(conn, summary, HOT_TABLES)
+        else:
+            summary["skipped"].append("unsupported dialect")
+
+    summary["duration_seconds"] = round(time.perf_counter() - start, 3)
+    last_run.clear()
+    last_run.update(summary)
+    logger.info(f"Database maintenance done in {summary['duration_seconds']}s: {summary['pages_reclaimed']} pages "
+                f"reclaimed, {summary['vacuum_steps']} vacuum steps"
+                + (f", skipped {', '.join(summary['skipped'])}" if summary["skipped"] else ""))
+    return summary
+
+
+async def convert_to_incremental_vacuum(engine: Optional[AsyncEngine] = None) -> dict:
+    """
+    One-off - switch an existing SQLite file to incremental auto-vacuum. Takes one full VACUUM,
+    which rewrites the whole file and holds the write lock until done, so run it in a maintenance window
+    """
+    engine = engine or async_engine
+    if engine.dialect.name != "sqlite":
+        return {"converted": False, "reason": "not sqlite"}
+
+    start = time.perf_counter()
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if (await pragma(conn, "auto_vacuum"))[0] == SQLITE_AUTO_VACUUM_INCREMENTAL:
+            return {"converted": False, "reason": "already incremental"}
+        await pragma(conn, "auto_vacuum=INCREMENTAL")
+        await conn.execute(text("VACUUM"))
+    summary = {"converted": True, "duration_seconds": round(time.perf_counter() - start, 3)}
+    logger.info(f"Switched to incremental auto-vacuum in {summary['duration_seconds']}s")
+    return summary
+
+
+async def main():
+    """Run the maintenance task manually, or the one-off auto-vacuum conversion."""
+    parser = argparse.ArgumentParser(description="Database maintenance")
+    parser.add_argument("--convert-auto-vacuum", action="store_true",
+                        help="switch an existing SQLite file to incremental auto-vacuum (one full VACUUM)")
+    args = parser.parse_args()
+    if args.convert_auto_vacuum:
+        await convert_to_incremental_vacuum()
+    else:
+        await run_db_maintenance()
+
+
+if __name__ == "__main__":
+    # For manual testing
+    asyncio.run(main())
@@ -2,7 +2,8 @@
 Background task to track prices for watchlist items.
 
 This task polls external APIs to get current prices for items in user watchlists
-and updates the price history accordingly.
+and updates the price history accordingly. Adapter calls go through the same
+per-source adaptive limiters as live searches, so together they stay within quota.
 """
 
 import asyncio
@@ -18,6 +19,7 @@ from backend.models.offers import Offer
 from backend.models.pricehistory import PriceHistory
 from backend.models.search_offer_link import SearchOfferLink  # Import to resolve relationships
 from backend.models.searches import Search  # Import to resolve relationships
+from backend.models.search_source_fetch import SearchSourceFetch  # Import to resolve relationships
 from backend.adapters.ebay_adapter import search_ebay, ebay_to_offer
 from backend.adapters.dummyjson_adapter import search_dummyjson, dummyjson_to_offer
 from backend.adapters.amazon_adapter import search_amazon, amazon_to_offer
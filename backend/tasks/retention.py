@@ -0,0 +1,125 @@
+"""
+Background task to delete old searches and the offers nothing points at anymore.
+
+Every cache-miss search adds a Search row with one link and one price history row per offer,
+and nothing else removes them. This task deletes anonymous searches older than the retention
+window (with their links and source fetches), then offers that are no longer linked to any
+search, not on a watchlist and not seen recently (with their price history). Deletes run in
+small batches, each in its own short transaction, so ingestion isn't blocked for long.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from backend.database import AsyncSessionLocal
+from backend.repositories.repository import Repository
+from backend.utils.metrics import register_collector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "false").lower() == "true"
+RETENTION_SEARCH_DAYS = float(os.getenv("RETENTION_SEARCH_DAYS", "30"))    # anonymous searches older than this are deleted
+RETENTION_OFFER_DAYS = float(os.getenv("RETENTION_OFFER_DAYS", "30"))      # unlinked offers not seen for this long are deleted
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))       # rows selected per delete transaction
+RETENTION_PAUSE_SECONDS = float(os.getenv("RETENTION_PAUSE_SECONDS", "0.05"))  # between batches, lets writers in
+
+# Outcome of the last run, for /metrics
+last_run: dict = {}
+register_collector("retention", lambda: dict(last_run))
+
+
+def add_counts(totals: Dict[str, int], deleted: Dict[str, int]) -> None:
+    for table, count in deleted.items():
+        totals[table] = totals.get(table, 0) + count
+
+
+async def purge_in_batches(session_factory, select_ids, delete_ids, batch_size: int, pause: float,
+                           totals: Dict[str, int]) -> int:
+    """
+    Select up to batch_size ids and delete them in one transaction, until none are left.
+    Returns the number of batches run
+    """
+    batches = 0
+    while True:
+        async with session_factory() as session:
+            ids = await select_ids(batch_size, session)
+            if not ids:
+                return batches
+            add_counts(totals, await delete_ids(ids, session))
+            await session.commit()
+        batches += 1
+        if len(ids) < batch_size:
+            return batches
+        await asyncio.sleep(pause)
+
+
+async def purge_expired_data(session_factory=None, search_days: float = None, offer_days: float = None,
+                             batch_size: int = None, pause: float = None) -> dict:
+    """
+    Main task - delete expired searches, then orphaned offers, and report what was reclaimed.
+    Runs daily via scheduler.
+    """
+    session_factory = session_factory or AsyncSessionLocal
+    search_days = RETENTION_SEARCH_DAYS if search_days is None else search_days
+    offer_days = RETENTION_OFFER_DAYS if offer_days is None else offer_days
+    batch_size = batch_size or RETENTION_BATCH_SIZE
+    pause = RETENTION_PAUSE_SECONDS if pause is None else pause
+    repository = Repository()
+    start = time.perf_counter()
+
+    async with session_factory() as session:
+        bytes_before = await repository.get_database_used_bytes(session)
+
+    now = datetime.utcnow()
+    searches_before = now - timedelta(days=search_days)
+    offers_before = now - timedelta(days=offer_days)
+    deleted: Dict[str, int] = {}
+
+    # Searches go first - their links are what keeps offers alive
+    search_batches = await purge_in_batches(
+        session_factory,
+        lambda limit, session: repository.get_expired_search_ids(searches_before, limit, session),
+        repository.delete_searches,
+        batch_size, pause, deleted,
+    )
+    offer_batches = await purge_in_batches(
+        session_factory,
+        lambda limit, session: repository.get_orphan_offer_ids(offers_before, limit, session),
+        # The delete re-checks the orphan conditions, ingestion may have linked an offer since it was selected
+        lambda ids, session: repository.delete_offers(ids, offers_before, session),
+        batch_size, pause, deleted,
+    )
+
+    async with session_factory() as session:
+        bytes_after = await repository.get_database_used_bytes(session)
+
+    summary = {
+        "started_at": now.isoformat(),
+        "deleted": deleted,
+        "rows_deleted": sum(deleted.values()),
+        "batches": search_batches + offer_batches,
+        # Pages freed for reuse - the file itself only shrinks on VACUUM
+        "bytes_reclaimed": max(0, bytes_before - bytes_after) if bytes_before is not None else None,
+        "duration_seconds": round(time.perf_counter() - start, 3),
+    }
+    last_run.clear()
+    last_run.update(summary)
+    logger.info(f"Retention done: {summary['rows_deleted']} rows deleted in {summary['batches']} batches "
+                f"({', '.join(f'{table}={count}' for table, count in deleted.items()) or 'nothing expired'}), "
+                f"{summary['bytes_reclaimed']} bytes reclaimed")
+    return summary
+
+
+async def main():
+    """Run the retention task manually."""
+    await purge_expired_data()
+
+
+if __name__ == "__main__":
+    # For manual testing
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+# backend/utils/admission.py
+"""
+Admission control - bounds how much expensive work runs at once and sheds the excess
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from backend.utils.error import ServiceOverloadedError
+
+
+class AdmissionController:
+    """
+    Allows at most max_in_flight concurrent holders, with a bounded wait queue.
+    Requests beyond the queue, or waiting longer than queue_timeout, fail fast with ServiceOverloadedError.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int = 1):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        raise ServiceOverloadedError(f"Search capacity exceeded ({reason}), please retry shortly",
+                                     retry_after=self.retry_after)
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Hold a slot for the duration of the block
+        """
+        if not self._semaphore.locked():
+            # Free slot - acquire returns immediately
+            await self._semaphore.acquire()
+        else:
+            # Queue is full - don't even wait
+            if self.waiting >= self.max_queue:
+                self._reject("queue full")
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject("queue timeout")
+            finally:
+                self.waiting -= 1
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
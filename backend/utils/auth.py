@@ -2,6 +2,9 @@
 """
 Authentication utilities - JWT token handling and password security
 """
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -9,9 +12,17 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import os
+from backend.utils.shared_cache import Cache
+from backend.utils.metrics import register_collector
 
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing configuration - changing BCRYPT_ROUNDS rehashes users transparently on their next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt is CPU bound (~100-300ms per call), so async handlers run it on a bounded pool
+# instead of blocking the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
 
 # JWT configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")  # should be in .env file
@@ -21,6 +32,11 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Security scheme for FastAPI
 security = HTTPBearer()
 
+# Verified token payloads, so authenticated calls skip the signature check - entries never outlive the token
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+token_cache = Cache("token", ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60, maxsize=TOKEN_CACHE_SIZE)
+register_collector("token_cache", token_cache.stats)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -36,6 +52,33 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check if a hash was made with outdated settings (e.g. a different bcrypt cost)
+    """
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except ValueError:
+        # Unknown hash format, nothing we can upgrade
+        return False
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the password hashing pool, without blocking the event loop
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the password hashing pool, without blocking the event loop
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token with user data
@@ -57,18 +100,27 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[dict]:
+async def verify_token(token: str) -> Optional[dict]:
     """
     Verify and decode a JWT token
     Returns the payload if valid, None if invalid
     """
+    # Already verified and not yet expired
+    cached = await token_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
         # Decode the token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
 
+    # Cache until the token expires (tokens without exp use the default TTL)
+    expires_in = payload["exp"] - time.time() if "exp" in payload else token_cache.ttl
+    await token_cache.set(token, payload, ttl=min(expires_in, token_cache.ttl))
+    return payload
+
 
 async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Optional[int]:
     """
@@ -77,7 +129,7 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
     """
     try:
         # Verify the token
-        payload = verify_token(credentials.credentials)
+        payload = await verify_token(credentials.credentials)
         if payload is None:
             return None
         
@@ -97,7 +149,7 @@ async def require_current_user_id(credentials: HTTPAuthorizationCredentials = De
     """
     try:
         # Verify the token
-        payload = verify_token(credentials.credentials)
+        payload = await verify_token(credentials.credentials)
         
         # If no valid token, raise 401
         if payload is None:
@@ -0,0 +1,100 @@
+# backend/utils/cache.py
+"""
+In-process caching utilities - small LRU cache with per-entry TTL and hit/miss counters
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded LRU cache where every entry also expires after its TTL (in seconds).
+    Not shared between workers, use it for data that is cheap to rebuild.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value or default if missing/expired
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            # Expired - drop it and count as a miss
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        # Mark as most recently used
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove a single entry (no-op if missing)
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all entries, counters are kept
+        """
+        self._data.clear()
+
+    def values(self) -> list:
+        """
+        Values of all entries that haven't expired
+        """
+        now = time.monotonic()
+        return [value for value, expires_at in self._data.values() if expires_at > now]
+
+    def keys(self) -> list:
+        """
+        Keys of all entries, expired ones included until they're looked up or evicted
+        """
+        return list(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def stats(self) -> dict:
+        """
+        Size and hit-rate counters for monitoring
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
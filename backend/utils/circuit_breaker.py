@@ -0,0 +1,137 @@
+# backend/utils/circuit_breaker.py
+"""
+Per-source circuit breakers - stop calling an upstream that keeps failing or timing out,
+and probe it again after a cool-down
+"""
+import os
+import time
+from collections import deque
+from typing import Dict
+
+from backend.utils.metrics import register_collector
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKER_WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW_SIZE", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "8"))
+BREAKER_SLOW_CALL_RATE = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker driven by rolling error and latency windows.
+
+    - closed: calls pass, outcomes go into a window of the last window_size calls.
+      Once min_calls are recorded, a failure rate or slow-call rate over its threshold opens it.
+    - open: calls are rejected until open_seconds have passed.
+    - half_open: a single probe call is let through, success closes, failure re-opens.
+    """
+
+    def __init__(self, name: str, window_size: int = BREAKER_WINDOW_SIZE, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate_threshold: float = BREAKER_FAILURE_RATE,
+                 slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+                 slow_call_rate_threshold: float = BREAKER_SLOW_CALL_RATE,
+                 open_seconds: float = BREAKER_OPEN_SECONDS):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._window: deque = deque(maxlen=window_size)   # (failed, slow) per call
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        """
+        Whether a call may go to the upstream now
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+
+        return True
+
+    def record_success(self, latency: float) -> None:
+        if self.state == HALF_OPEN:
+            self._close()
+            return
+        self._record(failed=False, latency=latency)
+
+    def record_failure(self, latency: float) -> None:
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._record(failed=True, latency=latency)
+
+    def _record(self, failed: bool, latency: float) -> None:
+        self._window.append((failed, latency >= self.slow_call_seconds))
+        if self.state != CLOSED or len(self._window) < self.min_calls:
+            return
+        calls = len(self._window)
+        failure_rate = sum(1 for failed_call, _ in self._window if failed_call) / calls
+        slow_rate = sum(1 for _, slow in self._window if slow) / calls
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.times_opened += 1
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._window.clear()
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        calls = len(self._window)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": round(sum(1 for f, _ in self._window if f) / calls, 3) if calls else 0.0,
+            "slow_rate": round(sum(1 for _, s in self._window if s) / calls, 3) if calls else 0.0,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(source: str) -> CircuitBreaker:
+    """
+    Shared breaker for a source, created on first use
+    """
+    breaker = _breakers.get(source)
+    if breaker is None:
+        breaker = CircuitBreaker(source)
+        _breakers[source] = breaker
+        register_collector(f"breaker_{source}", breaker.stats)
+    return breaker
+
+
+def reset_circuit_breakers() -> None:
+    """
+    Close every breaker and forget its history
+    """
+    for breaker in _breakers.values():
+        breaker._close()
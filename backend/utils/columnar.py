@@ -0,0 +1,117 @@
+# backend/utils/columnar.py
+"""
+Columnar result sets - a cached list of offers held as NumPy arrays (id, price, rating, source code).
+Filters are boolean masks over whole columns, and the price and rating orders (both directions) are
+argsorted once when the set is built, so a filtered, sorted page is a mask lookup and a slice.
+
+Semantics follow get_offers_for_search's SQL: missing prices and ratings (NaN here) sort last in
+either direction and never pass a price or rating filter, ties keep offer id order.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Columns results can be sorted by, anything else keeps offer id order
+SORT_COLUMNS = ("last_price", "rating")
+SORT_ORDERS = ("asc", "desc")
+
+
+def float_column(values: Sequence) -> np.ndarray:
+    """
+    float64 array with None as NaN
+    """
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+
+
+class ColumnarResultSet:
+    """
+    Offers as columns in offer id order, with the sort orders precomputed
+    """
+
+    def __init__(self, ids: Sequence[int], prices: Sequence, ratings: Sequence, sources: Sequence[str]):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.prices = prices if isinstance(prices, np.ndarray) else float_column(prices)
+        self.ratings = ratings if isinstance(ratings, np.ndarray) else float_column(ratings)
+        # Sources as small integer codes into source_names
+        names, codes = np.unique(np.asarray(sources, dtype=object).astype(str), return_inverse=True)
+        self.source_names: Tuple[str, ...] = tuple(names)
+        self.source_codes = codes.astype(np.int16)
+        self.orders: Dict[Tuple[str, str], np.ndarray] = {
+            (column, direction): self._argsort(column, direction)
+            for column in SORT_COLUMNS for direction in SORT_ORDERS
+        }
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]):
+        """
+        Result set of (offer_id, price, rating, source) rows - an offer listed twice is kept once
+        """
+        unique = sorted({row[0]: row for row in rows}.values(), key=lambda row: row[0])
+        return cls([row[0] for row in unique], [row[1] for row in unique],
+                   [row[2] for row in unique], [row[3] for row in unique])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getstate__(self):
+        # Orders are rebuilt on load, only the columns are pickled
+        return self.ids, self.prices, self.ratings, np.array(self.source_names, dtype=object)[self.source_codes]
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def _argsort(self, column: str, direction: str) -> np.ndarray:
+        values = self.prices if column == "last_price" else self.ratings
+        # NaN sorts last either way (-NaN is NaN), a stable sort keeps ties in offer id order
+        keys = -values if direction == "desc" else values
+        return np.argsort(keys, kind="stable").astype(np.int32)
+
+    def mask(self, filters: dict = None) -> Optional[np.ndarray]:
+        """
+        Rows passing the price range, source and minimum rating filters, None when nothing filters
+        """
+        filters = filters or {}
+        min_price, max_price = filters.get("price") or (None, None)
+        source = filters.get("source")
+        min_rating = filters.get("min_rating")
+
+        mask = None
+        # Comparisons with NaN are False, so missing values drop out like SQL NULLs
+        for condition in (
+            self.prices >= min_price if min_price is not None else None,
+            self.prices <= max_price if max_price is not None else None,
+            self._source_mask(source) if source else None,
+            self.ratings >= min_rating if min_rating is not None else None,
+        ):
+            if condition is not None:
+                mask = condition if mask is None else mask & condition
+        return mask
+
+    def _source_mask(self, source: str) -> np.ndarray:
+        if source not in self.source_names:
+            return np.zeros(len(self.ids), dtype=bool)
+        return self.source_codes == self.source_names.index(source)
+
+    def ordered(self, filters: dict = None, sort_by: str = "last_price", sort_order: str = "asc") -> np.ndarray:
+        """
+        Row positions passing the filters, in sort order
+        """
+        order = self.orders.get((sort_by, sort_order))
+        if order is None:
+            order = self.orders[(sort_by, "asc")] if sort_by in SORT_COLUMNS else np.arange(len(self.ids), dtype=np.int32)
+        mask = self.mask(filters)
+        return order if mask is None else order[mask[order]]
+
+    def select(self, filters: dict = None, sort_by: str = "last_price", sort_order: str = "asc") -> List[int]:
+        """
+        Ids of every offer passing the filters, in sort order
+        """
+        return self.ids[self.ordered(filters, sort_by, sort_order)].tolist()
+
+    def page(self, filters: dict = None, sort_by: str = "last_price", sort_order: str = "asc",
+             offset: int = 0, limit: int = 20) -> Tuple[List[int], int]:
+        """
+        Ids on one page of the filtered, sorted offers, and how many offers passed the filters
+        """
+        rows = self.ordered(filters, sort_by, sort_order)
+        return self.ids[rows[offset:offset + limit]].tolist(), len(rows)
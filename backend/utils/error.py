@@ -2,10 +2,29 @@ import logging
 from fastapi import HTTPException
 from sqlalchemy.exc import SQLAlchemyError
 
-class ExternalAPIError(Exception): pass
+class ExternalAPIError(Exception):
+    """
+    Raised when an upstream API call fails
+    status_code: upstream HTTP status (None when upstream didn't answer, or the failure was local)
+    retry_after: seconds from the upstream Retry-After header, if any
+    """
+    def __init__(self, message: str = "External API error", status_code: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
 class NotFoundError(Exception): pass
 class ValidationError(Exception): pass
 
+class ServiceOverloadedError(Exception):
+    """
+    Raised when a request is shed because the service is at capacity
+    retry_after: seconds the client should wait before retrying
+    """
+    def __init__(self, message: str = "Service overloaded", retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 def handle_api_errors(func):
     """
     Decorator for FastAPI endpoints to handle and log errors consistently.
@@ -22,6 +41,9 @@ def handle_api_errors(func):
         except ExternalAPIError as e:
             logging.error(f"External API error: {e}")
             raise HTTPException(status_code=502, detail="External service error: " + str(e))
+        except ServiceOverloadedError as e:
+            logging.warning(f"Load shed: {e}")
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
         except SQLAlchemyError as e:
             logging.error(f"Database error: {e}")
             raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
@@ -0,0 +1,141 @@
+# backend/utils/hedging.py
+"""
+Hedged upstream requests - when a call runs longer than the source's rolling p95,
+a second identical request is sent and whichever answers first wins.
+A token budget keeps the extra requests to a small share of the total.
+"""
+import asyncio
+import functools
+import os
+from collections import deque
+from typing import Dict, Optional
+
+from backend.utils.metrics import register_collector
+
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.05"))     # at most ~5% extra requests
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))           # latencies needed before hedging
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.05"))
+
+
+class Hedger:
+    """
+    Tracks a source's latency distribution and hedges calls slower than its p95.
+    """
+
+    def __init__(self, name: str, budget_ratio: float = HEDGE_BUDGET_RATIO, window_size: int = 200,
+                 min_samples: int = HEDGE_MIN_SAMPLES, min_delay: float = HEDGE_MIN_DELAY_SECONDS,
+                 max_tokens: float = 10.0, enabled: bool = True):
+        self.name = name
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_tokens = max_tokens
+        self.enabled = enabled
+        self._latencies: deque = deque(maxlen=window_size)
+        self._tokens = 0.0          # each request earns budget_ratio tokens, a hedge spends one
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Rolling p95 latency, None until there are enough samples
+        """
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return max(self.min_delay, p95)
+
+    async def run(self, call_factory):
+        """
+        Run call_factory(), hedging it with a second call if it exceeds the p95 delay
+        """
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.budget_ratio)
+        delay = self.hedge_delay() if self.enabled else None
+        start = loop.time()
+
+        primary = asyncio.ensure_future(call_factory())
+        tasks = [primary]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.hedges += 1
+                        tasks.append(asyncio.ensure_future(call_factory()))
+                    else:
+                        self.budget_denied += 1
+
+            winner = await self._first_success(tasks)
+            if winner is not primary:
+                self.hedge_wins += 1
+            result = winner.result()
+            self._latencies.append(loop.time() - start)
+            return result
+        finally:
+            # Cancel the loser (or everything, if we were cancelled ourselves)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    @staticmethod
+    async def _first_success(tasks):
+        """
+        First task to complete successfully, or the last failure if all of them fail
+        """
+        pending = set(tasks)
+        failed = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task
+                failed = task
+        return failed
+
+    def stats(self) -> dict:
+        delay = self.hedge_delay()
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "win_rate": round(self.hedge_wins / self.hedges, 4) if self.hedges else 0.0,
+            "budget_denied": self.budget_denied,
+            "p95_ms": round(delay * 1000, 1) if delay is not None else None,
+        }
+
+
+_hedgers: Dict[str, Hedger] = {}
+
+
+def get_hedger(source: str) -> Hedger:
+    """
+    Shared hedger for a source, created on first use
+    """
+    hedger = _hedgers.get(source)
+    if hedger is None:
+        hedger = Hedger(source, enabled=HEDGE_ENABLED)
+        _hedgers[source] = hedger
+        register_collector(f"hedge_{source}", hedger.stats)
+    return hedger
+
+
+def hedged(source: str):
+    """
+    Decorator for adapter calls - hedges slow calls when HEDGE_ENABLED is set.
+    Put it above source_limited so every attempt takes its own limiter slot.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await get_hedger(source).run(lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
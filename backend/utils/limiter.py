@@ -0,0 +1,233 @@
+# backend/utils/limiter.py
+"""
+Adaptive (AIMD) concurrency limits for upstream sources.
+
+Every adapter call goes through its source's limiter, so live searches and the
+price tracker share one budget per source. The limit grows additively while
+latency stays stable and backs off multiplicatively on 429, 5xx, timeouts or
+latency spikes. Other failures (4xx, local errors such as missing credentials or
+transform bugs) say nothing about upstream load and leave the limit alone.
+A Retry-After from upstream pauses new calls.
+"""
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from backend.utils.error import ExternalAPIError
+from backend.utils.metrics import register_collector
+
+# Per-source bounds - Amazon (RapidAPI) is paid per call, DummyJSON is free
+SOURCE_LIMIT_DEFAULTS = {
+    "ebay": {"initial": 4, "max": 16},
+    "amazon": {"initial": 2, "max": 4},
+    "dummyjson": {"initial": 8, "max": 32},
+}
+LIMITER_BACKOFF_RATIO = float(os.getenv("LIMITER_BACKOFF_RATIO", "0.5"))
+LIMITER_LATENCY_TOLERANCE = float(os.getenv("LIMITER_LATENCY_TOLERANCE", "2.0"))
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+def is_timeout(error: Optional[BaseException]) -> bool:
+    """
+    Whether a failure is a timeout, raised directly or wrapped by an adapter
+    """
+    while error is not None:
+        if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+            return True
+        error = error.__cause__
+    return False
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta seconds or HTTP date) into seconds, capped
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(0.0, min(seconds, MAX_RETRY_AFTER_SECONDS))
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter for one upstream source.
+    """
+
+    def __init__(self, name: str, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 16,
+                 backoff_ratio: float = LIMITER_BACKOFF_RATIO, latency_tolerance: float = LIMITER_LATENCY_TOLERANCE,
+                 smoothing: float = 0.1):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None   # EWMA of successful call latency
+        self.blocked_until = 0.0                         # monotonic time set from Retry-After
+        self._waiters: deque = deque()
+        self.successes = 0
+        self.backoffs = 0
+
+    async def acquire(self):
+        """
+        Wait until a slot is free under the current limit (and any Retry-After has passed)
+        """
+        while True:
+            pause = self.blocked_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.in_flight < max(self.min_limit, int(self.limit)):
+                self.in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # We were woken but won't use the slot, pass it on
+                    self._wake_waiters()
+                raise
+
+    def release(self, latency: float, overloaded: bool = False, retry_after: Optional[float] = None):
+        """
+        Free the slot and adapt the limit from the call's outcome
+        """
+        self.in_flight -= 1
+
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+        spike = (
+            self.baseline_latency is not None
+            and latency > self.baseline_latency * self.latency_tolerance
+        )
+        if overloaded or spike:
+            # Multiplicative decrease
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+            self.backoffs += 1
+            logging.info(f"[{self.name}] limiter backing off to {self.limit:.2f} "
+                         f"({'overload' if overloaded else 'latency spike'})")
+        else:
+            # Additive increase - about +1 per full window of successful calls
+            self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+            self.successes += 1
+
+        # Track the latency baseline from answered calls, slowly so a lasting shift is learned
+        if not overloaded:
+            if self.baseline_latency is None:
+                self.baseline_latency = latency
+            else:
+                self.baseline_latency += self.smoothing * (latency - self.baseline_latency)
+
+        self._wake_waiters()
+
+    def abandon(self):
+        """
+        Free the slot without adapting the limit - the call said nothing about the upstream
+        """
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        free = max(self.min_limit, int(self.limit)) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold a slot for one upstream call, classifying the outcome on exit
+        """
+        await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Cancelled by the caller (deadline/hedge) - says nothing about the upstream
+            self.abandon()
+            raise
+        except ExternalAPIError as e:
+            if e.status_code is not None:
+                # Answered - 429/5xx mean the upstream is struggling, other codes don't
+                overloaded = e.status_code == 429 or e.status_code >= 500
+                self.release(time.perf_counter() - start, overloaded, e.retry_after)
+            elif is_timeout(e):
+                self.release(time.perf_counter() - start, overloaded=True)
+            else:
+                self.abandon()
+            raise
+        except Exception as e:
+            if is_timeout(e):
+                self.release(time.perf_counter() - start, overloaded=True)
+            else:
+                self.abandon()
+            raise
+        else:
+            self.release(time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "baseline_latency_ms": round(self.baseline_latency * 1000, 1) if self.baseline_latency else None,
+            "blocked_for_s": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+            "successes": self.successes,
+            "backoffs": self.backoffs,
+        }
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+
+def get_source_limiter(source: str) -> AdaptiveConcurrencyLimiter:
+    """
+    Shared limiter for a source, created on first use
+    """
+    limiter = _limiters.get(source)
+    if limiter is None:
+        defaults = SOURCE_LIMIT_DEFAULTS.get(source, {"initial": 4, "max": 16})
+        limiter = AdaptiveConcurrencyLimiter(
+            name=source,
+            initial_limit=int(os.getenv(f"{source.upper()}_INITIAL_CONCURRENCY", defaults["initial"])),
+            max_limit=int(os.getenv(f"{source.upper()}_MAX_CONCURRENCY", defaults["max"])),
+        )
+        _limiters[source] = limiter
+        register_collector(f"limiter_{source}", limiter.stats)
+    return limiter
+
+
+def source_limited(source: str):
+    """
+    Decorator for adapter calls - runs each call inside the source's adaptive limiter
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with get_source_limiter(source).slot():
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,30 @@
+# backend/utils/metrics.py
+"""
+Lightweight metrics registry - components register a collector that returns a dict of stats,
+and GET /metrics returns all of them in one snapshot
+"""
+import logging
+from typing import Callable, Dict
+
+_collectors: Dict[str, Callable[[], dict]] = {}
+
+
+def register_collector(name: str, collector: Callable[[], dict]) -> None:
+    """
+    Register (or replace) a stats collector under a name
+    """
+    _collectors[name] = collector
+
+
+def collect() -> Dict[str, dict]:
+    """
+    Snapshot of every registered collector, a failing collector doesn't break the others
+    """
+    snapshot = {}
+    for name, collector in _collectors.items():
+        try:
+            snapshot[name] = collector()
+        except Exception as e:
+            logging.error(f"Metrics collector '{name}' failed: {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
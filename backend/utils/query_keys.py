@@ -0,0 +1,101 @@
+# backend/utils/query_keys.py
+"""
+Canonical query keys - "iPhone 15 Pro", "iphone15 pro" and "pro iphone 15" all map to one key,
+so they share cached results and deal groups.
+
+Pipeline: Unicode NFKC -> lowercase -> strip punctuation -> split letters from digits ->
+spelling and synonym maps -> dedupe and sort tokens.
+The maps are optional and come from a JSON vocabulary built by
+`python scripts/canonical_queries.py vocabulary`.
+"""
+import difflib
+import json
+import logging
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional
+
+QUERY_VOCABULARY_PATH = os.getenv("QUERY_VOCABULARY_PATH", "./query_vocabulary.json")
+
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_LETTER_DIGIT = re.compile(r"(?<=[^\W\d_])(?=\d)|(?<=\d)(?=[^\W\d_])")
+
+_vocabulary: Optional[dict] = None
+
+
+def tokenize_query(query: str) -> List[str]:
+    """
+    Query -> normalized tokens, before any vocabulary maps
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    text = _LETTER_DIGIT.sub(" ", text)
+    return text.split()
+
+
+def canonicalize_query(query: str, vocabulary: Optional[dict] = None) -> str:
+    """
+    Canonical cache key for a query, uses the loaded vocabulary unless one is given
+    """
+    vocabulary = get_query_vocabulary() if vocabulary is None else vocabulary
+    spellings = vocabulary.get("spellings", {})
+    synonyms = vocabulary.get("synonyms", {})
+
+    tokens = set()
+    for token in tokenize_query(query):
+        token = spellings.get(token, token)
+        tokens.add(synonyms.get(token, token))
+    return " ".join(sorted(tokens))
+
+
+def build_spelling_map(token_counts: Counter, min_count: int = 3, cutoff: float = 0.8) -> Dict[str, str]:
+    """
+    Map rare tokens to a close, much more frequent token from the same vocabulary (likely typos).
+    Numbers are never corrected - "13" and "15" are different products, and the first letter
+    has to match so real words like "phone" aren't folded into "iphone"
+    """
+    frequent = [token for token, count in token_counts.items() if count >= min_count and not token.isdigit()]
+    spellings = {}
+    for token, count in token_counts.items():
+        if count >= min_count or token.isdigit() or len(token) < 4:
+            continue
+        candidates = [word for word in frequent if word[0] == token[0]]
+        matches = difflib.get_close_matches(token, candidates, n=1, cutoff=cutoff)
+        if matches and token_counts[matches[0]] >= count * 5:
+            spellings[token] = matches[0]
+    return spellings
+
+
+def load_query_vocabulary(path: str = QUERY_VOCABULARY_PATH) -> dict:
+    """
+    Read {"synonyms": {...}, "spellings": {...}} from a JSON file, empty maps if it's missing
+    """
+    if not os.path.exists(path):
+        return {"synonyms": {}, "spellings": {}}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not load query vocabulary from {path}: {e}")
+        return {"synonyms": {}, "spellings": {}}
+    return {"synonyms": data.get("synonyms", {}), "spellings": data.get("spellings", {})}
+
+
+def get_query_vocabulary() -> dict:
+    """
+    Vocabulary used for canonical keys, loaded once
+    """
+    global _vocabulary
+    if _vocabulary is None:
+        _vocabulary = load_query_vocabulary()
+    return _vocabulary
+
+
+def set_query_vocabulary(vocabulary: Optional[dict]) -> None:
+    """
+    Replace the vocabulary (None reloads it from disk on next use)
+    """
+    global _vocabulary
+    _vocabulary = vocabulary
@@ -0,0 +1,92 @@
+# backend/utils/raw_cache.py
+"""
+Raw upstream response cache - compressed adapter payloads keyed by (source, normalized query).
+
+Stored on a shared cache backend - a SQLite file that survives restarts by default (RAW_CACHE_BACKEND),
+with hot queries also kept in memory, so repeating a query (another user, another worker, or re-ingesting
+after a DB purge) doesn't cost an upstream call.
+"""
+import json
+import os
+import zlib
+from typing import Any, Optional
+
+from backend.utils.metrics import register_collector
+from backend.utils.shared_cache import Cache, CacheBackend, get_backend
+
+RAW_CACHE_ENABLED = os.getenv("RAW_CACHE_ENABLED", "true").lower() == "true"
+RAW_CACHE_BACKEND = os.getenv("RAW_CACHE_BACKEND", "sqlite")   # memory | sqlite | redis
+RAW_CACHE_PATH = os.getenv("RAW_CACHE_PATH", "./raw_cache.db")   # used by the sqlite backend
+RAW_CACHE_MEMORY_ENTRIES = int(os.getenv("RAW_CACHE_MEMORY_ENTRIES", "256"))
+
+# Per-source TTL in seconds - Amazon (RapidAPI) is paid per call so it's kept longest
+RAW_CACHE_TTL_DEFAULTS = {"ebay": 900, "amazon": 3600, "dummyjson": 3600}
+
+
+def source_ttl(source: str) -> float:
+    """
+    TTL for a source's raw payloads, overridable with <SOURCE>_RAW_CACHE_TTL_SECONDS
+    """
+    default = RAW_CACHE_TTL_DEFAULTS.get(source, 900)
+    return float(os.getenv(f"{source.upper()}_RAW_CACHE_TTL_SECONDS", default))
+
+
+def compress_payload(payload: Any) -> bytes:
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+
+def decompress_payload(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class RawResponseCache:
+    """
+    Compressed payloads on a cache backend (SQLite file by default, so they survive restarts),
+    with recently used ones also kept in local memory.
+    """
+
+    def __init__(self, path: str = RAW_CACHE_PATH, memory_entries: int = RAW_CACHE_MEMORY_ENTRIES,
+                 enabled: bool = RAW_CACHE_ENABLED, backend: Optional[CacheBackend] = None):
+        self.enabled = enabled
+        self.cache = None
+        if enabled:
+            ttl = max(RAW_CACHE_TTL_DEFAULTS.values())
+            backend = backend or get_backend(RAW_CACHE_BACKEND, maxsize=memory_entries, sqlite_path=path)
+            self.cache = Cache("raw", ttl=ttl, maxsize=memory_entries, backend=backend, local_ttl=ttl)
+
+    async def get(self, source: str, query: str) -> Optional[Any]:
+        """
+        Cached raw payload for (source, query), or None
+        """
+        if not self.enabled:
+            return None
+        # The namespace TTL is the longest source's, local copies are kept no longer than this source's
+        blob = await self.cache.get(f"{source}:{query}", local_ttl=source_ttl(source))
+        return decompress_payload(blob) if blob is not None else None
+
+    async def set(self, source: str, query: str, payload: Any) -> None:
+        """
+        Store a raw payload with the source's TTL
+        """
+        if not self.enabled:
+            return
+        await self.cache.set(f"{source}:{query}", compress_payload(payload), ttl=source_ttl(source))
+
+    async def clear(self) -> None:
+        """
+        Drop every stored payload
+        """
+        if self.cache:
+            await self.cache.clear()
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        stats = self.cache.stats()
+        if self.cache.local is not None:
+            stats["local"]["bytes"] = sum(len(blob) for blob in self.cache.local.values())
+        return {"enabled": True, **stats}
+
+
+raw_response_cache = RawResponseCache()
+register_collector("raw_response_cache", raw_response_cache.stats)
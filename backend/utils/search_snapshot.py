@@ -0,0 +1,115 @@
+# backend/utils/search_snapshot.py
+"""
+Per-search result snapshots - the (offer_id, price, rating, source) columns of a search's offers,
+kept from ingestion as a columnar result set. Offer pages are filtered, sorted and sliced from the
+snapshot and the database only loads the offers on the page.
+
+Prices and ratings still move after ingestion (re-ingestion by later searches, price tracking), so a
+snapshot is checked against the offers loaded for each page and rebuilt when they disagree. Changes
+to offers off the page show once the page reaches them or the snapshot expires.
+
+Snapshots are held in a bounded in-memory LRU. SEARCH_SNAPSHOT_BACKEND=sqlite|redis keeps them on a
+shared cache backend instead, so they survive restarts and every worker sees them.
+"""
+import logging
+import os
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from backend.utils.columnar import ColumnarResultSet, float_column
+from backend.utils.metrics import register_collector
+from backend.utils.shared_cache import Cache, CacheBackend, get_backend
+
+SEARCH_SNAPSHOT_ENABLED = os.getenv("SEARCH_SNAPSHOT_ENABLED", "true").lower() == "true"
+SEARCH_SNAPSHOT_BACKEND = os.getenv("SEARCH_SNAPSHOT_BACKEND", "memory")             # memory | sqlite | redis
+SEARCH_SNAPSHOT_SIZE = int(os.getenv("SEARCH_SNAPSHOT_SIZE", "512"))                   # searches kept in memory
+SEARCH_SNAPSHOT_TTL_SECONDS = float(os.getenv("SEARCH_SNAPSHOT_TTL_SECONDS", "1800"))  # later re-ingestions move prices
+
+
+class SearchSnapshot(ColumnarResultSet):
+    """
+    One search's offers as a columnar result set
+    """
+
+    @classmethod
+    def from_offers(cls, offers: Iterable) -> "SearchSnapshot":
+        """
+        Snapshot of Offer rows that were just written or linked
+        """
+        return cls.from_rows((offer.id, offer.last_price, offer.rating, offer.source) for offer in offers)
+
+    def agrees_with(self, offer_ids: List[int], offers: Sequence) -> bool:
+        """
+        Whether the offers loaded for a page are all still there, with the prices and ratings this snapshot holds
+        """
+        if [offer.id for offer in offers] != offer_ids:
+            return False
+        rows = np.searchsorted(self.ids, np.asarray(offer_ids, dtype=np.int64))
+        return (np.array_equal(self.prices[rows], float_column([offer.last_price for offer in offers]), equal_nan=True)
+                and np.array_equal(self.ratings[rows], float_column([offer.rating for offer in offers]), equal_nan=True))
+
+
+class SearchSnapshotCache:
+    """
+    Snapshots by search id. Errors only cost the snapshot - callers fall back to building it again
+    """
+
+    def __init__(self, enabled: bool = SEARCH_SNAPSHOT_ENABLED, backend_kind: str = SEARCH_SNAPSHOT_BACKEND,
+                 maxsize: int = SEARCH_SNAPSHOT_SIZE, ttl: float = SEARCH_SNAPSHOT_TTL_SECONDS,
+                 backend: Optional[CacheBackend] = None):
+        self.enabled = enabled
+        self.cache = None
+        self.built = 0
+        if enabled:
+            backend = backend or get_backend(backend_kind, maxsize=maxsize)
+            self.cache = Cache("snapshot", ttl=ttl, maxsize=maxsize, backend=backend, local_ttl=ttl)
+
+    async def get(self, search_id: int) -> Optional[SearchSnapshot]:
+        """
+        Snapshot of a search, or None
+        """
+        if not self.enabled:
+            return None
+        return await self.cache.get(search_id)
+
+    async def store(self, search_id: int, snapshot: SearchSnapshot) -> SearchSnapshot:
+        """
+        Keep a search's snapshot, returned so callers can answer from it right away
+        """
+        if self.enabled:
+            self.built += 1
+            await self.cache.set(search_id, snapshot)
+        return snapshot
+
+    async def store_offers(self, search_id: int, offers: Iterable) -> Optional[SearchSnapshot]:
+        """
+        Snapshot a search from the offers its ingestion wrote and linked
+        """
+        if not self.enabled:
+            return None
+        try:
+            return await self.store(search_id, SearchSnapshot.from_offers(offers))
+        except Exception as e:
+            logging.warning(f"Snapshot of search {search_id} not stored: {e}")
+            return None
+
+    async def delete(self, search_id: int) -> None:
+        if self.enabled:
+            await self.cache.delete(search_id)
+
+    async def clear(self) -> None:
+        """
+        Drop every snapshot
+        """
+        if self.enabled:
+            await self.cache.clear()
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        return {"enabled": True, "built": self.built, **self.cache.stats()}
+
+
+search_snapshots = SearchSnapshotCache()
+register_collector("search_snapshots", search_snapshots.stats)
@@ -0,0 +1,742 @@
+# backend/utils/shared_cache.py
+"""
+Shared cache with interchangeable backends, so several uvicorn workers see one copy of cached data.
+
+Backends (CACHE_BACKEND):
+- memory: per-process LRU (TTLCache), the single-worker default
+- sqlite: a SQLite file shared by every worker on the host
+- redis:  any server speaking the Redis protocol (RESP), shared across hosts
+
+Cache is the namespaced front the rest of the app uses. With a shared backend it keeps a small,
+short-lived local copy of hot keys and drops it when another worker publishes an invalidation.
+get_or_set coalesces concurrent misses - one caller computes the value, in this worker and across workers.
+
+Shared entries are pickled, so each blob is HMAC-signed with CACHE_SIGNING_KEY and checked before it is
+loaded - a forged entry in the SQLite file or on Redis is a miss, not code running in every worker.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from backend.utils.cache import TTLCache
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")                          # memory | sqlite | redis
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "./shared_cache.db")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_LOCAL_TTL_SECONDS = float(os.getenv("CACHE_LOCAL_TTL_SECONDS", "5"))    # local copies of shared entries
+CACHE_LOCK_SECONDS = float(os.getenv("CACHE_LOCK_SECONDS", "10"))             # get_or_set fill lock
+CACHE_POLL_SECONDS = float(os.getenv("CACHE_POLL_SECONDS", "0.5"))            # sqlite invalidation polling
+# Signs shared entries - must be the same in every worker, defaults to the JWT secret which already is
+CACHE_SIGNING_KEY = os.getenv("CACHE_SIGNING_KEY") or os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
+
+INVALIDATION_CHANNEL = "cache-invalidation"
+
+# Identifies this process as the holder of get_or_set fill locks
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+
+class CacheBackendError(Exception):
+    """Raised when a shared cache backend can't be reached or answers with an error"""
+    pass
+
+
+def dump_value(value: Any, key: str = CACHE_SIGNING_KEY) -> bytes:
+    """
+    Pickled value behind its HMAC-SHA256 signature
+    """
+    blob = pickle.dumps(value)
+    return hmac.new(key.encode("utf-8"), blob, hashlib.sha256).digest() + blob
+
+
+def load_value(signed: bytes, key: str = CACHE_SIGNING_KEY) -> Any:
+    """
+    Value of a signed blob, only unpickled once the signature checks out
+    """
+    signature, blob = signed[:32], signed[32:]
+    if not hmac.compare_digest(signature, hmac.new(key.encode("utf-8"), blob, hashlib.sha256).digest()):
+        raise CacheBackendError("Cache entry signature mismatch, entry ignored")
+    return pickle.loads(blob)
+
+
+class CacheBackend(ABC):
+    """
+    Key/value store with per-entry TTL and pub/sub. Keys are strings, values any picklable object.
+    """
+
+    name = "base"
+    shared = False  # True when other processes see the same entries
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        Value and the seconds it has left - None for the time when the backend can't tell
+        """
+        return await self.get(key), None
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Set only if the key is missing or expired - True if this call stored it
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self, prefix: str = "") -> None:
+        """
+        Delete every key starting with prefix
+        """
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        ...
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        """
+        Call callback(message) for every message published on channel (by any process)
+        """
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    def _dispatch(self, channel: str, message: str) -> None:
+        for callback in self._subscribers.get(channel, []):
+            try:
+                callback(message)
+            except Exception as e:
+                logging.error(f"Cache subscriber on '{channel}' failed: {e}")
+
+    async def listen(self) -> None:
+        """
+        Deliver messages published by other processes until cancelled - a no-op for local backends
+        """
+        return None
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process LRU, nothing is shared - messages are delivered straight to local subscribers.
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = 1024):
+        super().__init__()
+        self._cache = TTLCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        if key in self._cache:
+            return False
+        self._cache.set(key, value, ttl=ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def clear(self, prefix: str = "") -> None:
+        for key in self._cache.keys():
+            if key.startswith(prefix):
+                self._cache.delete(key)
+
+    async def publish(self, channel: str, message: str) -> None:
+        self._dispatch(channel, message)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Entries and published messages in a SQLite file (WAL mode) that every worker on the host opens.
+    Calls are blocking and run in a worker thread, subscribers poll the events table.
+    """
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: str = CACHE_SQLITE_PATH, poll_seconds: float = CACHE_POLL_SECONDS):
+        super().__init__()
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, message TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._last_event_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM cache_events").fetchone()[0]
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None, None
+        value = load_value(row[0])
+        self.hits += 1
+        return value, row[1] - now
+
+    def _set(self, key: str, blob: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)", (key, blob, now + ttl)
+            )
+            # Expired rows are dropped every so often as new ones come in
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+
+    def _add(self, key: str, blob: bytes, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?", (key, now))
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)", (key, blob, now + ttl)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    def _execute(self, sql: str, params: tuple = ()) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def _publish(self, channel: str, message: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache_events (channel, message, created_at) VALUES (?, ?, ?)", (channel, message, now)
+            )
+            # Subscribers poll every few hundred ms, a minute of history is plenty
+            self._conn.execute("DELETE FROM cache_events WHERE created_at < ?", (now - 60,))
+
+    def _poll(self) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, channel, message FROM cache_events WHERE id > ? ORDER BY id", (self._last_event_id,)
+            ).fetchall()
+        if rows:
+            self._last_event_id = rows[-1][0]
+        return rows
+
+    async def get(self, key: str) -> Optional[Any]:
+        value, _ = await asyncio.to_thread(self._get, key)
+        return value
+
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl > 0:
+            await asyncio.to_thread(self._set, key, dump_value(value), ttl)
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        return await asyncio.to_thread(self._add, key, dump_value(value), ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    async def clear(self, prefix: str = "") -> None:
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+    async def publish(self, channel: str, message: str) -> None:
+        await asyncio.to_thread(self._publish, channel, message)
+
+    async def poll_events(self) -> int:
+        """
+        Deliver messages published since the last poll, returns how many there were
+        """
+        rows = await asyncio.to_thread(self._poll)
+        for _, channel, message in rows:
+            self._dispatch(channel, message)
+        return len(rows)
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                await self.poll_events()
+            except Exception as e:
+                logging.error(f"Polling cache events from {self.path} failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache_entries WHERE expires_at > ?",
+                (time.time(),),
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class RespConnection:
+    """
+    Minimal Redis protocol (RESP2) client - one command in flight at a time.
+    """
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self.execute("AUTH", self.password)
+        if self.db:
+            await self.execute("SELECT", self.db)
+
+    @staticmethod
+    def encode(*args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def send(self, *args) -> None:
+        self._writer.write(self.encode(*args))
+        await self._writer.drain()
+
+    async def read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise CacheBackendError("Connection closed by server")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            raise CacheBackendError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(body)
+            if length == -1:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+        raise CacheBackendError(f"Unexpected reply: {line!r}")
+
+    async def execute(self, *args) -> Any:
+        await self.send(*args)
+        return await self.read_reply()
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class RedisBackend(CacheBackend):
+    """
+    Entries and pub/sub on a Redis-protocol server, shared by every worker and host using it.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str = CACHE_REDIS_URL):
+        super().__init__()
+        self.url = url
+        self._conn: Optional[RespConnection] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def execute(self, *args) -> Any:
+        """
+        Run one command, reconnecting if the previous connection was lost
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = RespConnection(self.url)
+                    await self._conn.connect()
+                return await self._conn.execute(*args)
+            except CacheBackendError as e:
+                if "closed" in str(e):
+                    self._conn = None
+                self.errors += 1
+                raise
+            except (OSError, asyncio.IncompleteReadError) as e:
+                self._conn = None
+                self.errors += 1
+                raise CacheBackendError(f"Redis at {self.url} unavailable: {e}") from e
+
+    async def get(self, key: str) -> Optional[Any]:
+        blob = await self.execute("GET", key)
+        if blob is None:
+            self.misses += 1
+            return None
+        value = load_value(blob)
+        self.hits += 1
+        return value
+
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        value = await self.get(key)
+        if value is None:
+            return None, None
+        # -2: expired since the GET, -1: no expiry
+        ttl_ms = await self.execute("PTTL", key)
+        if ttl_ms == -2:
+            return None, None
+        return value, ttl_ms / 1000 if ttl_ms >= 0 else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl > 0:
+            await self.execute("SET", key, dump_value(value), "PX", max(1, int(ttl * 1000)))
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        reply = await self.execute("SET", key, dump_value(value), "NX", "PX", max(1, int(ttl * 1000)))
+        return reply == "OK"
+
+    async def delete(self, key: str) -> None:
+        await self.execute("DEL", key)
+
+    async def clear(self, prefix: str = "") -> None:
+        cursor = "0"
+        while True:
+            cursor, keys = await self.execute("SCAN", cursor, "MATCH", f"{prefix}*", "COUNT", 500)
+            cursor = cursor.decode("utf-8") if isinstance(cursor, bytes) else str(cursor)
+            if keys:
+                await self.execute("DEL", *keys)
+            if cursor == "0":
+                break
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.execute("PUBLISH", channel, message)
+
+    async def listen(self) -> None:
+        while True:
+            conn = RespConnection(self.url)
+            try:
+                await conn.connect()
+                await conn.send("SUBSCRIBE", *self._subscribers)
+                while True:
+                    reply = await conn.read_reply()
+                    if isinstance(reply, list) and reply[0] == b"message":
+                        self._dispatch(reply[1].decode("utf-8"), reply[2].decode("utf-8"))
+            except (CacheBackendError, OSError, asyncio.IncompleteReadError) as e:
+                logging.error(f"Cache subscription to {self.url} lost, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await conn.close()
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_shared_backends: Dict[tuple, CacheBackend] = {}
+_listeners: List[asyncio.Task] = []
+
+
+def get_backend(kind: str = CACHE_BACKEND, maxsize: int = 1024, sqlite_path: str = CACHE_SQLITE_PATH,
+                redis_url: str = CACHE_REDIS_URL) -> CacheBackend:
+    """
+    Backend by kind - memory backends are private to the caller, shared ones are one per location
+    """
+    if kind == "memory":
+        return MemoryBackend(maxsize=maxsize)
+    if kind == "sqlite":
+        if sqlite_path == ":memory:":
+            return SQLiteBackend(sqlite_path)
+        key = (kind, os.path.abspath(sqlite_path))
+        if key not in _shared_backends:
+            _shared_backends[key] = SQLiteBackend(sqlite_path)
+        return _shared_backends[key]
+    if kind == "redis":
+        key = (kind, redis_url)
+        if key not in _shared_backends:
+            _shared_backends[key] = RedisBackend(redis_url)
+        return _shared_backends[key]
+    raise ValueError(f"Unknown cache backend '{kind}', expected memory, sqlite or redis")
+
+
+def start_cache_listeners() -> None:
+    """
+    Start receiving invalidations from other workers, call once the event loop is running
+    """
+    for backend in _shared_backends.values():
+        _listeners.append(asyncio.create_task(backend.listen()))
+
+
+async def stop_cache_listeners() -> None:
+    for task in _listeners:
+        task.cancel()
+    await asyncio.gather(*_listeners, return_exceptions=True)
+    _listeners.clear()
+
+
+class Cache:
+    """
+    Namespaced cache on a backend. Backend errors are logged and treated as misses, never raised.
+    """
+
+    def __init__(self, namespace: str, ttl: float = 300, maxsize: int = 1024,
+                 backend: Optional[CacheBackend] = None, local_ttl: float = CACHE_LOCAL_TTL_SECONDS):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.backend = backend or get_backend(maxsize=maxsize)
+        # Local copies only make sense in front of a shared backend
+        self.local_ttl = local_ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=local_ttl) if self.backend.shared and local_ttl > 0 else None
+        # Tags this cache's invalidation messages, so it skips its own
+        self._origin = f"{WORKER_ID}-{uuid.uuid4().hex[:8]}"
+        self.backend.subscribe(INVALIDATION_CHANNEL, self._on_invalidation)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def _key(self, key: Any) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _on_invalidation(self, message: str) -> None:
+        origin, _, key = message.partition(" ")
+        if self.local is None or origin == self._origin:
+            return
+        if key == f"{self.namespace}:*":
+            self.local.clear()
+        elif key.startswith(f"{self.namespace}:"):
+            self.local.delete(key)
+
+    async def _publish_invalidation(self, key: str) -> None:
+        if self.local is None:
+            return
+        try:
+            await self.backend.publish(INVALIDATION_CHANNEL, f"{self._origin} {key}")
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Publishing cache invalidation for '{key}' failed: {e}")
+
+    async def get(self, key: Any, default: Any = None, local_ttl: Optional[float] = None) -> Any:
+        """
+        Cached value or default if missing/expired. local_ttl caps how long a copy is kept locally,
+        for namespaces whose entries have different TTLs
+        """
+        full_key = self._key(key)
+        if self.local is not None:
+            value = self.local.get(full_key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+        try:
+            value, ttl_left = await self.backend.get_with_ttl(full_key)
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Cache get '{full_key}' failed: {e}")
+            value, ttl_left = None, None
+
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.local is not None:
+            # The local copy never outlives the shared entry
+            caps = [self.ttl, self.local_ttl] + [ttl for ttl in (local_ttl, ttl_left) if ttl is not None]
+            self.local.set(full_key, value, ttl=min(caps))
+        return value
+
+    async def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value (None is never cached), other workers drop their local copy
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if value is None or ttl <= 0:
+            return
+        full_key = self._key(key)
+        try:
+            await self.backend.set(full_key, value, ttl)
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Cache set '{full_key}' failed: {e}")
+        if self.local is not None:
+            self.local.set(full_key, value, ttl=min(ttl, self.local_ttl))
+            await self._publish_invalidation(full_key)
+
+    async def delete(self, key: Any) -> None:
+        """
+        Remove an entry here and in every worker
+        """
+        full_key = self._key(key)
+        try:
+            await self.backend.delete(full_key)
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Cache delete '{full_key}' failed: {e}")
+        if self.local is not None:
+            self.local.delete(full_key)
+            await self._publish_invalidation(full_key)
+
+    async def clear(self) -> None:
+        """
+        Remove every entry of this namespace, counters are kept
+        """
+        try:
+            await self.backend.clear(f"{self.namespace}:")
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Cache clear '{self.namespace}' failed: {e}")
+        if self.local is not None:
+            self.local.clear()
+            await self._publish_invalidation(f"{self.namespace}:*")
+
+    async def get_or_set(self, key: Any, factory: Callable[[], Awaitable[Any]],
+                         ttl: Union[float, Callable[[Any], float], None] = None) -> Any:
+        """
+        Cached value, or await factory() once and cache it - concurrent misses for the same key
+        wait for that one call. ttl may be a function of the value (e.g. a token's own expiry)
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        full_key = self._key(key)
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await self._fill(key, full_key, factory, ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved - waiters, if any, get it re-raised
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+
+    async def _fill(self, key: Any, full_key: str, factory, ttl) -> Any:
+        lock_key = f"{full_key}:lock"
+        locked = False
+        if self.backend.shared:
+            # Another worker may be filling the same key - wait for its value instead of calling upstream too
+            try:
+                locked = await self.backend.add(lock_key, WORKER_ID, CACHE_LOCK_SECONDS)
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Cache lock '{lock_key}' failed: {e}")
+                locked = True
+            if not locked:
+                deadline = time.monotonic() + CACHE_LOCK_SECONDS
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                    value = await self.get(key)
+                    if value is not None:
+                        self.coalesced += 1
+                        return value
+
+        try:
+            value = await factory()
+            await self.set(key, value, ttl=ttl(value) if callable(ttl) else ttl)
+            return value
+        finally:
+            if locked:
+                try:
+                    await self.backend.delete(lock_key)
+                except Exception as e:
+                    logging.error(f"Cache unlock '{lock_key}' failed: {e}")
+
+    def stats(self) -> dict:
+        """
+        Hit-rate counters for monitoring, with the backend's own
+        """
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "local": self.local.stats() if self.local is not None else None,
+            "store": self.backend.stats(),
+        }
@@ -0,0 +1,198 @@
+# backend/utils/write_behind.py
+"""
+Write-behind queue - requests stage their writes in memory and return, a single writer task
+commits the staged writes of many requests together in a few large transactions.
+
+Readers that need a request's writes call wait_for() first, which waits for just those
+writes to be committed (read-your-writes), so nothing reads around the staging area.
+
+The staging area lives in one process, so wait_for() only sees that worker's writes - a GET
+served by another worker would read around them. Write-behind needs a single worker: it stays
+off when a shared cache backend (CACHE_BACKEND=sqlite/redis, i.e. several workers) is configured.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from backend.database import AsyncSessionLocal
+from backend.utils.metrics import register_collector
+from backend.utils.shared_cache import CACHE_BACKEND
+
+
+def write_behind_enabled(requested: bool, cache_backend: str = CACHE_BACKEND) -> bool:
+    """
+    Whether write-behind can run - read-your-writes is per process, so not beside a shared cache
+    """
+    if requested and cache_backend != "memory":
+        logging.warning(f"SEARCH_WRITE_BEHIND ignored: it needs a single worker, CACHE_BACKEND={cache_backend}")
+        return False
+    return requested
+
+
+# Off by default - POST /search then returns once its offers are committed
+SEARCH_WRITE_BEHIND = write_behind_enabled(os.getenv("SEARCH_WRITE_BEHIND", "false").lower() == "true")
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "100"))       # staged searches, staging waits beyond
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "20"))          # staged searches per transaction
+WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS", "5"))  # longest a read waits
+
+
+class StagedWrite:
+    """
+    One request's writes waiting for the writer - done is set once they're committed, or failed (error)
+    """
+
+    def __init__(self, key, write: Callable[[object], Awaitable], tags: Iterable = ()):
+        self.key = key
+        self.write = write
+        self.tags = set(tags)
+        self.done = asyncio.Event()
+        self.error: Optional[BaseException] = None
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of staged writes drained by one writer task. Whatever is queued when the writer
+    gets to it goes into one transaction (up to max_batch) - a failed transaction is retried one
+    staged write at a time, so one bad write doesn't take the others down with it.
+    """
+
+    def __init__(self, session_factory=None, maxsize: int = WRITE_BEHIND_QUEUE_SIZE,
+                 max_batch: int = WRITE_BEHIND_MAX_BATCH, flush_timeout: float = WRITE_BEHIND_FLUSH_TIMEOUT_SECONDS):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.maxsize = maxsize
+        self.max_batch = max_batch
+        self.flush_timeout = flush_timeout
+        self.pending: Dict[object, StagedWrite] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._loop = None
+        self.staged = 0
+        self.written = 0
+        self.failed = 0
+        self.transactions = 0
+        self.largest_batch = 0
+        self.read_waits = 0
+        self.read_timeouts = 0
+        self.last_flush_ms = 0.0
+
+    def _ensure_writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The queue and writer belong to the loop they were made on (tests run a loop each)
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._writer = None
+            self.pending.clear()
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._run())
+
+    async def stage(self, key, write: Callable[[object], Awaitable], tags: Iterable = ()) -> StagedWrite:
+        """
+        Queue write(session) for a later transaction, waiting while the queue is full
+        """
+        self._ensure_writer()
+        staged = StagedWrite(key, write, tags)
+        self.pending[key] = staged
+        self.staged += 1
+        await self._queue.put(staged)
+        return staged
+
+    async def wait_for(self, key=None, tag=None, timeout: float = None) -> bool:
+        """
+        Wait until the staged writes for a key, or carrying a tag, are written.
+        False if they weren't within the timeout - the caller reads what is committed
+        """
+        waiting = [
+            staged for staged in self.pending.values()
+            if (key is not None and staged.key == key) or (tag is not None and tag in staged.tags)
+        ]
+        if not waiting:
+            return True
+        self.read_waits += 1
+        try:
+            await asyncio.wait_for(asyncio.gather(*(staged.done.wait() for staged in waiting)),
+                                   timeout or self.flush_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.read_timeouts += 1
+            logging.warning(f"Write-behind: staged writes for {key if key is not None else tag} not flushed in time")
+            return False
+
+    async def flush(self) -> None:
+        """
+        Wait until everything staged so far is written
+        """
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """
+        Flush on shutdown, then stop the writer
+        """
+        await self.flush()
+        if self._writer is not None and not self._writer.done():
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+        self._writer = None
+
+    async def _run(self) -> None:
+        while True:
+            # Everything that queued up while the last transaction ran goes into the next one
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write(batch)
+            finally:
+                for staged in batch:
+                    if self.pending.get(staged.key) is staged:
+                        del self.pending[staged.key]
+                    staged.done.set()
+                    self._queue.task_done()
+
+    async def _write(self, batch) -> None:
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                for staged in batch:
+                    await staged.write(session)
+                await session.commit()
+            self.transactions += 1
+            self.written += len(batch)
+        except Exception as e:
+            logging.warning(f"Write-behind: batch of {len(batch)} failed ({e}), retrying one at a time")
+            for staged in batch:
+                try:
+                    async with self.session_factory() as session:
+                        await staged.write(session)
+                        await session.commit()
+                    self.transactions += 1
+                    self.written += 1
+                except Exception as e:
+                    staged.error = e
+                    self.failed += 1
+                    logging.error(f"Write-behind: writes for {staged.key} dropped: {e}")
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SEARCH_WRITE_BEHIND,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "pending": len(self.pending),
+            "staged": self.staged,
+            "written": self.written,
+            "failed": self.failed,
+            "transactions": self.transactions,
+            "largest_batch": self.largest_batch,
+            "read_waits": self.read_waits,
+            "read_timeouts": self.read_timeouts,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+# Search ingestion's queue - SearchService stages into it when SEARCH_WRITE_BEHIND is on
+search_write_behind = WriteBehindQueue()
+register_collector("write_behind", search_write_behind.stats)
@@ -44,7 +44,8 @@ function App() {
       console.log('Sending search request:', searchData)
       
       const token = localStorage.getItem('token')
-      const response = await fetch('/search/', {
+      // Ask for the first page of offers in the same response, saving the /offers round trip
+      const response = await fetch(`/search/?include_offers=${pagination.page_size}`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -67,7 +68,11 @@ function App() {
       setCurrentSearch(searchResult)
       
       // Reset pagination to page 1 for new search
-      await fetchOffers(searchResult.id, { page: 1 })
+      if (searchResult.offers) {
+        applyOffersPage(searchResult, { page: 1 })
+      } else {
+        await fetchOffers(searchResult.id, { page: 1 })
+      }
     } catch (err) {
       console.error('Search error:', err)
       setError(err.message)
@@ -113,19 +118,7 @@ function App() {
       const responseData = await response.json()
       console.log('Offers data:', responseData)
       
-      setOffers(responseData.offers || [])
-      setPagination({
-        page: responseData.pagination?.page || 1,
-        page_size: responseData.pagination?.page_size || 20,
-        total_count: responseData.pagination?.total_count || 0,
-        total_pages: responseData.pagination?.total_pages || 0,
-        sort_by: filters.hasOwnProperty('sort_by') ? filters.sort_by : (pagination.sort_by || 'last_price'),
-        sort_order: filters.hasOwnProperty('sort_order') ? filters.sort_order : (pagination.sort_order || 'asc'),
-        min_price: filters.hasOwnProperty('min_price') ? filters.min_price : (pagination.min_price || ''),
-        max_price: filters.hasOwnProperty('max_price') ? filters.max_price : (pagination.max_price || ''),
-        source: filters.hasOwnProperty('source') ? filters.source : (pagination.source || ''),
-        min_rating: filters.hasOwnProperty('min_rating') ? filters.min_rating : (pagination.min_rating || '')
-      })
+      applyOffersPage(responseData, filters)
     } catch (err) {
       console.error('Fetch offers error:', err)
       setError(err.message)
@@ -134,6 +127,22 @@ function App() {
     }
   }
 
+  const applyOffersPage = (responseData, filters = {}) => {
+    setOffers(responseData.offers || [])
+    setPagination({
+      page: responseData.pagination?.page || 1,
+      page_size: responseData.pagination?.page_size || 20,
+      total_count: responseData.pagination?.total_count || 0,
+      total_pages: responseData.pagination?.total_pages || 0,
+      sort_by: filters.hasOwnProperty('sort_by') ? filters.sort_by : (pagination.sort_by || 'last_price'),
+      sort_order: filters.hasOwnProperty('sort_order') ? filters.sort_order : (pagination.sort_order || 'asc'),
+      min_price: filters.hasOwnProperty('min_price') ? filters.min_price : (pagination.min_price || ''),
+      max_price: filters.hasOwnProperty('max_price') ? filters.max_price : (pagination.max_price || ''),
+      source: filters.hasOwnProperty('source') ? filters.source : (pagination.source || ''),
+      min_rating: filters.hasOwnProperty('min_rating') ? filters.min_rating : (pagination.min_rating || '')
+    })
+  }
+
   const handlePageChange = (newPage) => {
     if (currentSearch) {
       // Preserve current sorting and filtering state when changing pages
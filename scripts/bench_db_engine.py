@@ -0,0 +1,98 @@
+"""
+Benchmark concurrent database access under different engine profiles.
+
+Usage:
+    python scripts/bench_db_engine.py
+    python scripts/bench_db_engine.py --workers 50 --ops 40 --profiles default production
+
+Each worker mimics a search: a short write transaction (insert an offer-like row, then a
+price-history-like row) followed by a read of recent rows, against a fresh SQLite file per
+profile. The "default" profile is SQLAlchemy's defaults (rollback journal, a new connection
+per session), where writers block readers and long waits end in "database is locked".
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path so we can import backend modules
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from backend.database import build_async_engine
+
+
+async def run_worker(engine, worker_id: int, ops: int, latencies: list, errors: dict):
+    for op in range(ops):
+        start = time.perf_counter()
+        try:
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    text("INSERT INTO bench_offers (source, title, price) VALUES (:source, :title, :price)"),
+                    {"source": "ebay", "title": f"item {worker_id}-{op}", "price": 10.0 + op},
+                )
+                await conn.execute(
+                    text("INSERT INTO bench_history (offer_id, price) VALUES (:offer_id, :price)"),
+                    {"offer_id": result.lastrowid, "price": 10.0 + op},
+                )
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT id, title, price FROM bench_offers ORDER BY id DESC LIMIT 20"))
+        except OperationalError as e:
+            key = "locked" if "locked" in str(e) else "other"
+            errors[key] = errors.get(key, 0) + 1
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_profile(profile: str, workers: int, ops: int, directory: str) -> dict:
+    path = os.path.join(directory, f"bench_{profile}.db")
+    engine = build_async_engine(f"sqlite+aiosqlite:///{path}", profile)
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE bench_offers (id INTEGER PRIMARY KEY, source TEXT, title TEXT, price REAL)"
+        ))
+        await conn.execute(text(
+            "CREATE TABLE bench_history (id INTEGER PRIMARY KEY, offer_id INTEGER, price REAL)"
+        ))
+
+    latencies, errors = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_worker(engine, i, ops, latencies, errors) for i in range(workers)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": profile,
+        "ops_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else 0.0,
+        "locked": errors.get("locked", 0),
+        "other_errors": errors.get("other", 0),
+    }
+
+
+async def main(args):
+    print(f"workers={args.workers}, ops per worker={args.ops}")
+    print(f"{'profile':<14}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'locked':>9}{'other':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in args.profiles:
+            row = await run_profile(profile, args.workers, args.ops, directory)
+            print(f"{row['profile']:<14}{row['ops_per_s']:>10.1f}{row['p50_ms']:>10.2f}"
+                  f"{row['p95_ms']:>10.2f}{row['locked']:>9}{row['other_errors']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent SQLite access per engine profile")
+    parser.add_argument("--workers", type=int, default=30, help="Concurrent workers")
+    parser.add_argument("--ops", type=int, default=20, help="Write+read operations per worker")
+    parser.add_argument("--profiles", nargs="+", default=["default", "development", "production"],
+                        help="Engine profiles to compare")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+"""
+Benchmark event-loop latency during a burst of logins.
+
+Usage:
+    python scripts/bench_password_hashing.py
+    python scripts/bench_password_hashing.py --logins 50 --rounds 12
+
+A ticker task sleeps for a fixed interval and records how late it wakes up,
+which is the delay any other request (e.g. a search) would see. The burst of
+password verifications runs twice: inline on the event loop (the old
+behaviour) and offloaded to the password hashing pool (verify_password_async).
+With offloading the lag should stay flat while logins are in flight.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path so we can import backend modules
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+async def measure_lag(stop: asyncio.Event, interval: float, samples: list):
+    """
+    Record how late the loop wakes up compared to the requested sleep interval.
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run_burst(name: str, login, logins: int, interval: float) -> dict:
+    """
+    Fire a burst of concurrent logins while the lag ticker runs.
+    """
+    samples = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop, interval, samples))
+    await asyncio.sleep(interval * 5)  # warm up the ticker
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    samples.sort()
+    return {
+        "mode": name,
+        "burst_s": elapsed,
+        "lag_p50_ms": statistics.median(samples) * 1000,
+        "lag_p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+        "lag_max_ms": samples[-1] * 1000,
+    }
+
+
+async def main(args):
+    from backend.utils.auth import get_password_hash, verify_password, verify_password_async
+
+    hashed = get_password_hash("BenchPassword123")
+
+    async def inline_login():
+        # Old behaviour: bcrypt runs directly inside the coroutine
+        verify_password("BenchPassword123", hashed)
+
+    async def offloaded_login():
+        await verify_password_async("BenchPassword123", hashed)
+
+    print(f"bcrypt rounds={os.environ['BCRYPT_ROUNDS']}, logins={args.logins}, "
+          f"workers={os.environ.get('PASSWORD_HASH_WORKERS', '4')}")
+    print(f"{'mode':<12}{'burst s':>10}{'lag p50 ms':>13}{'lag p99 ms':>13}{'lag max ms':>13}")
+    for name, login in (("inline", inline_login), ("offloaded", offloaded_login)):
+        row = await run_burst(name, login, args.logins, args.interval)
+        print(f"{row['mode']:<12}{row['burst_s']:>10.2f}{row['lag_p50_ms']:>13.2f}"
+              f"{row['lag_p99_ms']:>13.2f}{row['lag_max_ms']:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event-loop lag during a burst of logins")
+    parser.add_argument("--logins", type=int, default=20, help="Concurrent logins in the burst")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--interval", type=float, default=0.005, help="Ticker interval in seconds")
+    arguments = parser.parse_args()
+
+    # Must be set before backend.utils.auth is imported
+    os.environ["BCRYPT_ROUNDS"] = str(arguments.rounds)
+    asyncio.run(main(arguments))
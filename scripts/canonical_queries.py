@@ -0,0 +1,103 @@
+"""
+Canonical query keys - build the vocabulary and backfill searches.canonical_query.
+
+Usage:
+    # Migrate the database if needed and fill canonical_query for every search
+    python scripts/canonical_queries.py backfill
+
+    # Build spelling corrections from historical searches into the vocabulary file,
+    # then backfill again so old rows use the new keys
+    python scripts/canonical_queries.py vocabulary --min-count 3
+    python scripts/canonical_queries.py backfill
+
+Synonyms are hand-edited in the vocabulary file ("synonyms": {"tv": "television"})
+and are kept when the spelling map is rebuilt.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path so we can import backend modules
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import select, update
+from backend.database import async_engine
+from backend.init_db import async_init_db
+from backend.models import offers, pricehistory, search_offer_link, search_source_fetch, users  # Import to resolve relationships
+from backend.models.searches import Search
+from backend.utils.query_keys import (
+    QUERY_VOCABULARY_PATH, build_spelling_map, canonicalize_query, load_query_vocabulary, tokenize_query,
+)
+
+
+async def backfill(batch_size: int) -> None:
+    # Databases from before the column existed get it from the migrations
+    await async_init_db()
+
+    vocabulary = load_query_vocabulary()
+    updated = 0
+    last_id = 0
+    while True:
+        async with async_engine.begin() as conn:
+            rows = (await conn.execute(
+                select(Search.id, Search.normalized_query, Search.canonical_query)
+                .where(Search.id > last_id)
+                .order_by(Search.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+
+            for search_id, normalized_query, current in rows:
+                canonical = canonicalize_query(normalized_query, vocabulary) or normalized_query
+                if canonical != current:
+                    await conn.execute(update(Search).where(Search.id == search_id).values(canonical_query=canonical))
+                    updated += 1
+            last_id = rows[-1][0]
+
+    print(f"✓ Backfilled canonical_query for {updated} search(es)")
+
+
+async def build_vocabulary(path: str, min_count: int) -> None:
+    async with async_engine.connect() as conn:
+        queries = (await conn.execute(select(Search.normalized_query))).scalars().all()
+
+    token_counts = Counter(token for query in queries for token in tokenize_query(query))
+    existing = load_query_vocabulary(path)
+    vocabulary = {
+        "synonyms": existing["synonyms"],
+        "spellings": build_spelling_map(token_counts, min_count=min_count),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+    print(f"✓ {len(token_counts)} distinct tokens from {len(queries)} searches")
+    print(f"✓ Wrote {len(vocabulary['spellings'])} spelling correction(s) to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonical query keys for the search cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = subparsers.add_parser("backfill", help="add and fill searches.canonical_query")
+    backfill_parser.add_argument("--batch-size", type=int, default=1000)
+
+    vocabulary_parser = subparsers.add_parser("vocabulary", help="build spelling maps from past searches")
+    vocabulary_parser.add_argument("--path", default=QUERY_VOCABULARY_PATH)
+    vocabulary_parser.add_argument("--min-count", type=int, default=3,
+                                   help="tokens seen this often are trusted spellings")
+
+    args = parser.parse_args()
+    if args.command == "backfill":
+        asyncio.run(backfill(args.batch_size))
+    else:
+        asyncio.run(build_vocabulary(args.path, args.min_count))
+
+
+if __name__ == "__main__":
+    main()
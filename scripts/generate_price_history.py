@@ -30,6 +30,8 @@ from backend.models.offers import Offer
 from backend.models.pricehistory import PriceHistory
 from backend.models.search_offer_link import SearchOfferLink  # Import to resolve relationships
 from backend.models.searches import Search  # Import to resolve relationships
+from backend.models.search_source_fetch import SearchSourceFetch  # Import to resolve relationships
+from backend.repositories.repository import Repository
 
 
 def generate_realistic_price_history(base_price: float, days: int = 60) -> list[tuple[float, datetime]]:
@@ -161,20 +163,14 @@ async def main():
                     days=60
                 )
                 
-                # Create PriceHistory records
-                price_history_objects = []
-                for price, timestamp in price_points:
-                    price_history_objects.append(
-                        PriceHistory(
-                            offer_id=offer.id,
-                            price=Decimal(str(price)),
-                            currency=offer.currency,
-                            fetched_at=timestamp
-                        )
-                    )
-                
-                # Add to session
-                session.add_all(price_history_objects)
+                # Insert the PriceHistory rows in bulk (COPY on PostgreSQL)
+                await Repository().bulk_insert_price_history(
+                    [
+                        {"offer_id": offer.id, "price": Decimal(str(price)), "currency": offer.currency, "fetched_at": timestamp}
+                        for price, timestamp in price_points
+                    ],
+                    session,
+                )
                 
                 min_price = min(p[0] for p in price_points)
                 max_price = max(p[0] for p in price_points)
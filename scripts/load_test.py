@@ -0,0 +1,458 @@
+"""
+Load-test harness that drives the full API end to end.
+
+Usage:
+    python scripts/load_test.py run                         # in-process app + fake upstreams
+    python scripts/load_test.py run --concurrency 50 --duration 60
+    python scripts/load_test.py serve --port 8001           # run the app with fake upstreams
+    python scripts/load_test.py run --base-url http://localhost:8001
+
+The workload replays a realistic mix of search, offer paging, price history,
+deals, login and watchlist calls. Search queries follow a Zipfian popularity
+distribution, so a few head queries dominate like they do in production.
+External APIs (eBay, Amazon, DummyJSON) are replaced by fake upstreams with
+seeded payloads and latencies, so runs are reproducible and cost nothing.
+
+At the end it reports throughput, p50/p95/p99 latency per endpoint and the
+error rate, optionally as JSON (--json results.json) for comparing runs.
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Add project root to path so we can import backend modules
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Keep load-test data away from the real database, must be set before backend imports
+os.environ.setdefault("DATABASE_URL", "sqlite:///./loadtest.db")
+os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./loadtest.db")
+os.environ.setdefault("RAW_CACHE_PATH", ":memory:")
+
+import httpx
+
+# Product vocabulary used to build queries, ordered by popularity rank
+PRODUCTS = [
+    "iphone", "laptop", "airpods", "headphones", "smartwatch", "ipad", "camera", "monitor",
+    "keyboard", "mouse", "tv", "speaker", "tablet", "charger", "router", "printer",
+    "drone", "console", "controller", "microphone", "webcam", "ssd", "hard drive", "projector",
+    "kindle", "fitness tracker", "vacuum", "blender", "coffee maker", "air fryer", "lamp", "desk",
+]
+MODIFIERS = ["", "pro", "mini", "max", "2", "15", "wireless", "4k", "gaming", "used"]
+
+# Request mix - weights are relative
+DEFAULT_MIX = {
+    "search": 30,
+    "offers": 25,
+    "price_history": 10,
+    "deals": 10,
+    "login": 10,
+    "watchlist": 15,
+}
+
+# Fake upstream latency profile in seconds: (median, sigma) of a lognormal distribution
+UPSTREAM_LATENCY = {
+    "ebay": (0.25, 0.5),
+    "amazon": (0.40, 0.6),
+    "dummyjson": (0.08, 0.3),
+}
+
+
+def build_query_pool(size: int, rng: random.Random) -> list[str]:
+    """
+    Build a pool of distinct queries, the index in the list is the popularity rank.
+    """
+    pool = []
+    seen = set()
+    for product in PRODUCTS:
+        for modifier in MODIFIERS:
+            query = f"{product} {modifier}".strip()
+            if query not in seen:
+                seen.add(query)
+                pool.append(query)
+    rng.shuffle(pool)
+    return pool[:size]
+
+
+class ZipfSampler:
+    """
+    Sample ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** s.
+    """
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        weights = [1.0 / (rank + 1) ** s for rank in range(n)]
+        total = sum(weights)
+        cumulative = 0.0
+        self.cdf = []
+        for weight in weights:
+            cumulative += weight / total
+            self.cdf.append(cumulative)
+
+    def sample(self) -> int:
+        return min(bisect.bisect_left(self.cdf, self.rng.random()), len(self.cdf) - 1)
+
+
+def _seeded_rng(*parts) -> random.Random:
+    """
+    Deterministic RNG derived from the given parts, same query -> same fake payload.
+    """
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def _stable_id(*parts) -> int:
+    """
+    Stable numeric id for a fake item, independent of PYTHONHASHSEED.
+    """
+    return int(hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:15], 16)
+
+
+async def _fake_latency(source: str, latency_scale: float):
+    median, sigma = UPSTREAM_LATENCY[source]
+    await asyncio.sleep(random.lognormvariate(0, sigma) * median * latency_scale)
+
+
+def install_fake_upstreams(latency_scale: float = 1.0, items_per_source: int = 40):
+    """
+    Replace the external API adapters with fake upstreams.
+    Payloads follow each API's real JSON shape so the full transform/ingest path runs.
+    """
+    import backend.services.search_services as search_services
+    from backend.utils.hedging import hedged
+    from backend.utils.limiter import source_limited
+
+    async def fake_search_ebay(query: str, limit: int = 120, token=None) -> dict:
+        await _fake_latency("ebay", latency_scale)
+        rng = _seeded_rng("ebay", query)
+        items = [
+            {
+                "itemId": f"v1|{_stable_id('ebay', query, i) % 10**12}|0",
+                "title": f"{query} listing {i}",
+                "price": {"value": f"{rng.uniform(20, 1500):.2f}", "currency": "USD"},
+                "itemWebUrl": f"https://www.ebay.com/itm/{i}",
+                "seller": {"username": f"seller{rng.randint(1, 500)}", "feedbackPercentage": f"{rng.uniform(85, 100):.1f}"},
+                "image": {"imageUrl": f"https://i.ebayimg.com/{i}.jpg"},
+            }
+            for i in range(min(limit, items_per_source))
+        ]
+        return {"itemSummaries": items}
+
+    async def fake_search_amazon(query: str, limit: int = 120) -> dict:
+        await _fake_latency("amazon", latency_scale)
+        rng = _seeded_rng("amazon", query)
+        products = [
+            {
+                "asin": f"B{_stable_id('amazon', query, i) % 10**9:09d}",
+                "product_title": f"{query} product {i}",
+                "product_price": f"${rng.uniform(20, 1500):,.2f}",
+                "currency": "USD",
+                "product_url": f"https://www.amazon.com/dp/{i}",
+                "product_photo": f"https://m.media-amazon.com/{i}.jpg",
+                "product_star_rating": f"{rng.uniform(2.5, 5):.1f}",
+            }
+            for i in range(min(limit, items_per_source))
+        ]
+        return {"products": products}
+
+    async def fake_search_dummyjson(query: str, limit: int = 120) -> dict:
+        await _fake_latency("dummyjson", latency_scale)
+        rng = _seeded_rng("dummyjson", query)
+        products = [
+            {
+                "id": _stable_id("dummyjson", query, i) % 10**6,
+                "title": f"{query} item {i}",
+                "price": round(rng.uniform(5, 900), 2),
+                "thumbnail": f"https://cdn.dummyjson.com/{i}.png",
+                "rating": round(rng.uniform(1, 5), 2),
+            }
+            for i in range(min(limit, items_per_source // 4))
+        ]
+        return {"products": products, "items_filtered": products}
+
+    # Keep the real per-source hedging and limiters in front of the fakes, like the real adapters
+    search_services.search_ebay = hedged("ebay")(source_limited("ebay")(fake_search_ebay))
+    search_services.search_amazon = hedged("amazon")(source_limited("amazon")(fake_search_amazon))
+    search_services.search_dummyjson = hedged("dummyjson")(source_limited("dummyjson")(fake_search_dummyjson))
+
+
+async def init_database():
+    """
+    Create all tables for the in-process / served app.
+    """
+    from backend.init_db import async_init_db
+    await async_init_db()
+
+
+class Stats:
+    """
+    Collects latencies and errors per endpoint.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, elapsed: float, ok: bool):
+        self.latencies[endpoint].append(elapsed)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    @staticmethod
+    def percentile(values: list[float], pct: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+        return ordered[index]
+
+    def summary(self, wall_time: float) -> dict:
+        endpoints = {}
+        total = 0
+        total_errors = 0
+        for endpoint, values in sorted(self.latencies.items()):
+            count = len(values)
+            errors = self.errors[endpoint]
+            total += count
+            total_errors += errors
+            endpoints[endpoint] = {
+                "count": count,
+                "errors": errors,
+                "error_rate": round(errors / count, 4) if count else 0.0,
+                "throughput_rps": round(count / wall_time, 2) if wall_time else 0.0,
+                "mean_ms": round(statistics.mean(values) * 1000, 2),
+                "p50_ms": round(self.percentile(values, 50) * 1000, 2),
+                "p95_ms": round(self.percentile(values, 95) * 1000, 2),
+                "p99_ms": round(self.percentile(values, 99) * 1000, 2),
+            }
+        return {
+            "wall_time_s": round(wall_time, 2),
+            "requests": total,
+            "errors": total_errors,
+            "error_rate": round(total_errors / total, 4) if total else 0.0,
+            "throughput_rps": round(total / wall_time, 2) if wall_time else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+class LoadGenerator:
+    """
+    Drives a fixed number of virtual users against the API for a given duration.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, args, rng: random.Random):
+        self.client = client
+        self.args = args
+        self.rng = rng
+        self.stats = Stats()
+        self.queries = build_query_pool(args.queries, rng)
+        self.zipf = ZipfSampler(len(self.queries), args.zipf_s, rng)
+        self.mix_names = list(DEFAULT_MIX)
+        self.mix_weights = [DEFAULT_MIX[name] for name in self.mix_names]
+        self.users = []            # list of (username, password, token)
+        self.search_ids = []       # search ids seen so far, shared between virtual users
+        self.offer_ids = []        # offer ids seen on result pages
+        self.deadline = 0.0
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        """
+        Issue one request and record its latency under the endpoint label.
+        """
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            response = None
+            ok = False
+        self.stats.record(endpoint, time.perf_counter() - start, ok)
+        return response if ok else None
+
+    async def setup_users(self):
+        """
+        Register the virtual users and log them in once to get tokens.
+        """
+        run_id = self.rng.randrange(10**8)
+        for i in range(self.args.users):
+            username = f"load_{run_id}_{i}"
+            password = "LoadTest123!"
+            await self.client.post("/auth/register", json={
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": password,
+            })
+            resp = await self.client.post("/auth/login", json={"username": username, "password": password})
+            token = resp.json().get("access_token") if resp.status_code == 200 else None
+            self.users.append((username, password, token))
+
+    async def do_search(self, user):
+        query = self.queries[self.zipf.sample()]
+        headers = {"Authorization": f"Bearer {user[2]}"} if user[2] else {}
+        resp = await self.request("POST /search", "POST", "/search/", json={"query": query}, headers=headers)
+        if resp is not None:
+            self.search_ids.append(resp.json()["id"])
+
+    async def do_offers(self, user):
+        if not self.search_ids:
+            return await self.do_search(user)
+        search_id = self.rng.choice(self.search_ids[-200:])
+        params = {
+            "search_id": search_id,
+            "page": self.rng.choice([1, 1, 1, 2, 3]),
+            "page_size": 20,
+            "sort_by": self.rng.choice(["last_price", "last_price", "rating"]),
+            "sort_order": self.rng.choice(["asc", "desc"]),
+        }
+        if self.rng.random() < 0.3:
+            params["source"] = self.rng.choice(["ebay", "amazon", "dummyjson"])
+        if self.rng.random() < 0.2:
+            params["min_price"] = 50
+            params["max_price"] = 800
+        resp = await self.request("GET /offers", "GET", "/offers/", params=params)
+        if resp is not None:
+            self.offer_ids.extend(offer["id"] for offer in resp.json()["offers"][:5])
+            del self.offer_ids[:-1000]
+
+    async def do_price_history(self, user):
+        if not self.offer_ids:
+            return await self.do_offers(user)
+        offer_id = self.rng.choice(self.offer_ids)
+        await self.request("GET /offers/price", "GET", f"/offers/price/{offer_id}")
+
+    async def do_deals(self, user):
+        await self.request("GET /deals/recent", "GET", "/deals/recent", params={"limit": 15, "hours": 48})
+
+    async def do_login(self, user):
+        await self.request("POST /auth/login", "POST", "/auth/login",
+                           json={"username": user[0], "password": user[1]})
+
+    async def do_watchlist(self, user):
+        if not user[2]:
+            return
+        headers = {"Authorization": f"Bearer {user[2]}"}
+        if self.offer_ids and self.rng.random() < 0.3:
+            offer_id = self.rng.choice(self.offer_ids)
+            await self.request("POST /user/watchlist", "POST", "/user/watchlist", headers=headers,
+                               json={"offer_id": offer_id, "product_title": f"offer {offer_id}"})
+        else:
+            await self.request("GET /user/watchlist", "GET", "/user/watchlist", headers=headers)
+
+    async def virtual_user(self, index: int):
+        """
+        One virtual user: pick an operation from the mix, run it, think, repeat.
+        """
+        user = self.users[index % len(self.users)]
+        while time.perf_counter() < self.deadline:
+            operation = self.rng.choices(self.mix_names, weights=self.mix_weights)[0]
+            await getattr(self, f"do_{operation}")(user)
+            if self.args.think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+    async def run(self) -> dict:
+        await self.setup_users()
+        start = time.perf_counter()
+        self.deadline = start + self.args.duration
+        await asyncio.gather(*(self.virtual_user(i) for i in range(self.args.concurrency)))
+        return self.stats.summary(time.perf_counter() - start)
+
+
+def print_report(summary: dict):
+    print()
+    print("=" * 96)
+    print(f"{'endpoint':<22}{'count':>8}{'errors':>8}{'err%':>8}{'rps':>9}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}")
+    print("-" * 96)
+    for endpoint, row in summary["endpoints"].items():
+        print(f"{endpoint:<22}{row['count']:>8}{row['errors']:>8}{row['error_rate'] * 100:>7.2f}%"
+              f"{row['throughput_rps']:>9.2f}{row['p50_ms']:>11.2f}{row['p95_ms']:>11.2f}{row['p99_ms']:>11.2f}")
+    print("-" * 96)
+    print(f"Total: {summary['requests']} requests in {summary['wall_time_s']}s, "
+          f"{summary['throughput_rps']} req/s, error rate {summary['error_rate'] * 100:.2f}%")
+    print("=" * 96)
+
+
+async def run_load(args) -> dict:
+    """
+    Run the workload either in-process (ASGI transport) or against --base-url.
+    """
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        async with client:
+            summary = await LoadGenerator(client, args, rng).run()
+    else:
+        install_fake_upstreams(args.latency_scale, args.items_per_source)
+        await init_database()
+        from backend.main import app
+        logging.getLogger().setLevel(logging.WARNING)
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            summary = await LoadGenerator(client, args, rng).run()
+
+    print_report(summary)
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+        print(f"Results written to {args.json}")
+    return summary
+
+
+def serve(args):
+    """
+    Start the app with fake upstreams so external load tools can hit it.
+    """
+    import uvicorn
+
+    random.seed(args.seed)
+    install_fake_upstreams(args.latency_scale, args.items_per_source)
+    asyncio.run(init_database())
+    from backend.main import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BestPRICE load-test harness")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_upstream_args(p):
+        p.add_argument("--latency-scale", type=float, default=1.0, help="Multiply fake upstream latencies")
+        p.add_argument("--items-per-source", type=int, default=40, help="Items returned per fake upstream")
+        p.add_argument("--seed", type=int, default=42, help="Random seed for reproducible runs")
+
+    run_parser = subparsers.add_parser("run", help="Run the workload")
+    run_parser.add_argument("--base-url", default=None, help="Target a running server instead of the in-process app")
+    run_parser.add_argument("--concurrency", type=int, default=20, help="Number of virtual users")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds")
+    run_parser.add_argument("--users", type=int, default=10, help="Registered accounts shared by virtual users")
+    run_parser.add_argument("--queries", type=int, default=200, help="Distinct queries in the popularity pool")
+    run_parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent for query popularity")
+    run_parser.add_argument("--think-time", type=float, default=0.05, help="Mean think time between calls (s)")
+    run_parser.add_argument("--timeout", type=float, default=60.0, help="Per-request client timeout (s)")
+    run_parser.add_argument("--json", default=None, help="Write the summary as JSON to this path")
+    add_upstream_args(run_parser)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve the app backed by fake upstreams")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8001)
+    add_upstream_args(serve_parser)
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    if arguments.command == "serve":
+        serve(arguments)
+    else:
+        asyncio.run(run_load(arguments))
@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, StaticPool
+from backend.database import (
+    build_async_engine, engine_options, get_profile, get_read_session, read_database_url, read_only_pragmas,
+)
+from backend.main import app
+
+
+def test_engine_options_per_profile():
+    """
+    engine_options: SQLite files get a sized pool, in-memory SQLite one shared connection, other DBs pre-ping
+    """
+    production = get_profile("production")
+
+    options = engine_options("sqlite+aiosqlite:///./app.db", production, is_async=True)
+    assert options["poolclass"] is AsyncAdaptedQueuePool
+    assert options["pool_size"] == production["pool_size"]
+    assert options["max_overflow"] == production["max_overflow"]
+
+    assert engine_options("sqlite+aiosqlite://", production, is_async=True)["poolclass"] is StaticPool
+    assert engine_options("sqlite+aiosqlite:///./app.db", get_profile("test"), is_async=True)["poolclass"] is NullPool
+    assert "poolclass" not in engine_options("sqlite+aiosqlite:///./app.db", get_profile("default"), is_async=True)
+
+    postgres = engine_options("postgresql+asyncpg://user@db/app", production, is_async=True)
+    assert postgres["pool_pre_ping"] is True
+    assert postgres["pool_recycle"] == production["pool_recycle"]
+    assert "connect_args" not in postgres
+    assert engine_options("postgresql+asyncpg://user@db/app", get_profile("test"), is_async=True) == {"poolclass": NullPool}
+
+
+def test_get_profile_overrides_and_unknown(monkeypatch):
+    """
+    get_profile: pool sizing can be overridden from the environment, unknown profiles are rejected
+    """
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    assert get_profile("production")["pool_size"] == 3
+
+    with pytest.raises(ValueError):
+        get_profile("staging")
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    """
+    build_async_engine: every new SQLite connection gets the profile's pragmas
+    """
+    engine = build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}", "production")
+    async with engine.connect() as conn:
+        journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+        busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+        mmap_size = (await conn.execute(text("PRAGMA mmap_size"))).scalar()
+    await engine.dispose()
+
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == 5000
+    assert mmap_size == 268435456
+
+
+def test_read_database_url():
+    """
+    read_database_url: SQLite files reopen with mode=ro, a configured replica wins, other URLs are reused
+    """
+    assert read_database_url("sqlite+aiosqlite:///./app.db", None) == \
+        "sqlite+aiosqlite:///file:./app.db?mode=ro&uri=true"
+    assert read_database_url("sqlite+aiosqlite://", None) == "sqlite+aiosqlite://"
+    assert read_database_url("postgresql+asyncpg://user@db/app", None) == "postgresql+asyncpg://user@db/app"
+    assert read_database_url("postgresql+asyncpg://user@db/app", "postgresql+asyncpg://user@replica/app") == \
+        "postgresql+asyncpg://user@replica/app"
+
+
+def test_read_only_pragmas():
+    """
+    read_only_pragmas: the journal mode is left to the writer and query_only is switched on
+    """
+    pragmas = read_only_pragmas(get_profile("production")["pragmas"])
+
+    assert "journal_mode" not in pragmas
+    assert pragmas["query_only"] == "ON"
+    assert pragmas["busy_timeout"] == 5000
+
+
+@pytest.mark.asyncio
+async def test_read_only_engine_rejects_writes(tmp_path):
+    """
+    build_async_engine: a read-only engine sees the writer's rows but can't write itself
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'split.db'}"
+    writer = build_async_engine(url, "production")
+    reader = build_async_engine(read_database_url(url, None), "production", read_only=True)
+    async with writer.begin() as conn:
+        await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        await conn.execute(text("INSERT INTO items (name) VALUES ('a')"))
+
+    async with reader.connect() as conn:
+        assert (await conn.execute(text("SELECT count(*) FROM items"))).scalar() == 1
+        with pytest.raises(OperationalError):
+            await conn.execute(text("INSERT INTO items (name) VALUES ('b')"))
+    await reader.dispose()
+    await writer.dispose()
+
+
+def test_read_only_routes_use_read_session():
+    """
+    Routers: GET endpoints declare the read session, writes keep the read-write one
+    """
+    read_routes = {"/offers/", "/offers/export", "/offers/price/{offer_id}", "/deals/recent", "/search/recent",
+                   "/auth/me", "/user/watchlist", "/user/recent-searches"}
+    checked = set()
+
+    for route in app.routes:
+        if not hasattr(route, "dependant"):
+            continue
+        dependencies = {dependency.call for dependency in route.dependant.dependencies}
+        if "GET" in route.methods and route.path in read_routes:
+            assert get_read_session in dependencies, route.path
+            checked.add(route.path)
+        elif route.methods & {"POST", "DELETE"}:
+            assert get_read_session not in dependencies, route.path
+
+    assert checked == read_routes
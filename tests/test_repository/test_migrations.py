@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.database import Base
+from backend.init_db import alembic_config, async_init_db
+
+
+async def schema_diff(url: str) -> list:
+    engine = create_async_engine(url)
+    async with engine.connect() as conn:
+        diff = await conn.run_sync(lambda sync_conn: compare_metadata(MigrationContext.configure(sync_conn), Base.metadata))
+    await engine.dispose()
+    return diff
+
+
+async def searches_columns_and_indexes(url: str) -> tuple:
+    engine = create_async_engine(url)
+    async with engine.connect() as conn:
+        result = await conn.run_sync(lambda sync_conn: (
+            {column["name"] for column in inspect(sync_conn).get_columns("searches")},
+            {index["name"] for index in inspect(sync_conn).get_indexes("searches")},
+        ))
+    await engine.dispose()
+    return result
+
+
+@pytest.mark.asyncio
+async def test_migrations_match_models(tmp_path):
+    """
+    async_init_db: the migrated schema is exactly what the models declare
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'migrated.db'}"
+    await async_init_db(url)
+
+    assert await schema_diff(url) == []
+
+
+@pytest.mark.asyncio
+async def test_migrations_downgrade_and_upgrade_again(tmp_path):
+    """
+    Migrations: every revision downgrades cleanly and the schema can be rebuilt from scratch
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'roundtrip.db'}"
+    await async_init_db(url)
+    await asyncio.to_thread(command.downgrade, alembic_config(url), "0002")
+
+    columns, indexes = await searches_columns_and_indexes(url)
+    assert "ix_searches_normalized_query" in indexes
+    assert "idx_searches_normalized_created" not in indexes
+
+    await asyncio.to_thread(command.downgrade, alembic_config(url), "base")
+    await async_init_db(url)
+    assert await schema_diff(url) == []
+
+
+@pytest.mark.asyncio
+async def test_migrations_adopt_database_made_by_create_all(tmp_path):
+    """
+    async_init_db: a database the old init_db built (no alembic_version, no canonical_query) is brought up to date
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}"
+    await asyncio.to_thread(command.upgrade, alembic_config(url), "0001")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE alembic_version"))
+        await conn.execute(text("INSERT INTO searches (query, normalized_query) VALUES ('iPhone 15', 'iphone 15')"))
+    await engine.dispose()
+
+    await async_init_db(url)
+
+    columns, indexes = await searches_columns_and_indexes(url)
+    assert {"canonical_query", "is_warmup"} <= columns
+    assert "idx_searches_canonical_created" in indexes
+    assert await schema_diff(url) == []
+
+    engine = create_async_engine(url)
+    async with engine.connect() as conn:
+        canonical = (await conn.execute(text("SELECT canonical_query FROM searches"))).scalar_one()
+    await engine.dispose()
+    assert canonical == "15 iphone"
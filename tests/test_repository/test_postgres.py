@@ -0,0 +1,216 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql
+
+from backend.database import AsyncSessionLocal, UTCDateTime
+from backend.models.offers import Offer
+from backend.models.pricehistory import PriceHistory
+from backend.models.search_source_fetch import SearchSourceFetch
+from backend.models.search_offer_link import SearchOfferLink
+from backend.repositories.repository import Repository
+from backend.schemas.search_schema import SearchCreate
+from backend.services.deals_service import get_query_group_offers, get_query_group_offers_postgres, query_group_offers_postgres_stmt
+
+
+def make_offer_data(source_offer_id, price, title="Postgres Phone"):
+    return {"source": "ebay", "source_offer_id": source_offer_id, "last_price": price, "title": title,
+            "url": f"http://offers/{source_offer_id}", "currency": "USD", "rating": 4.0}
+
+
+def postgres_session():
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    session.commit = AsyncMock()
+    return session
+
+
+def test_deals_statement_uses_distinct_on_and_window():
+    """
+    query_group_offers_postgres_stmt: latest search per offer via DISTINCT ON, group sizes via a window count
+    """
+    sql = str(query_group_offers_postgres_stmt(datetime.utcnow()).compile(dialect=postgresql.dialect()))
+
+    assert "DISTINCT ON" in sql
+    assert "count(*) OVER (PARTITION BY" in sql
+
+
+@pytest.mark.asyncio
+async def test_update_or_create_offer_with_history_postgres_fast_path():
+    """
+    update_or_create_offer_with_history: on PostgreSQL offers are upserted, linked and their history copied in bulk
+    """
+    repo = Repository()
+    offers = [MagicMock(id=1, last_price=100, currency="USD"), MagicMock(id=2, last_price=200, currency="USD")]
+    repo.upsert_offers = AsyncMock(return_value=offers)
+    repo.link_offers = AsyncMock()
+    repo.bulk_insert_price_history = AsyncMock()
+    repo.get_or_create_offer = AsyncMock()
+    session = postgres_session()
+
+    result = await repo.update_or_create_offer_with_history(
+        [make_offer_data("1", 100), make_offer_data("2", 200)], search_id=5, session=session
+    )
+
+    assert result == offers
+    repo.get_or_create_offer.assert_not_awaited()
+    repo.link_offers.assert_awaited_once_with(5, [1, 2], session)
+    history = repo.bulk_insert_price_history.await_args.args[0]
+    assert [row["offer_id"] for row in history] == [1, 2]
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_upsert_offers_statement():
+    """
+    upsert_offers: one INSERT ... ON CONFLICT on (source, source_offer_id), duplicates in a batch collapse
+    """
+    repo = Repository()
+    session = postgres_session()
+    upsert_result = MagicMock()
+    upsert_result.all.return_value = [(11, "ebay", "a")]
+    offer = MagicMock(id=11)
+    load_result = MagicMock()
+    load_result.scalars.return_value.all.return_value = [offer]
+    session.execute = AsyncMock(side_effect=[upsert_result, load_result])
+
+    result = await repo.upsert_offers([make_offer_data("a", 10), make_offer_data("a", 9)], session)
+
+    assert result == [offer, offer]
+    stmt = session.execute.await_args_list[0].args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uix_source_offer DO UPDATE" in sql
+    assert "RETURNING" in sql
+    assert len(stmt.compile(dialect=postgresql.dialect()).params) == 10  # one row of 10 columns
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_price_history_executemany_off_postgres():
+    """
+    bulk_insert_price_history: other databases get a single executemany INSERT
+    """
+    repo = Repository()
+    session = MagicMock()
+    session.execute = AsyncMock()
+    rows = [{"offer_id": 1, "price": 10, "currency": "USD"}, {"offer_id": 2, "price": 20, "currency": "USD"}]
+
+    await repo.bulk_insert_price_history(rows, session)
+
+    stmt, params = session.execute.await_args.args
+    assert stmt.table.name == "price_history"
+    assert params == rows
+
+
+def test_utc_datetime_binds_naive_as_utc():
+    """
+    UTCDateTime: naive values are bound as UTC, timezone-aware results come back as naive UTC
+    """
+    column_type = UTCDateTime()
+    dialect = postgresql.dialect()
+    naive = datetime(2024, 5, 1, 12, 30)
+
+    bound = column_type.process_bind_param(naive, dialect)
+    loaded = column_type.process_result_value(datetime(2024, 5, 1, 14, 30, tzinfo=timezone(timedelta(hours=2))), dialect)
+
+    assert bound == naive.replace(tzinfo=timezone.utc)
+    assert loaded == naive and loaded.tzinfo is None
+    assert column_type.process_bind_param(None, dialect) is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_price_history_copy_records_utc():
+    """
+    bulk_insert_price_history: on PostgreSQL COPY gets fetched_at as timezone-aware UTC
+    """
+    repo = Repository()
+    session = postgres_session()
+    driver_connection = MagicMock(copy_records_to_table=AsyncMock())
+    raw_connection = MagicMock(driver_connection=driver_connection)
+    connection = MagicMock(get_raw_connection=AsyncMock(return_value=raw_connection))
+    session.connection = AsyncMock(return_value=connection)
+    fetched_at = datetime(2024, 5, 1, 12, 30)
+
+    await repo.bulk_insert_price_history([{"offer_id": 1, "price": 10, "currency": "USD", "fetched_at": fetched_at}],
+                                         session)
+
+    kwargs = driver_connection.copy_records_to_table.await_args.kwargs
+    assert kwargs["columns"] == ["offer_id", "price", "currency", "fetched_at"]
+    assert kwargs["records"] == [(1, 10, "USD", fetched_at.replace(tzinfo=timezone.utc))]
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_postgres_naive_utc_round_trip():
+    """
+    PostgreSQL: naive UTC times are stored as UTC and read back naive, so fresh searches and fetches are found
+    """
+    repo = Repository()
+    async with AsyncSessionLocal() as session:
+        search = await repo.create_search(SearchCreate(query="postgres utc phone"), session)
+        fetched_at = datetime.utcnow() - timedelta(minutes=5)
+        repo.record_source_fetch(search.id, "ebay", "ok", 0, session, fetched_at=fetched_at)
+        await session.commit()
+
+        cached = await repo.get_cached_offers(search.normalized_query, 10, session)
+        fresh = await repo.get_fresh_source_fetches(search.canonical_query, {"ebay": {"ok": 10}}, session)
+        stored = (await session.execute(
+            select(SearchSourceFetch.fetched_at).where(SearchSourceFetch.search_id == search.id)
+        )).scalar()
+
+    assert cached.id == search.id
+    assert fresh["ebay"].search_id == search.id
+    assert stored.tzinfo is None
+    assert abs(stored - fetched_at) < timedelta(seconds=1)
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_postgres_upsert_and_copy_round_trip():
+    """
+    PostgreSQL: a repeated offer is updated in place and every ingestion copies a price history row
+    """
+    repo = Repository()
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(PriceHistory).where(PriceHistory.offer_id.in_(
+            select(Offer.id).where(Offer.source_offer_id.like("pg-%"))
+        )).execution_options(synchronize_session=False))
+        first_search = await repo.create_search(SearchCreate(query="postgres phone"), session)
+        await repo.update_or_create_offer_with_history([make_offer_data("pg-1", 100), make_offer_data("pg-2", 150)],
+                                                       first_search.id, session)
+        second_search = await repo.create_search(SearchCreate(query="postgres phone"), session)
+        offers = await repo.update_or_create_offer_with_history([make_offer_data("pg-1", 90)], second_search.id, session)
+
+        assert offers[0].last_price == 90
+        assert offers[0].last_seen_at is not None
+        history_count = (await session.execute(
+            select(func.count()).select_from(PriceHistory).where(PriceHistory.offer_id == offers[0].id)
+        )).scalar()
+        assert history_count == 2
+        links = (await session.execute(
+            select(func.count()).select_from(SearchOfferLink).where(SearchOfferLink.search_id == second_search.id)
+        )).scalar()
+        assert links == 1
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_postgres_deals_groups_match_generic_query():
+    """
+    PostgreSQL: the single-statement deals query finds the same groups and offers as the per-group one
+    """
+    repo = Repository()
+    async with AsyncSessionLocal() as session:
+        search = await repo.create_search(SearchCreate(query="pg deals group"), session)
+        await repo.update_or_create_offer_with_history(
+            [make_offer_data(f"pg-deal-{i}", 100 + i, title="PG Deal") for i in range(6)], search.id, session
+        )
+        cutoff = datetime.utcnow() - timedelta(hours=1)
+
+        generic = await get_query_group_offers(session, cutoff)
+        fast = await get_query_group_offers_postgres(session, cutoff)
+
+    assert set(fast) == set(generic)
+    for group, rows in generic.items():
+        assert sorted(offer.id for offer, _ in fast[group]) == sorted(offer.id for offer, _ in rows)
+        assert all(search_date.tzinfo is None for _, search_date in fast[group])
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.init_db import async_init_db
+from backend.models.search_offer_link import SearchOfferLink
+from backend.repositories.repository import Repository
+from backend.services.deals_service import get_query_group_offers
+from backend.services.offer_service import get_offers_for_search
+from backend.services.user_service import UserService
+from backend.utils.error import NotFoundError
+
+
+@pytest_asyncio.fixture
+async def planner(tmp_path):
+    """
+    Migrated database and a session whose SELECTs are recorded, with a function returning their query plans
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}"
+    await async_init_db(url)
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO searches (query, normalized_query, canonical_query, created_at, is_warmup) "
+            "VALUES ('iPhone 15', 'iphone 15', '15 iphone', datetime('now'), 0)"
+        ))
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record_select(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    async def plans() -> list:
+        recorded = list(statements)
+        statements.clear()
+        details = []
+        async with engine.connect() as conn:
+            for statement, parameters in recorded:
+                rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+                details.append(" | ".join(row[-1] for row in rows))
+        return details
+
+    async with sessionmaker(engine, class_=AsyncSession)() as session:
+        yield session, plans
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_plan_get_cached_offers(planner):
+    """
+    Repository.get_cached_offers: the latest search for a query is one seek on (normalized_query, created_at)
+    """
+    session, plans = planner
+    await Repository().get_cached_offers("iphone 15", 10, session)
+
+    [plan] = await plans()
+    assert "USING INDEX idx_searches_normalized_created (normalized_query=?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_plan_recent_searches(planner):
+    """
+    Repository recent searches: global ones walk created_at, a user's seek (user_id, created_at), neither sorts
+    """
+    session, plans = planner
+    await Repository().get_recent_searches(session)
+    await Repository().get_user_recent_searches(1, session)
+
+    recent, user_recent = await plans()
+    assert "USING INDEX idx_searches_created_at" in recent
+    assert "USING INDEX idx_searches_user_created (user_id=?)" in user_recent
+    assert "TEMP B-TREE" not in recent + user_recent
+
+
+@pytest.mark.asyncio
+async def test_plan_fresh_source_fetches_and_popular_queries(planner):
+    """
+    Repository: source fetches and popular queries never scan the searches table
+    """
+    session, plans = planner
+    await Repository().get_fresh_source_fetches("15 iphone", {"ebay": {"ok": 30}}, session)
+    await Repository().get_popular_queries(datetime.utcnow() - timedelta(days=1), 10, 1, session)
+
+    for plan in await plans():
+        assert "SCAN searches" not in plan
+        assert "SCAN search_source_fetches" not in plan
+
+
+@pytest.mark.asyncio
+async def test_plan_search_offers_and_offers_page(planner):
+    """
+    Repository.get_search_offers / get_offers_for_search: links are found by search_id, offers by primary key
+    """
+    session, plans = planner
+    await Repository().get_search_offers(1, session)
+    await get_offers_for_search(1, session)
+    await Repository().get_offers_by_ids([1, 2], session)
+
+    *recorded, page = await plans()
+    assert len(recorded) == 2  # offers of the search, then its snapshot columns
+    for plan in recorded:
+        assert "USING COVERING INDEX sqlite_autoindex_search_offer_link_1 (search_id=?)" in plan
+        assert "SEARCH offers USING INTEGER PRIMARY KEY" in plan
+    assert "SEARCH offers USING INTEGER PRIMARY KEY (rowid=?)" in page
+
+
+@pytest.mark.asyncio
+async def test_plan_links_by_offer(planner):
+    """
+    search_offer_link: the searches an offer appeared in are found through (offer_id, search_id)
+    """
+    session, plans = planner
+    await session.execute(select(SearchOfferLink.search_id).where(SearchOfferLink.offer_id == 1))
+
+    [plan] = await plans()
+    assert "USING COVERING INDEX idx_search_offer_link_offer (offer_id=?)" in plan
+
+
+@pytest.mark.asyncio
+async def test_plan_deals_window(planner):
+    """
+    get_query_group_offers: recent query groups come from the created_at index, a group's searches from a
+    (canonical_query, created_at) seek - never a scan
+    """
+    session, plans = planner
+    await get_query_group_offers(session, datetime.utcnow() - timedelta(hours=1))
+
+    groups, offers = await plans()
+    assert "USING INDEX idx_searches_created_at (created_at>? AND created_at<?)" in groups
+    assert "INDEX idx_searches_canonical_created (canonical_query=? AND created_at>?)" in offers
+    assert "(search_id=?)" in offers
+    assert "SCAN searches" not in groups + offers
+
+
+@pytest.mark.asyncio
+async def test_plan_watchlist(planner):
+    """
+    UserService: the watchlist page seeks (user_id, created_at) without sorting, removals seek offer_id
+    """
+    session, plans = planner
+    await UserService().get_user_watchlist(1, session)
+    with pytest.raises(NotFoundError):
+        await UserService().remove_from_watchlist(1, 1, session)
+
+    watchlist, remove = await plans()
+    assert "USING INDEX idx_watchlist_user_created (user_id=?)" in watchlist
+    assert "TEMP B-TREE" not in watchlist
+    assert "USING INDEX idx_watchlist_offer (offer_id=?)" in remove
+
+
+@pytest.mark.asyncio
+async def test_plan_retention_selects(planner):
+    """
+    Repository retention queries: anonymous searches seek (user_id IS NULL, created_at), orphan checks seek the link
+    and watchlist indexes
+    """
+    session, plans = planner
+    await Repository().get_expired_search_ids(datetime.utcnow(), 10, session)
+    await Repository().get_orphan_offer_ids(datetime.utcnow(), 10, session)
+
+    searches, offers = await plans()
+    assert "USING COVERING INDEX idx_searches_user_created (user_id=? AND created_at<?)" in searches
+    assert "USING COVERING INDEX idx_search_offer_link_offer (offer_id=?)" in offers
+    assert "USING INDEX idx_watchlist_offer (offer_id=?)" in offers
@@ -183,6 +183,7 @@ async def test_get_or_create_offer_new():
     added_offer = session.add.call_args[0][0]
     assert added_offer.title == "New Product"
     assert added_offer.last_price == 199.99
+    assert added_offer.created_at is not None  # Loaded without a refresh, so it can be serialized right away
 
 
 @pytest.mark.asyncio
@@ -210,6 +211,20 @@ async def test_create_price_history():
     assert history.currency == "USD"
 
 
+def test_canonical_query_shares_key_across_variants():
+    """
+    canonical_query: word order and letter/digit spacing don't change the key
+    """
+    assert Repository.canonical_query("iPhone 15 Pro") == Repository.canonical_query("pro iphone15")
+
+
+def test_canonical_query_falls_back_to_normalized():
+    """
+    canonical_query: a query made only of punctuation keeps its normalized form
+    """
+    assert Repository.canonical_query("  ?!  ") == "?!"
+
+
 @pytest.mark.asyncio
 async def test_update_or_create_offer_with_history():
     """
@@ -239,6 +254,49 @@ async def test_update_or_create_offer_with_history():
     session.commit.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_update_or_create_offer_with_history_without_commit():
+    """
+    update_or_create_offer_with_history: commit=False only flushes, the caller commits
+    """
+    repo = Repository()
+    repo.get_or_create_offer = AsyncMock(return_value=MagicMock(id=1, last_price=100, currency="USD"))
+
+    session = MagicMock()
+    session.commit = AsyncMock()
+    session.flush = AsyncMock()
+
+    offers_data = [{"source": "ebay", "source_offer_id": "1", "last_price": 100, "title": "Offer1", "url": "http://1", "currency": "USD"}]
+    await repo.update_or_create_offer_with_history(offers_data, search_id=99, session=session, commit=False)
+
+    session.flush.assert_awaited_once()
+    session.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reuse_source_offers_links_and_keeps_fetch_time():
+    """
+    reuse_source_offers: links the source's offers to the new search and keeps the original fetch time
+    """
+    repo = Repository()
+    offers = [MagicMock(id=1), MagicMock(id=2)]
+    result = MagicMock()
+    result.scalars().all.return_value = offers
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+
+    fetched_at = datetime.utcnow() - timedelta(minutes=30)
+    fetch = MagicMock(search_id=3, source="amazon", status="ok", fetched_at=fetched_at)
+
+    reused = await repo.reuse_source_offers(fetch, search_id=10, session=session)
+
+    assert reused == offers
+    links = session.add_all.call_args[0][0]
+    assert [(l.search_id, l.offer_id) for l in links] == [(10, 1), (10, 2)]
+    recorded = session.add.call_args[0][0]
+    assert (recorded.search_id, recorded.source, recorded.offer_count, recorded.fetched_at) == (10, "amazon", 2, fetched_at)
+
+
 @pytest.mark.asyncio
 async def test_get_recent_searches_success():
     """
@@ -93,3 +93,16 @@ def test_transform_search_results_empty_sources():
     }
     result = transform_search_results(raw)
     assert result == []
+
+
+def test_transform_search_results_skipped_sources():
+    """
+    transform_search_results: handles the empty placeholders of failed/skipped sources
+    """
+    raw = {
+        'ebay': [],
+        'dummyjson': [],
+        'amazon': {'products': []}
+    }
+    result = transform_search_results(raw)
+    assert result == []
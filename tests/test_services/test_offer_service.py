@@ -32,6 +32,7 @@ async def test_get_offers_for_search_success():
         source_offer_id="1", created_at=datetime.utcnow(), rating=5, seller="seller", image_url="http://image.url"
     )
     result = MagicMock()
+    result.all.return_value = [(1, Decimal("19.99"), 5, "ebay")]  # Snapshot columns
     result.scalars.return_value.all.return_value = [offer]
     session.execute = AsyncMock(return_value=result)
     session.scalar = AsyncMock(return_value=1)  # Mock count
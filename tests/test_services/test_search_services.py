@@ -1,10 +1,17 @@
+import asyncio
 import pytest
+from contextlib import asynccontextmanager
+from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime
 
-from backend.services.search_services import SearchService
+from backend.services.search_services import SearchService, SourceResults, source_cache_ttl_minutes, source_cache_windows
 from backend.schemas.search_schema import SearchCreate
+from backend.utils.admission import AdmissionController
+from backend.utils.error import ServiceOverloadedError, ValidationError
+from backend.utils.circuit_breaker import get_circuit_breaker
+from backend.utils.raw_cache import RawResponseCache
 
 
 def make_search_obj(id=1, query="laptop", normalized_query="laptop", created_at=None):
@@ -18,6 +25,15 @@ def make_search_obj(id=1, query="laptop", normalized_query="laptop", created_at=
         created_at=created_at or datetime.utcnow()
     )
 
+def make_fresh_fetches(search_id, sources=("ebay", "dummyjson", "amazon")):
+    """
+    Helper function to create fresh SearchSourceFetch-like objects for the given sources.
+    """
+    return {
+        source: SimpleNamespace(search_id=search_id, source=source, status="ok", fetched_at=datetime.utcnow())
+        for source in sources
+    }
+
 @pytest.mark.asyncio
 async def test_search_all_sources_success(monkeypatch):
     """
@@ -42,6 +58,27 @@ async def test_search_all_sources_success(monkeypatch):
     assert res["ebay"] == [{"itemId": "E1"}, {"itemId": "E2"}]
     assert res["dummyjson"]["items_filtered"] == [{"id": 10}, {"id": 11}]
 
+@pytest.mark.asyncio
+async def test_fetch_source_uses_raw_cache(monkeypatch):
+    """
+    fetch_source: a repeated query is served from the raw response cache without an upstream call.
+    """
+    calls = 0
+
+    async def counting_amazon(q):
+        nonlocal calls
+        calls += 1
+        return {"products": [{"asin": "A1"}]}
+
+    monkeypatch.setattr("backend.services.search_services.search_amazon", counting_amazon)
+    service = SearchService(repository=MagicMock(), transform_service=MagicMock())
+
+    first = await service.fetch_source("amazon", "tv")
+    second = await service.fetch_source("amazon", "tv")
+
+    assert first == second == {"products": [{"asin": "A1"}]}
+    assert calls == 1
+
 @pytest.mark.asyncio
 async def test_search_all_sources_ebay_error(monkeypatch, caplog):
     """
@@ -87,6 +124,138 @@ async def test_search_all_sources_dummyjson_error(monkeypatch, caplog):
         assert "DummyJSON search failed (skipping)" in caplog.text
 
 
+@pytest.mark.asyncio
+async def test_search_all_sources_deadline_skips_stragglers(monkeypatch):
+    """
+    search_all_sources: returns completed sources at the deadline and cancels the slow ones.
+    """
+    cancelled = asyncio.Event()
+
+    async def fast_ebay(q):
+        return {"itemSummaries": [{"itemId": "E1"}]}
+    async def fast_dummy(q):
+        return {"products": []}
+    async def slow_amazon(q):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr("backend.services.search_services.search_ebay", fast_ebay)
+    monkeypatch.setattr("backend.services.search_services.search_dummyjson", fast_dummy)
+    monkeypatch.setattr("backend.services.search_services.search_amazon", slow_amazon)
+
+    service = SearchService(repository=MagicMock(), transform_service=MagicMock(), deadline_seconds=0.05)
+    res = await service.search_all_sources("x")
+
+    assert res["ebay"] == [{"itemId": "E1"}]
+    assert res["amazon"] == {"products": []}
+    assert res.skipped == {"amazon": "deadline"}
+    assert cancelled.is_set()
+
+@pytest.mark.asyncio
+async def test_search_all_sources_skips_open_circuit(monkeypatch):
+    """
+    search_all_sources: a source with an open circuit is not called and is reported as skipped.
+    """
+    ebay_calls = 0
+
+    async def counting_ebay(q):
+        nonlocal ebay_calls
+        ebay_calls += 1
+        return {"itemSummaries": []}
+    async def ok_source(q):
+        return {"products": []}
+
+    monkeypatch.setattr("backend.services.search_services.search_ebay", counting_ebay)
+    monkeypatch.setattr("backend.services.search_services.search_dummyjson", ok_source)
+    monkeypatch.setattr("backend.services.search_services.search_amazon", ok_source)
+
+    breaker = get_circuit_breaker("ebay")
+    for _ in range(breaker.min_calls):
+        breaker.record_failure(0.1)
+
+    service = SearchService(repository=MagicMock(), transform_service=MagicMock())
+    res = await service.search_all_sources("x")
+
+    assert ebay_calls == 0
+    assert res.skipped == {"ebay": "circuit_open"}
+
+@pytest.mark.asyncio
+async def test_search_source_safe_serves_raw_cache_with_circuit_open(monkeypatch):
+    """
+    search_source_safe: a cached payload is served even with the circuit open, without touching the breaker.
+    """
+    async def failing_amazon(q):
+        raise AssertionError("upstream must not be called")
+
+    monkeypatch.setattr("backend.services.search_services.search_amazon", failing_amazon)
+    raw_cache = RawResponseCache(path=":memory:")
+    await raw_cache.set("amazon", "tv", {"products": [{"asin": "A1"}]})
+
+    breaker = get_circuit_breaker("amazon")
+    for _ in range(breaker.min_calls):
+        breaker.record_failure(0.1)
+    rejected = breaker.rejected
+
+    service = SearchService(repository=MagicMock(), transform_service=MagicMock(), raw_cache=raw_cache)
+    source, payload, skip_reason = await service.search_source_safe("amazon", "tv")
+
+    assert skip_reason is None
+    assert payload == {"products": [{"asin": "A1"}]}
+    assert breaker.state == "open"
+    assert breaker.rejected == rejected
+
+@pytest.mark.asyncio
+async def test_search_source_safe_cache_hits_not_recorded(monkeypatch):
+    """
+    search_source_safe: only upstream calls are recorded by the breaker, cache hits leave its window alone.
+    """
+    calls = 0
+
+    async def counting_dummyjson(q):
+        nonlocal calls
+        calls += 1
+        return {"products": [{"id": 1}]}
+
+    monkeypatch.setattr("backend.services.search_services.search_dummyjson", counting_dummyjson)
+    service = SearchService(repository=MagicMock(), transform_service=MagicMock(),
+                            raw_cache=RawResponseCache(path=":memory:"))
+    breaker = get_circuit_breaker("dummyjson")
+
+    for _ in range(3):
+        _, payload, _ = await service.search_source_safe("dummyjson", "lamp")
+
+    assert calls == 1
+    assert len(breaker._window) == 1
+    assert payload["items_filtered"] == [{"id": 1}]
+
+@pytest.mark.asyncio
+async def test_perform_search_reports_skipped_sources():
+    """
+    perform_search: skipped sources from the fan-out are recorded in the response.
+    """
+    repo = MagicMock()
+    repo.normalize_query.return_value = "phone"
+    repo.get_fresh_source_fetches = AsyncMock(return_value={})
+    repo.create_search = AsyncMock(return_value=make_search_obj(id=3, query="phone", normalized_query="phone"))
+    repo.update_or_create_offer_with_history = AsyncMock()
+
+    async def fake_iter_sources(query, sources):
+        yield "ebay", [], None
+        yield "dummyjson", {"items_filtered": []}, None
+        yield "amazon", {"products": []}, "deadline"
+
+    service = SearchService(repository=repo, transform_service=MagicMock(return_value=[]))
+    service.iter_sources = fake_iter_sources
+
+    session = MagicMock()
+    session.commit = AsyncMock()
+    res = await service.perform_search(SearchCreate(query="phone"), session)
+
+    assert res.skipped_sources == {"amazon": "deadline"}
+
 @pytest.mark.asyncio
 async def test_perform_search_cache_hit():
     """
@@ -97,7 +266,8 @@ async def test_perform_search_cache_hit():
     repo.normalize_query.return_value = "laptop"
     # Simulate a found cached search record
     cached = make_search_obj(id=99, normalized_query="laptop")
-    repo.get_cached_offers = AsyncMock(return_value=cached)
+    repo.get_fresh_source_fetches = AsyncMock(return_value=make_fresh_fetches(99))
+    repo.get_search = AsyncMock(return_value=cached)
 
     # Ensure that if cache is hit, no create/search/transform/update are called
     repo.create_search = AsyncMock()
@@ -113,43 +283,453 @@ async def test_perform_search_cache_hit():
     # Check that the correct cached result is returned
     assert res.id == 99
     # Check that only cached methods were called
-    repo.get_cached_offers.assert_awaited_once()
+    repo.get_fresh_source_fetches.assert_awaited_once()
     repo.create_search.assert_not_called()
     repo.transform_service.assert_not_called()
     repo.update_or_create_offer_with_history.assert_not_called()
 
+@pytest.mark.asyncio
+async def test_perform_search_cache_hit_reports_failed_sources():
+    """
+    perform_search: a fully cached search reports sources whose reused fetch failed as skipped.
+    """
+    fresh = make_fresh_fetches(99)
+    fresh["amazon"].status = "circuit_open"
+    fresh["dummyjson"].status = "empty"
+    repo = MagicMock()
+    repo.normalize_query.return_value = "laptop"
+    repo.get_fresh_source_fetches = AsyncMock(return_value=fresh)
+    repo.get_search = AsyncMock(return_value=make_search_obj(id=99, normalized_query="laptop"))
+
+    service = SearchService(repository=repo, transform_service=MagicMock())
+    res = await service.perform_search(SearchCreate(query="laptop"), MagicMock())
+
+    assert res.id == 99
+    assert res.skipped_sources == {"amazon": "circuit_open"}
+
 @pytest.mark.asyncio
 async def test_perform_search_cache_miss():
     """
-    perform_search: creates search, fetches sources, transforms, stores, returns SearchResponse.
+    perform_search: creates search, transforms and stores each source as it arrives, commits once.
     """
     repo = MagicMock()
     repo.normalize_query.return_value = "phone"
-    repo.get_cached_offers = AsyncMock(return_value=None)
+    repo.get_fresh_source_fetches = AsyncMock(return_value={})
 
     # The repository returns a new created search 
     created = make_search_obj(id=1, query="phone", normalized_query="phone")
     repo.create_search = AsyncMock(return_value=created)
     repo.update_or_create_offer_with_history = AsyncMock()
 
-    # Faking ebay and dummy json responses
-    fake_raw = {"ebay": [{"itemId": "E1"}], "dummyjson": {"items_filtered": [{"id": 7}] }}
+    # Faking ebay and dummy json responses, arriving one after the other
+    async def fake_iter_sources(query, sources):
+        assert query == "phone"
+        yield "ebay", [{"itemId": "E1"}], None
+        yield "dummyjson", {"items_filtered": [{"id": 7}]}, None
 
     service = SearchService(repository=repo, transform_service=MagicMock(return_value=[{"title": "ok"}]))
-    service.search_all_sources = AsyncMock(return_value=fake_raw)
+    service.iter_sources = fake_iter_sources
 
     search_data = SearchCreate(query="phone")
     session = MagicMock()
+    session.commit = AsyncMock()
 
     res = await service.perform_search(search_data, session)
 
     # Validate overall flow of a cache miss in perform_search 
     assert res.id == 1
-    service.search_all_sources.assert_awaited_once_with("phone")
-    service.transform_service.assert_called_once_with(fake_raw)
-    repo.update_or_create_offer_with_history.assert_awaited_once()
+    service.transform_service.assert_any_call({"ebay": [{"itemId": "E1"}]})
+    service.transform_service.assert_any_call({"dummyjson": {"items_filtered": [{"id": 7}]}})
+    assert repo.update_or_create_offer_with_history.await_count == 2
+    repo.update_or_create_offer_with_history.assert_awaited_with([{"title": "ok"}], 1, session, commit=False)
+    session.commit.assert_awaited_once()
     repo.create_search.assert_awaited_once_with(search_data, session, None)
 
+def make_offer_obj(id, price, source="ebay", rating=None):
+    """
+    Helper function to create an Offer-like object compatible with OfferResponse.
+    """
+    return SimpleNamespace(
+        id=id, title=f"Offer {id}", last_price=Decimal(str(price)), currency="USD", url=f"http://offers/{id}",
+        source=source, source_offer_id=str(id), seller=None, image_url=None, rating=rating, created_at=datetime.utcnow()
+    )
+
+@pytest.mark.asyncio
+async def test_perform_search_include_offers_from_ingested_offers():
+    """
+    perform_search: include_offers returns the cheapest page of reused and written offers without reading them back.
+    """
+    fresh = make_fresh_fetches(3, sources=("dummyjson", "amazon"))
+    repo = MagicMock()
+    repo.normalize_query.return_value = "phone"
+    repo.get_fresh_source_fetches = AsyncMock(return_value=fresh)
+    repo.create_search = AsyncMock(return_value=make_search_obj(id=12, query="phone", normalized_query="phone"))
+    repo.reuse_source_offers = AsyncMock(side_effect=[[make_offer_obj(1, 30, "dummyjson")], []])
+    repo.update_or_create_offer_with_history = AsyncMock(return_value=[make_offer_obj(2, 10), make_offer_obj(3, 20)])
+
+    async def fake_iter_sources(query, sources):
+        yield "ebay", [{"itemId": "E1"}, {"itemId": "E2"}], None
+
+    service = SearchService(repository=repo, transform_service=lambda raw: [raw, raw])
+    service.iter_sources = fake_iter_sources
+    session = MagicMock()
+    session.commit = AsyncMock()
+
+    res = await service.perform_search(SearchCreate(query="phone"), session, include_offers=2)
+
+    assert [offer.id for offer in res.offers] == [2, 3]
+    assert res.pagination == {"page": 1, "page_size": 2, "total_count": 3, "total_pages": 2}
+    repo.get_offers_by_ids.assert_not_called()
+    session.execute.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_perform_search_include_offers_validation():
+    """
+    perform_search: include_offers outside 1-100 raises ValidationError before searching.
+    """
+    repo = MagicMock()
+    service = SearchService(repository=repo, transform_service=MagicMock())
+
+    with pytest.raises(ValidationError):
+        await service.perform_search(SearchCreate(query="phone"), MagicMock(), include_offers=101)
+    repo.get_fresh_source_fetches.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_perform_search_writes_while_sources_are_fetching():
+    """
+    perform_search: a source's offers are written before slower sources have answered.
+    """
+    amazon_release = asyncio.Event()
+    written = []
+
+    async def fake_iter_sources(query, sources):
+        yield "ebay", [{"itemId": "E1"}], None
+        await amazon_release.wait()
+        yield "amazon", {"products": [{"asin": "A1"}]}, None
+
+    async def fake_write(offers_data, search_id, session, commit=True):
+        written.append(offers_data)
+        amazon_release.set()
+        return []
+
+    repo = MagicMock()
+    repo.normalize_query.return_value = "phone"
+    repo.get_fresh_source_fetches = AsyncMock(return_value={})
+    repo.create_search = AsyncMock(return_value=make_search_obj(id=2, query="phone", normalized_query="phone"))
+    repo.update_or_create_offer_with_history = AsyncMock(side_effect=fake_write)
+
+    service = SearchService(repository=repo, transform_service=lambda raw: [raw])
+    service.iter_sources = fake_iter_sources
+
+    session = MagicMock()
+    session.commit = AsyncMock()
+    await asyncio.wait_for(service.perform_search(SearchCreate(query="phone"), session), timeout=1)
+
+    assert [list(batch[0]) for batch in written] == [["ebay"], ["amazon"]]
+
+@pytest.mark.asyncio
+async def test_perform_search_surfaces_writer_errors():
+    """
+    perform_search: a failing writer stage fails the search instead of blocking the pipeline.
+    """
+    async def fake_iter_sources(query, sources):
+        for source in ("ebay", "dummyjson", "amazon"):
+            yield source, [{"itemId": source}], None
+
+    repo = MagicMock()
+    repo.normalize_query.return_value = "phone"
+    repo.get_fresh_source_fetches = AsyncMock(return_value={})
+    repo.create_search = AsyncMock(return_value=make_search_obj(id=2, query="phone", normalized_query="phone"))
+    repo.update_or_create_offer_with_history = AsyncMock(side_effect=RuntimeError("db down"))
+
+    service = SearchService(repository=repo, transform_service=lambda raw: [raw])
+    service.iter_sources = fake_iter_sources
+
+    with pytest.raises(RuntimeError, match="db down"):
+        await asyncio.wait_for(service.perform_search(SearchCreate(query="phone"), MagicMock()), timeout=1)
+
+@pytest.mark.asyncio
+async def test_perform_search_refreshes_only_expired_sources():
+    """
+    perform_search: fresh sources are linked to the new search, only expired ones are fetched.
+    """
+    fresh = make_fresh_fetches(4, sources=("dummyjson", "amazon"))
+    repo = MagicMock()
+    repo.normalize_query.return_value = "phone"
+    repo.get_fresh_source_fetches = AsyncMock(return_value=fresh)
+    repo.create_search = AsyncMock(return_value=make_search_obj(id=8, query="phone", normalized_query="phone"))
+    repo.reuse_source_offers = AsyncMock(return_value=[])
+    repo.update_or_create_offer_with_history = AsyncMock()
+
+    fetched = []
+
+    async def fake_iter_sources(query, sources):
+        fetched.extend(sources)
+        yield "ebay", [{"itemId": "E1"}], None
+
+    service = SearchService(repository=repo, transform_service=MagicMock(return_value=[{"title": "ok"}]))
+    service.iter_sources = fake_iter_sources
+
+    session = MagicMock()
+    session.commit = AsyncMock()
+    res = await service.perform_search(SearchCreate(query="phone"), session)
+
+    assert res.id == 8
+    assert fetched == ["ebay"]
+    repo.reuse_source_offers.assert_any_await(fresh["dummyjson"], 8, session)
+    repo.reuse_source_offers.assert_any_await(fresh["amazon"], 8, session)
+    repo.record_source_fetch.assert_called_once_with(8, "ebay", "ok", 1, session)
+
+@pytest.mark.asyncio
+async def test_perform_search_merges_fresh_sources_without_upstream_calls():
+    """
+    perform_search: when every source is fresh but from different searches, a new search links them all
+    without calling upstream or taking an admission slot.
+    """
+    fresh = {**make_fresh_fetches(1, sources=("ebay",)), **make_fresh_fetches(2, sources=("dummyjson", "amazon"))}
+    repo = MagicMock()
+    repo.normalize_query.return_value = "tv"
+    repo.get_fresh_source_fetches = AsyncMock(return_value=fresh)
+    repo.create_search = AsyncMock(return_value=make_search_obj(id=9, query="tv", normalized_query="tv"))
+    repo.reuse_source_offers = AsyncMock(return_value=[])
+
+    admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1)
+    service = SearchService(repository=repo, transform_service=MagicMock(), admission=admission)
+    service.call_source = AsyncMock()
+
+    session = MagicMock()
+    session.commit = AsyncMock()
+    async with admission.admit():
+        res = await service.perform_search(SearchCreate(query="tv"), session)
+
+    assert res.id == 9
+    assert repo.reuse_source_offers.await_count == 3
+    service.call_source.assert_not_called()
+    session.commit.assert_awaited_once()
+
+def test_negative_cache_windows_are_short_and_capped(monkeypatch):
+    """
+    source_cache_windows: empty and failed results are reused for a short window, never longer than the TTL.
+    """
+    windows = source_cache_windows("amazon")
+    assert windows["empty"] < windows["ok"]
+    assert windows["error"] <= windows["empty"]
+
+    monkeypatch.setenv("AMAZON_CACHE_TTL_MINUTES", "0")
+    assert set(source_cache_windows("amazon").values()) == {0}
+
+@pytest.mark.asyncio
+async def test_ingest_records_empty_sources():
+    """
+    ingest_sources: a source that answered with no offers is recorded as "empty", failures keep their reason.
+    """
+    async def fake_iter_sources(query, sources):
+        yield "ebay", [], None
+        yield "amazon", {"products": []}, "error"
+
+    repo = MagicMock()
+    repo.update_or_create_offer_with_history = AsyncMock()
+    service = SearchService(repository=repo, transform_service=MagicMock(return_value=[]))
+    service.iter_sources = fake_iter_sources
+
+    session = MagicMock()
+    session.commit = AsyncMock()
+    search = make_search_obj(id=6)
+    [_ async for _ in service.ingest_sources(search, session)]
+
+    repo.record_source_fetch.assert_any_call(6, "ebay", "empty", 0, session)
+    repo.record_source_fetch.assert_any_call(6, "amazon", "error", 0, session)
+    repo.update_or_create_offer_with_history.assert_not_called()
+
+def test_source_cache_ttl_is_configurable(monkeypatch):
+    """
+    source_cache_ttl_minutes: per-source defaults, overridable from the environment.
+    """
+    assert source_cache_ttl_minutes("amazon") > source_cache_ttl_minutes("ebay")
+    monkeypatch.setenv("AMAZON_CACHE_TTL_MINUTES", "5")
+    assert source_cache_ttl_minutes("amazon") == 5
+
+@pytest.mark.asyncio
+async def test_perform_search_sheds_load_when_full():
+    """
+    perform_search: cache misses fail fast with ServiceOverloadedError at capacity.
+    """
+    repo = MagicMock()
+    repo.normalize_query.return_value = "tv"
+    repo.get_fresh_source_fetches = AsyncMock(return_value={})
+    repo.create_search = AsyncMock()
+
+    admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1)
+    service = SearchService(repository=repo, transform_service=MagicMock(), admission=admission)
+    service.iter_sources = MagicMock()
+
+    async with admission.admit():
+        with pytest.raises(ServiceOverloadedError):
+            await service.perform_search(SearchCreate(query="tv"), MagicMock())
+
+    repo.create_search.assert_not_called()
+    service.iter_sources.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_perform_search_cache_hit_bypasses_admission():
+    """
+    perform_search: cached results are served even when admission is full.
+    """
+    repo = MagicMock()
+    repo.normalize_query.return_value = "tv"
+    repo.get_fresh_source_fetches = AsyncMock(return_value=make_fresh_fetches(5))
+    repo.get_search = AsyncMock(return_value=make_search_obj(id=5, normalized_query="tv"))
+
+    admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1)
+    service = SearchService(repository=repo, transform_service=MagicMock(), admission=admission)
+
+    async with admission.admit():
+        res = await service.perform_search(SearchCreate(query="tv"), MagicMock())
+
+    assert res.id == 5
+
+@asynccontextmanager
+async def fake_session_factory():
+    session = MagicMock()
+    session.commit = AsyncMock()
+    yield session
+
+def make_offer_data(source, offer_id):
+    return {
+        "title": f"{source} {offer_id}", "last_price": Decimal("10.00"), "currency": "USD",
+        "url": f"https://example.com/{offer_id}", "source": source, "source_offer_id": offer_id,
+    }
+
+@pytest.mark.asyncio
+async def test_stream_search_emits_sources_as_they_complete(monkeypatch):
+    """
+    stream_search: each source is emitted as soon as it answers, persisted in the background,
+    and the final event carries the search_id.
+    """
+    amazon_release = asyncio.Event()
+
+    async def fast_ebay(q):
+        return {"itemSummaries": [{"itemId": "E1"}]}
+    async def fast_dummy(q):
+        return {"products": []}
+    async def slow_amazon(q):
+        await amazon_release.wait()
+        return {"products": [{"asin": "A1"}]}
+
+    monkeypatch.setattr("backend.services.search_services.search_ebay", fast_ebay)
+    monkeypatch.setattr("backend.services.search_services.search_dummyjson", fast_dummy)
+    monkeypatch.setattr("backend.services.search_services.search_amazon", slow_amazon)
+
+    def transform(raw):
+        if raw.get("ebay"):
+            return [make_offer_data("ebay", "E1")]
+        if (raw.get("amazon") or {}).get("products"):
+            return [make_offer_data("amazon", "A1")]
+        return []
+
+    repo = MagicMock()
+    repo.normalize_query.return_value = "phone"
+    repo.get_fresh_source_fetches = AsyncMock(return_value={})
+    repo.create_search = AsyncMock(return_value=make_search_obj(id=7, query="phone", normalized_query="phone"))
+    repo.update_or_create_offer_with_history = AsyncMock()
+
+    service = SearchService(repository=repo, transform_service=transform, session_factory=fake_session_factory)
+
+    events = []
+    async for event, data in service.stream_search(SearchCreate(query="phone")):
+        events.append((event, data))
+        if event == "source" and data["source"] == "ebay":
+            # Amazon is still running when eBay's offers arrive
+            assert not amazon_release.is_set()
+            amazon_release.set()
+
+    assert [e for e, _ in events] == ["search", "source", "source", "source", "done"]
+    sources = {d["source"]: d for e, d in events if e == "source"}
+    assert list(sources)[-1] == "amazon"
+    assert sources["ebay"]["offers"][0]["source_offer_id"] == "E1"
+    assert events[-1][1] == {"search_id": 7, "total": 2, "skipped_sources": {}}
+    # Only sources with offers are written
+    assert repo.update_or_create_offer_with_history.await_count == 2
+
+@pytest.mark.asyncio
+async def test_stream_search_releases_slot_without_waiting_for_client(monkeypatch):
+    """
+    stream_search: the admission slot is released once the search is stored, while the client hasn't read on.
+    """
+    async def fake_source(q):
+        return {"products": []}
+
+    monkeypatch.setattr("backend.services.search_services.search_ebay", AsyncMock(return_value={"itemSummaries": []}))
+    monkeypatch.setattr("backend.services.search_services.search_dummyjson", fake_source)
+    monkeypatch.setattr("backend.services.search_services.search_amazon", fake_source)
+
+    repo = MagicMock()
+    repo.normalize_query.return_value = "lamp"
+    repo.get_fresh_source_fetches = AsyncMock(return_value={})
+    repo.create_search = AsyncMock(return_value=make_search_obj(id=8, query="lamp", normalized_query="lamp"))
+    admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1)
+    service = SearchService(repository=repo, transform_service=lambda raw: [], session_factory=fake_session_factory,
+                            admission=admission)
+
+    events = service.stream_search(SearchCreate(query="lamp"))
+    assert (await events.__anext__())[0] == "search"
+    # The client stalls after the first event, the search still finishes and frees its slot
+    for _ in range(100):
+        if admission.in_flight == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert admission.in_flight == 0
+
+    rest = [event async for event, _ in events]
+    assert rest == ["source", "source", "source", "done"]
+
+@pytest.mark.asyncio
+async def test_stream_search_cache_hit_streams_stored_offers():
+    """
+    stream_search: a cached search streams its stored offers grouped by source.
+    """
+    stored = [
+        SimpleNamespace(id=1, created_at=datetime.utcnow(), seller=None, image_url=None, rating=None,
+                        **make_offer_data("ebay", "E1")),
+        SimpleNamespace(id=2, created_at=datetime.utcnow(), seller=None, image_url=None, rating=None,
+                        **make_offer_data("amazon", "A1")),
+    ]
+    repo = MagicMock()
+    repo.normalize_query.return_value = "tv"
+    repo.get_fresh_source_fetches = AsyncMock(return_value=make_fresh_fetches(5))
+    repo.get_search = AsyncMock(return_value=make_search_obj(id=5, query="tv", normalized_query="tv"))
+    repo.get_search_offers = AsyncMock(return_value=stored)
+    repo.create_search = AsyncMock()
+
+    service = SearchService(repository=repo, transform_service=MagicMock(), session_factory=fake_session_factory)
+    events = [e async for e in service.stream_search(SearchCreate(query="tv"))]
+
+    assert events[0] == ("search", {"search_id": 5, "query": "tv", "cached": True})
+    counts = {d["source"]: d["count"] for e, d in events if e == "source"}
+    assert counts == {"ebay": 1, "dummyjson": 0, "amazon": 1}
+    assert events[-1][1]["search_id"] == 5
+    repo.create_search.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_stream_search_cache_hit_reports_failed_sources():
+    """
+    stream_search: a cached search marks sources whose reused fetch failed as skipped.
+    """
+    fresh = make_fresh_fetches(5)
+    fresh["ebay"].status = "deadline"
+    repo = MagicMock()
+    repo.normalize_query.return_value = "tv"
+    repo.get_fresh_source_fetches = AsyncMock(return_value=fresh)
+    repo.get_search = AsyncMock(return_value=make_search_obj(id=5, query="tv", normalized_query="tv"))
+    repo.get_search_offers = AsyncMock(return_value=[])
+
+    service = SearchService(repository=repo, transform_service=MagicMock(), session_factory=fake_session_factory)
+    events = [e async for e in service.stream_search(SearchCreate(query="tv"))]
+
+    skipped = {d["source"]: d["skipped"] for e, d in events if e == "source"}
+    assert skipped == {"ebay": "deadline", "dummyjson": None, "amazon": None}
+    assert events[-1][1] == {"search_id": 5, "total": 0, "skipped_sources": {"ebay": "deadline"}}
+
 @pytest.mark.asyncio
 async def test_get_recent_searches_found():
     """
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from backend.services.user_service import UserService
+from datetime import datetime
+from backend.services.user_service import UserService, user_cache
 from backend.schemas.user_schema import UserCreate
 from backend.models.users import User
 from backend.utils.error import ValidationError, NotFoundError
@@ -27,7 +28,7 @@ async def test_create_user_success():
         full_name="Test User"
     )
     
-    with patch('backend.services.user_service.get_password_hash', return_value="hashed_password"):
+    with patch('backend.services.user_service.get_password_hash_async', AsyncMock(return_value="hashed_password")):
         user = await service.create_user(user_data, session)
     
     session.add.assert_called_once()
@@ -90,7 +91,7 @@ async def test_authenticate_user_success():
     
     session = MagicMock()
     
-    with patch('backend.services.user_service.verify_password', return_value=True):
+    with patch('backend.services.user_service.verify_password_async', AsyncMock(return_value=True)):
         user = await service.authenticate_user("testuser", "password", session)
     
     assert user == fake_user
@@ -124,12 +125,35 @@ async def test_authenticate_user_invalid_password():
     
     session = MagicMock()
     
-    with patch('backend.services.user_service.verify_password', return_value=False):
+    with patch('backend.services.user_service.verify_password_async', AsyncMock(return_value=False)):
         user = await service.authenticate_user("testuser", "wrongpassword", session)
     
     assert user is None
 
 
+@pytest.mark.asyncio
+async def test_authenticate_user_rehashes_outdated_hash():
+    """
+    authenticate_user: upgrades the stored hash when the bcrypt cost changed
+    """
+    service = UserService()
+    
+    fake_user = MagicMock()
+    fake_user.hashed_password = "old_hash"
+    service.get_user_by_username = AsyncMock(return_value=fake_user)
+    
+    session = MagicMock()
+    session.commit = AsyncMock()
+    
+    with patch('backend.services.user_service.verify_password_async', AsyncMock(return_value=True)), \
+         patch('backend.services.user_service.password_needs_rehash', return_value=True), \
+         patch('backend.services.user_service.get_password_hash_async', AsyncMock(return_value="new_hash")):
+        user = await service.authenticate_user("testuser", "password", session)
+    
+    assert user.hashed_password == "new_hash"
+    session.commit.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_create_access_token_for_user():
     """
@@ -199,3 +223,44 @@ async def test_get_user_by_email_found():
     user = await service.get_user_by_email("test@example.com", session)
     
     assert user == fake_user
+
+
+@pytest.mark.asyncio
+async def test_get_user_response_cached():
+    """
+    get_user_response: second call is served from the user cache
+    """
+    await user_cache.clear()
+    service = UserService()
+    session = MagicMock()
+    
+    fake_user = User(id=7, username="cached", email="cached@example.com", full_name=None,
+                     is_active=True, created_at=datetime.utcnow())
+    service.get_user_by_id = AsyncMock(return_value=fake_user)
+    
+    first = await service.get_user_response(7, session)
+    second = await service.get_user_response(7, session)
+    
+    assert first.username == "cached"
+    assert second == first
+    service.get_user_by_id.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_user_response_invalidated():
+    """
+    invalidate_user_cache: next get_user_response reloads the user
+    """
+    await user_cache.clear()
+    service = UserService()
+    session = MagicMock()
+    
+    fake_user = User(id=8, username="stale", email="stale@example.com", full_name=None,
+                     is_active=True, created_at=datetime.utcnow())
+    service.get_user_by_id = AsyncMock(return_value=fake_user)
+    
+    await service.get_user_response(8, session)
+    await service.invalidate_user_cache(8)
+    await service.get_user_response(8, session)
+    
+    assert service.get_user_by_id.await_count == 2
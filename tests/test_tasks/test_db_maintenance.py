@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import text
+
+from backend.database import build_async_engine
+from backend.services.search_services import search_admission
+from backend.tasks.db_maintenance import HOT_TABLES, convert_to_incremental_vacuum, maintain_postgres, run_db_maintenance
+from backend.utils.metrics import collect
+
+
+async def churned_engine(tmp_path, rows: int = 200):
+    """
+    SQLite file with rows inserted and then deleted, leaving free pages behind
+    """
+    engine = build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'churn.db'}", "production")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE blobs (id INTEGER PRIMARY KEY, payload BLOB)"))
+        for _ in range(rows):
+            await conn.execute(text("INSERT INTO blobs (payload) VALUES (randomblob(4000))"))
+    await delete_rows(engine)
+    return engine
+
+
+async def delete_rows(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM blobs"))
+
+
+@pytest.mark.asyncio
+async def test_maintenance_vacuums_incrementally_after_one_off_conversion(tmp_path):
+    """
+    run_db_maintenance: a file not in incremental mode is never fully vacuumed by the job,
+    once converted by hand later runs free pages in bounded steps
+    """
+    engine = await churned_engine(tmp_path)
+
+    first = await run_db_maintenance(engine, pause=0)
+    assert first["analyze"] == "full"
+    assert first["skipped"] == ["vacuum"]
+    assert first["pages_reclaimed"] == 0
+    assert first["checkpoint"]["busy"] is False
+
+    assert (await convert_to_incremental_vacuum(engine))["converted"] is True
+    assert (await convert_to_incremental_vacuum(engine)) == {"converted": False, "reason": "already incremental"}
+
+    async with engine.begin() as conn:
+        for _ in range(100):
+            await conn.execute(text("INSERT INTO blobs (payload) VALUES (randomblob(4000))"))
+    await delete_rows(engine)
+
+    second = await run_db_maintenance(engine, pages_per_step=10, max_steps=3, pause=0)
+    await engine.dispose()
+
+    assert second["analyze"] == "optimize"
+    assert second["skipped"] == []
+    assert second["vacuum_steps"] == 3  # bounded, free pages are left for the next run
+    assert second["pages_reclaimed"] == 30
+    assert second["bytes_reclaimed"] == 30 * 4096
+    assert second["free_pages_after"] > 0
+    assert collect()["db_maintenance"]["vacuum_steps"] == 3
+
+
+@pytest.mark.asyncio
+async def test_maintenance_skips_locking_steps_while_busy(tmp_path, monkeypatch):
+    """
+    run_db_maintenance: with searches in flight statistics are refreshed but vacuum and checkpoint wait
+    """
+    engine = await churned_engine(tmp_path, rows=20)
+    monkeypatch.setattr(search_admission, "in_flight", 10)
+
+    summary = await run_db_maintenance(engine, pause=0)
+    await engine.dispose()
+
+    assert summary["analyze"] == "full"
+    assert summary["skipped"] == ["vacuum", "checkpoint"]
+    assert summary["pages_reclaimed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_maintain_postgres_vacuums_hot_tables():
+    """
+    maintain_postgres: VACUUM (ANALYZE) runs on each hot table, with its dead tuples recorded first
+    """
+    conn = MagicMock()
+    dead_tuples = MagicMock()
+    dead_tuples.all.return_value = [("searches", 120), ("offers", 40)]
+    conn.execute = AsyncMock(side_effect=[dead_tuples] + [MagicMock()] * len(HOT_TABLES))
+    summary = {"skipped": [], "tables": {}}
+
+    await maintain_postgres(conn, summary, HOT_TABLES)
+
+    statements = [str(call.args[0]) for call in conn.execute.await_args_list[1:]]
+    assert statements == [f'VACUUM (ANALYZE) "{table}"' for table in HOT_TABLES]
+    assert summary["dead_tuples_before"] == {"searches": 120, "offers": 40}
+    assert set(summary["tables"]) == set(HOT_TABLES)
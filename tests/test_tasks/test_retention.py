@@ -0,0 +1,151 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from sqlalchemy import func, select
+
+from backend.database import AsyncSessionLocal
+from backend.models.offers import Offer
+from backend.models.pricehistory import PriceHistory
+from backend.models.search_offer_link import SearchOfferLink
+from backend.models.search_source_fetch import SearchSourceFetch
+from backend.models.searches import Search
+from backend.models.users import User, UserWatchlist
+from backend.repositories.repository import Repository
+from backend.tasks.retention import purge_expired_data, purge_in_batches
+
+
+def make_offer(source_offer_id: str, seen_days_ago: float) -> Offer:
+    seen = datetime.utcnow() - timedelta(days=seen_days_ago)
+    return Offer(source="ebay", source_offer_id=source_offer_id, title="Retention Item", last_price=10,
+                 currency="USD", url=f"http://offers/{source_offer_id}", created_at=seen, last_seen_at=seen)
+
+
+async def seed_retention_data(session) -> dict:
+    """
+    Old anonymous and user searches, and offers that are linked, watched, fresh or orphaned
+    """
+    old = datetime.utcnow() - timedelta(days=90)
+    user = User(username="retention_user", email="retention@example.com", hashed_password="x")
+    offers = {name: make_offer(f"retention-{name}", days) for name, days in
+              [("linked_to_old", 90), ("linked_to_user", 90), ("watched", 90), ("fresh", 1), ("orphan", 90)]}
+    session.add(user)
+    session.add_all(offers.values())
+    await session.flush()
+
+    old_search = Search(query="retention old", normalized_query="retention old", created_at=old)
+    user_search = Search(query="retention user", normalized_query="retention user", created_at=old, user_id=user.id)
+    session.add_all([old_search, user_search])
+    await session.flush()
+
+    session.add_all([
+        SearchOfferLink(search_id=old_search.id, offer_id=offers["linked_to_old"].id),
+        SearchOfferLink(search_id=user_search.id, offer_id=offers["linked_to_user"].id),
+        SearchSourceFetch(search_id=old_search.id, source="ebay", status="ok", offer_count=1, fetched_at=old),
+        UserWatchlist(user_id=user.id, offer_id=offers["watched"].id, product_title="Retention Item"),
+        *[PriceHistory(offer_id=offer.id, price=10, currency="USD") for offer in offers.values()],
+    ])
+    await session.commit()
+    return {"old_search": old_search.id, "user_search": user_search.id,
+            **{name: offer.id for name, offer in offers.items()}}
+
+
+@pytest.mark.asyncio
+async def test_purge_expired_data_keeps_referenced_rows():
+    """
+    purge_expired_data: old anonymous searches and the offers they alone kept go, user, watched and fresh data stays
+    """
+    async with AsyncSessionLocal() as session:
+        ids = await seed_retention_data(session)
+
+    summary = await purge_expired_data(batch_size=1, pause=0)
+
+    async with AsyncSessionLocal() as session:
+        search_ids = set((await session.execute(select(Search.id))).scalars().all())
+        offer_ids = set((await session.execute(select(Offer.id))).scalars().all())
+        history_offer_ids = set((await session.execute(select(PriceHistory.offer_id))).scalars().all())
+        fetches = (await session.execute(
+            select(func.count()).select_from(SearchSourceFetch).where(SearchSourceFetch.search_id == ids["old_search"])
+        )).scalar()
+
+    assert ids["old_search"] not in search_ids
+    assert ids["user_search"] in search_ids
+    assert fetches == 0
+    for name in ("linked_to_old", "orphan"):
+        assert ids[name] not in offer_ids
+        assert ids[name] not in history_offer_ids
+    for name in ("linked_to_user", "watched", "fresh"):
+        assert ids[name] in offer_ids
+
+    assert summary["deleted"]["searches"] == 1
+    assert summary["deleted"]["search_offer_link"] == 1
+    assert summary["deleted"]["offers"] == 2
+    assert summary["deleted"]["price_history"] == 2
+    assert summary["batches"] >= 3  # one search, then the two offers one per batch
+    assert summary["bytes_reclaimed"] is not None
+
+
+@pytest.mark.asyncio
+async def test_purge_in_batches_commits_each_batch():
+    """
+    purge_in_batches: each batch is its own transaction, the loop stops at a short batch
+    """
+    batches = [[1, 2], [3]]
+    sessions = []
+
+    class FakeSession:
+        def __init__(self):
+            self.commit = AsyncMock()
+            sessions.append(self)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return False
+
+    async def select_ids(limit, session):
+        return batches.pop(0) if batches else []
+
+    async def delete_ids(ids, session):
+        return {"offers": len(ids)}
+
+    totals = {}
+    count = await purge_in_batches(FakeSession, select_ids, delete_ids, batch_size=2, pause=0, totals=totals)
+
+    assert count == 2
+    assert totals == {"offers": 3}
+    assert all(session.commit.await_count == 1 for session in sessions)
+
+
+@pytest.mark.asyncio
+async def test_delete_offers_keeps_offers_linked_since_selected():
+    """
+    delete_offers: an orphan that ingestion links again after it was selected is kept, with its price history
+    """
+    repository = Repository()
+    cutoff = datetime.utcnow() - timedelta(days=30)
+    async with AsyncSessionLocal() as session:
+        relinked, orphan = make_offer("retention-relinked", 90), make_offer("retention-still-orphan", 90)
+        session.add_all([relinked, orphan])
+        await session.flush()
+        session.add_all([PriceHistory(offer_id=offer.id, price=10, currency="USD") for offer in (relinked, orphan)])
+        await session.commit()
+
+        selected = await repository.get_orphan_offer_ids(cutoff, 100, session)
+        assert {relinked.id, orphan.id} <= set(selected)
+
+        # A search links one of them before the delete runs
+        search = Search(query="retention relink", normalized_query="retention relink")
+        session.add(search)
+        await session.flush()
+        session.add(SearchOfferLink(search_id=search.id, offer_id=relinked.id))
+        await session.commit()
+
+        deleted = await repository.delete_offers([relinked.id, orphan.id], cutoff, session)
+        await session.commit()
+        remaining = set((await session.execute(select(Offer.id))).scalars().all())
+        history = set((await session.execute(select(PriceHistory.offer_id))).scalars().all())
+
+    assert deleted == {"price_history": 1, "offers": 1}
+    assert relinked.id in remaining and relinked.id in history
+    assert orphan.id not in remaining and orphan.id not in history
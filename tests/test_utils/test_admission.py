@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from backend.utils.admission import AdmissionController
+from backend.utils.error import ServiceOverloadedError
+
+
+@pytest.mark.asyncio
+async def test_admission_allows_up_to_limit():
+    """
+    AdmissionController: holders up to max_in_flight run concurrently
+    """
+    controller = AdmissionController(max_in_flight=2, max_queue=0, queue_timeout=1)
+
+    async with controller.admit():
+        async with controller.admit():
+            assert controller.in_flight == 2
+
+    assert controller.in_flight == 0
+    assert controller.admitted == 2
+
+
+@pytest.mark.asyncio
+async def test_admission_rejects_when_queue_full():
+    """
+    AdmissionController: fails fast with retry_after when slots and queue are full
+    """
+    controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1, retry_after=7)
+
+    async with controller.admit():
+        with pytest.raises(ServiceOverloadedError) as exc_info:
+            async with controller.admit():
+                pass
+
+    assert exc_info.value.retry_after == 7
+    assert controller.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_queued_request_gets_slot():
+    """
+    AdmissionController: a queued request runs once a slot is released
+    """
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1)
+    release = asyncio.Event()
+
+    async def holder():
+        async with controller.admit():
+            await release.wait()
+
+    task = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+
+    async def waiter():
+        async with controller.admit():
+            return "ran"
+
+    waiting_task = asyncio.create_task(waiter())
+    await asyncio.sleep(0)
+    assert controller.waiting == 1
+
+    release.set()
+    assert await waiting_task == "ran"
+    await task
+    assert controller.rejected == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_queue_timeout():
+    """
+    AdmissionController: a queued request is shed after queue_timeout
+    """
+    controller = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=0.01)
+
+    async with controller.admit():
+        with pytest.raises(ServiceOverloadedError):
+            async with controller.admit():
+                pass
+
+    assert controller.waiting == 0
+    assert controller.in_flight == 0
@@ -1,9 +1,14 @@
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 from datetime import timedelta
+from passlib.context import CryptContext
 from backend.utils.auth import (
     verify_password,
     get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
+    token_cache,
     create_access_token,
     verify_token,
     get_current_user_id,
@@ -44,6 +49,30 @@ def test_verify_password_incorrect():
     assert verify_password("WrongPassword", hashed) is False
 
 
+@pytest.mark.asyncio
+async def test_password_hash_async_roundtrip():
+    """
+    get_password_hash_async / verify_password_async: hash and verify on the executor
+    """
+    hashed = await get_password_hash_async("AsyncPassword789")
+    
+    assert hashed.startswith("$2b$")
+    assert await verify_password_async("AsyncPassword789", hashed) is True
+    assert await verify_password_async("WrongPassword", hashed) is False
+
+
+def test_password_needs_rehash():
+    """
+    password_needs_rehash: True for hashes made with a different bcrypt cost
+    """
+    current = get_password_hash("Password123")
+    outdated = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("Password123")
+    
+    assert password_needs_rehash(current) is False
+    assert password_needs_rehash(outdated) is True
+    assert password_needs_rehash("not-a-hash") is False
+
+
 def test_create_access_token():
     """
     create_access_token: creates valid JWT token
@@ -56,32 +85,35 @@ def test_create_access_token():
     assert token.count(".") == 2  # JWT has 3 parts separated by dots
 
 
-def test_verify_token_valid():
+@pytest.mark.asyncio
+async def test_verify_token_valid():
     """
     verify_token: decodes valid token
     """
     data = {"sub": "789", "username": "user"}
     token = create_access_token(data)
     
-    payload = verify_token(token)
+    payload = await verify_token(token)
     
     assert payload is not None
     assert payload["sub"] == "789"
     assert payload["username"] == "user"
 
 
-def test_verify_token_invalid():
+@pytest.mark.asyncio
+async def test_verify_token_invalid():
     """
     verify_token: returns None for invalid token
     """
     invalid_token = "invalid.jwt.token"
     
-    payload = verify_token(invalid_token)
+    payload = await verify_token(invalid_token)
     
     assert payload is None
 
 
-def test_verify_token_expired():
+@pytest.mark.asyncio
+async def test_verify_token_expired():
     """
     verify_token: returns None for expired token
     """
@@ -89,11 +121,37 @@ def test_verify_token_expired():
     # Create token that expires immediately
     token = create_access_token(data, expires_delta=timedelta(seconds=-1))
     
-    payload = verify_token(token)
+    payload = await verify_token(token)
     
     assert payload is None
 
 
+@pytest.mark.asyncio
+async def test_verify_token_uses_cache():
+    """
+    verify_token: second verification of the same token is a cache hit
+    """
+    token = create_access_token({"sub": "555"})
+    hits_before = token_cache.hits
+    
+    first = await verify_token(token)
+    second = await verify_token(token)
+    
+    assert first == second
+    assert token_cache.hits == hits_before + 1
+
+
+@pytest.mark.asyncio
+async def test_verify_token_expired_not_cached():
+    """
+    verify_token: expired tokens are never cached
+    """
+    token = create_access_token({"sub": "556"}, expires_delta=timedelta(seconds=-1))
+    
+    assert await verify_token(token) is None
+    assert await token_cache.get(token) is None
+
+
 @pytest.mark.asyncio
 async def test_get_current_user_id_valid():
     """
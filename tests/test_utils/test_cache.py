@@ -0,0 +1,73 @@
+import time
+from backend.utils.cache import TTLCache
+
+
+def test_ttl_cache_get_set_and_stats():
+    """
+    TTLCache: returns stored values and counts hits/misses
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["size"] == 1
+
+
+def test_ttl_cache_expiry():
+    """
+    TTLCache: entries expire after their TTL
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", "value", ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("short") is None
+    assert "short" not in cache
+    assert len(cache) == 0
+
+
+def test_ttl_cache_non_positive_ttl_not_stored():
+    """
+    TTLCache: a TTL <= 0 (e.g. an already expired token) is never stored
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("expired", "value", ttl=-5)
+
+    assert len(cache) == 0
+
+
+def test_ttl_cache_lru_eviction():
+    """
+    TTLCache: evicts the least recently used entry when full
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_ttl_cache_delete_and_clear():
+    """
+    TTLCache: delete removes one entry, clear removes all
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.delete("a")
+    cache.delete("not-there")
+    assert "a" not in cache and "b" in cache
+
+    cache.clear()
+    assert len(cache) == 0
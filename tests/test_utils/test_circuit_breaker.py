@@ -0,0 +1,72 @@
+import pytest
+from backend.utils.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def test_breaker_opens_on_failure_rate():
+    """
+    CircuitBreaker: opens once the rolling failure rate crosses the threshold
+    """
+    breaker = CircuitBreaker("test", window_size=10, min_calls=4, failure_rate_threshold=0.5)
+
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    breaker.record_failure(0.1)
+    assert breaker.state == CLOSED  # not enough calls yet
+
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_breaker_opens_on_slow_calls():
+    """
+    CircuitBreaker: opens when most calls are slower than slow_call_seconds
+    """
+    breaker = CircuitBreaker("test", window_size=10, min_calls=3, slow_call_seconds=1.0, slow_call_rate_threshold=0.6)
+
+    for _ in range(3):
+        breaker.record_success(2.5)
+
+    assert breaker.state == OPEN
+
+
+def test_breaker_half_open_probe_success_closes():
+    """
+    CircuitBreaker: after the cool-down one probe is allowed, success closes the circuit
+    """
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0)
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+
+    assert breaker.allow_request() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is False  # only one probe at a time
+
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_breaker_half_open_probe_failure_reopens():
+    """
+    CircuitBreaker: a failed probe opens the circuit again
+    """
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0)
+    breaker.record_failure(0.1)
+    breaker.allow_request()
+
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_breaker_stays_open_during_cool_down():
+    """
+    CircuitBreaker: rejects calls until open_seconds have passed
+    """
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=60)
+    breaker.record_failure(0.1)
+
+    assert breaker.allow_request() is False
+    assert breaker.state == OPEN
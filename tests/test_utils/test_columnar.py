@@ -0,0 +1,120 @@
+import pickle
+import random
+from decimal import Decimal
+from backend.utils.columnar import ColumnarResultSet
+
+
+def make_result_set():
+    return ColumnarResultSet.from_rows([
+        (4, Decimal("30.00"), None, "amazon"),
+        (1, Decimal("10.00"), 4.5, "ebay"),
+        (3, None, 3.0, "ebay"),
+        (2, Decimal("10.00"), 4.9, "dummyjson"),
+        (1, Decimal("10.00"), 4.5, "ebay"),
+    ])
+
+
+def reference_select(rows, filters, sort_by, sort_order):
+    """
+    The SQL's semantics in plain Python - NULLs fail filters and sort last, ties in id order
+    """
+    min_price, max_price = filters.get("price") or (None, None)
+    kept = [
+        row for row in sorted(rows) if
+        (min_price is None or (row[1] is not None and row[1] >= min_price)) and
+        (max_price is None or (row[1] is not None and row[1] <= max_price)) and
+        (not filters.get("source") or row[3] == filters["source"]) and
+        (filters.get("min_rating") is None or (row[2] is not None and row[2] >= filters["min_rating"]))
+    ]
+    column = {"last_price": 1, "rating": 2}.get(sort_by)
+    if column is None:
+        return [row[0] for row in kept]
+    present = sorted((row for row in kept if row[column] is not None), key=lambda row: row[column],
+                     reverse=sort_order == "desc")
+    return [row[0] for row in present + [row for row in kept if row[column] is None]]
+
+
+def test_result_set_columns():
+    """
+    ColumnarResultSet.from_rows: one row per offer in id order, missing values as NaN, sources as codes
+    """
+    result_set = make_result_set()
+
+    assert result_set.ids.tolist() == [1, 2, 3, 4]
+    assert result_set.prices[:2].tolist() == [10.0, 10.0]
+    assert result_set.ratings[3] != result_set.ratings[3]  # NaN
+    assert result_set.source_names == ("amazon", "dummyjson", "ebay")
+    assert result_set.source_codes.tolist() == [2, 1, 2, 0]
+    assert len(result_set.orders) == 4
+
+
+def test_result_set_sorts_nulls_last_both_ways():
+    """
+    ColumnarResultSet.select: missing prices and ratings sort last ascending and descending, ties keep id order
+    """
+    result_set = make_result_set()
+
+    assert result_set.select(sort_by="last_price", sort_order="asc") == [1, 2, 4, 3]
+    assert result_set.select(sort_by="last_price", sort_order="desc") == [4, 1, 2, 3]
+    assert result_set.select(sort_by="rating", sort_order="asc") == [3, 1, 2, 4]
+    assert result_set.select(sort_by="rating", sort_order="desc") == [2, 1, 3, 4]
+    assert result_set.select(sort_by="title") == [1, 2, 3, 4]
+
+
+def test_result_set_filters():
+    """
+    ColumnarResultSet.select: price range, source and minimum rating combine, missing values never match
+    """
+    result_set = make_result_set()
+
+    assert result_set.select({"price": [10.0, 20.0]}) == [1, 2]
+    assert result_set.select({"price": [None, 30.0]}) == [1, 2, 4]
+    assert result_set.select({"source": "ebay"}) == [1, 3]
+    assert result_set.select({"source": "walmart"}) == []
+    assert result_set.select({"min_rating": 4.5}) == [1, 2]
+    assert result_set.select({"price": [5.0, None], "source": "ebay", "min_rating": 4.0}) == [1]
+
+
+def test_result_set_page():
+    """
+    ColumnarResultSet.page: ids of one page and the filtered total
+    """
+    result_set = make_result_set()
+
+    assert result_set.page(sort_by="rating", sort_order="desc", offset=1, limit=2) == ([1, 3], 4)
+    assert result_set.page({"source": "ebay"}, offset=2, limit=2) == ([], 2)
+
+
+def test_result_set_matches_reference():
+    """
+    ColumnarResultSet.select: random result sets and filters give the same ids as the SQL semantics
+    """
+    rng = random.Random(7)
+    sources = ["ebay", "amazon", "dummyjson"]
+    for _ in range(50):
+        rows = [
+            (offer_id, rng.choice([None, *range(5, 15)]), rng.choice([None, 3.0, 3.5, 4.0, 4.5, 5.0]), rng.choice(sources))
+            for offer_id in rng.sample(range(1, 500), rng.randint(0, 40))
+        ]
+        result_set = ColumnarResultSet.from_rows(rows)
+        filters = {
+            "price": rng.choice([None, [8, None], [None, 11], [7, 12]]),
+            "source": rng.choice([None, *sources]),
+            "min_rating": rng.choice([None, 4.0]),
+        }
+        for sort_by in ("last_price", "rating", "title"):
+            for sort_order in ("asc", "desc"):
+                assert result_set.select(filters, sort_by, sort_order) == reference_select(rows, filters, sort_by, sort_order)
+
+
+def test_result_set_pickles_columns_only():
+    """
+    ColumnarResultSet: only the columns are pickled, sort orders are rebuilt when loaded
+    """
+    result_set = make_result_set()
+
+    state = result_set.__getstate__()
+    loaded = pickle.loads(pickle.dumps(result_set))
+
+    assert len(state) == 4
+    assert loaded.select({"source": "ebay"}, sort_by="rating", sort_order="desc") == [1, 3]
@@ -1,7 +1,7 @@
 
 import pytest
 from fastapi import HTTPException
-from backend.utils.error import handle_api_errors, ValidationError, NotFoundError, ExternalAPIError
+from backend.utils.error import handle_api_errors, ValidationError, NotFoundError, ExternalAPIError, ServiceOverloadedError
 
 @handle_api_errors
 async def _ok():
@@ -23,6 +23,11 @@ async def _raise_external():
     """Raises ExternalAPIError and should map to HTTP 502."""
     raise ExternalAPIError("downstream")
 
+@handle_api_errors
+async def _raise_overloaded():
+    """Raises ServiceOverloadedError and should map to HTTP 503 with Retry-After."""
+    raise ServiceOverloadedError("busy", retry_after=3)
+
 @handle_api_errors
 async def _raise_unknown():
     """Raises unknown Exception and should map to HTTP 500."""
@@ -56,6 +61,14 @@ async def test_handle_api_errors_external():
         await _raise_external()
     assert ei.value.status_code == 502
 
+@pytest.mark.asyncio
+async def test_handle_api_errors_overloaded():
+    """Decorator: converts ServiceOverloadedError -> HTTP 503 with Retry-After."""
+    with pytest.raises(HTTPException) as ei:
+        await _raise_overloaded()
+    assert ei.value.status_code == 503
+    assert ei.value.headers["Retry-After"] == "3"
+
 @pytest.mark.asyncio
 async def test_handle_api_errors_unknown():
     """Decorator: converts unknown exceptions -> HTTP 500."""
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from backend.utils.hedging import Hedger
+
+
+def warmed_hedger(latency: float = 0.01, **kwargs) -> Hedger:
+    hedger = Hedger("test", min_samples=5, min_delay=0.0, **kwargs)
+    for _ in range(5):
+        hedger._latencies.append(latency)
+    return hedger
+
+
+@pytest.mark.asyncio
+async def test_hedger_no_hedge_before_enough_samples():
+    """
+    Hedger: without a latency history the call runs once
+    """
+    hedger = Hedger("test", min_samples=5, budget_ratio=1.0)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return "ok"
+
+    assert await hedger.run(call) == "ok"
+    assert len(calls) == 1
+    assert hedger.stats()["hedges"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedger_hedge_wins_and_loser_cancelled():
+    """
+    Hedger: a slow call is hedged, the faster hedge wins and the slow one is cancelled
+    """
+    hedger = warmed_hedger(budget_ratio=1.0)
+    attempts = []
+    cancelled = []
+
+    async def call():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        try:
+            await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return attempt
+
+    result = await hedger.run(call)
+    await asyncio.sleep(0)
+
+    assert result == 1
+    assert cancelled == [0]
+    stats = hedger.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+    assert stats["win_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_hedger_primary_can_still_win():
+    """
+    Hedger: if the original call finishes first after hedging, it wins and the hedge is cancelled
+    """
+    hedger = warmed_hedger(budget_ratio=1.0)
+    attempts = []
+
+    async def call():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        await asyncio.sleep(0.05 if attempt == 0 else 1.0)
+        return attempt
+
+    assert await hedger.run(call) == 0
+    assert hedger.stats()["hedges"] == 1
+    assert hedger.stats()["hedge_wins"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedger_falls_back_when_first_answer_fails():
+    """
+    Hedger: a failing attempt doesn't win while the other one can still answer
+    """
+    hedger = warmed_hedger(budget_ratio=1.0)
+    attempts = []
+
+    async def call():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        if attempt == 0:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("upstream failed")
+        await asyncio.sleep(0.1)
+        return attempt
+
+    assert await hedger.run(call) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedger_budget_limits_extra_requests():
+    """
+    Hedger: hedges stay within the budget, the rest are counted as denied
+    """
+    hedger = warmed_hedger(latency=0.001, budget_ratio=0.25)
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    for _ in range(8):
+        await hedger.run(call)
+
+    stats = hedger.stats()
+    assert stats["requests"] == 8
+    assert stats["hedges"] <= 2
+    assert stats["budget_denied"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_hedger_disabled_never_hedges():
+    """
+    Hedger: when disabled calls are never duplicated
+    """
+    hedger = warmed_hedger(budget_ratio=1.0, enabled=False)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        await asyncio.sleep(0.02)
+
+    await hedger.run(call)
+    assert len(attempts) == 1
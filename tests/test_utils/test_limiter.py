@@ -0,0 +1,171 @@
+import asyncio
+import httpx
+import pytest
+from backend.utils.limiter import AdaptiveConcurrencyLimiter, parse_retry_after, source_limited, get_source_limiter
+from backend.utils.error import ExternalAPIError, ValidationError
+
+
+def test_parse_retry_after():
+    """
+    parse_retry_after: handles seconds, HTTP dates and junk
+    """
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("100000") == 60  # capped
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.asyncio
+async def test_limiter_additive_increase():
+    """
+    AdaptiveConcurrencyLimiter: successful calls grow the limit additively
+    """
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, max_limit=10)
+
+    for _ in range(4):
+        async with limiter.slot():
+            pass
+
+    assert 2 < limiter.limit <= 4
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_multiplicative_decrease_on_429():
+    """
+    AdaptiveConcurrencyLimiter: 429 halves the limit and honours Retry-After
+    """
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=8, max_limit=10)
+
+    with pytest.raises(ExternalAPIError):
+        async with limiter.slot():
+            raise ExternalAPIError("rate limited", status_code=429, retry_after=0.05)
+
+    assert limiter.limit == 4
+    assert limiter.blocked_until > 0
+    assert limiter.stats()["backoffs"] == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_client_error_does_not_back_off():
+    """
+    AdaptiveConcurrencyLimiter: 4xx other than 429 is not an overload signal
+    """
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=4, max_limit=10)
+
+    with pytest.raises(ExternalAPIError):
+        async with limiter.slot():
+            raise ExternalAPIError("not found", status_code=404)
+
+    assert limiter.limit > 4
+
+
+@pytest.mark.asyncio
+async def test_limiter_backs_off_on_timeouts_only():
+    """
+    AdaptiveConcurrencyLimiter: timeouts (raw or wrapped by an adapter) back off, local failures leave the limit alone
+    """
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=4, max_limit=10)
+
+    async def fail(error):
+        with pytest.raises(type(error)):
+            async with limiter.slot():
+                raise error
+
+    await fail(ValidationError("eBay credentials are not configured"))
+    await fail(KeyError("itemSummaries"))
+    try:
+        raise httpx.ConnectTimeout("timed out")
+    except httpx.ConnectTimeout as timeout:
+        wrapped = ExternalAPIError("eBay API request failed")
+        wrapped.__cause__ = timeout
+    try:
+        raise ValidationError("no token")
+    except ValidationError as local:
+        token_error = ExternalAPIError("Could not refresh eBay token")
+        token_error.__cause__ = local
+    await fail(token_error)
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+    assert limiter.backoffs == 0
+
+    await fail(wrapped)
+    assert limiter.limit == 2
+    await fail(asyncio.TimeoutError())
+    assert limiter.limit == 1
+    assert limiter.backoffs == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_backs_off_on_latency_spike():
+    """
+    AdaptiveConcurrencyLimiter: a call much slower than the baseline backs off
+    """
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=8, max_limit=10, latency_tolerance=2.0)
+    limiter.baseline_latency = 0.001
+
+    async with limiter.slot():
+        await asyncio.sleep(0.02)
+
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_limiter_bounds_concurrency():
+    """
+    AdaptiveConcurrencyLimiter: never runs more than the limit at once
+    """
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, max_limit=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_cancelled_call_frees_slot():
+    """
+    AdaptiveConcurrencyLimiter: cancelling a call releases its slot without adapting
+    """
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=1, max_limit=1)
+
+    async def slow():
+        async with limiter.slot():
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(slow())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert limiter.in_flight == 0
+    assert limiter.backoffs == 0
+
+
+@pytest.mark.asyncio
+async def test_source_limited_shares_limiter():
+    """
+    source_limited: decorated functions for the same source share one limiter
+    """
+    @source_limited("shared-test")
+    async def first():
+        return get_source_limiter("shared-test").in_flight
+
+    @source_limited("shared-test")
+    async def second():
+        return get_source_limiter("shared-test").in_flight
+
+    assert await first() == 1
+    assert await second() == 1
+    assert get_source_limiter("shared-test").successes == 2
@@ -0,0 +1,59 @@
+from collections import Counter
+import json
+from backend.utils.query_keys import build_spelling_map, canonicalize_query, load_query_vocabulary, tokenize_query
+
+
+def test_canonical_key_ignores_order_spacing_and_punctuation():
+    """
+    canonicalize_query: word order, letter/digit spacing, case and punctuation variants share one key
+    """
+    variants = ["iPhone 15 Pro", "iphone15 pro", "pro iphone 15", "iPhone-15, Pro!", "ｉＰｈｏｎｅ１５ ｐｒｏ"]
+    keys = {canonicalize_query(v, vocabulary={}) for v in variants}
+
+    assert keys == {"15 iphone pro"}
+
+
+def test_canonical_key_keeps_different_models_apart():
+    """
+    canonicalize_query: different model numbers stay different keys
+    """
+    assert canonicalize_query("iphone 13", vocabulary={}) != canonicalize_query("iphone 15", vocabulary={})
+
+
+def test_canonical_key_applies_spelling_and_synonym_maps():
+    """
+    canonicalize_query: spelling corrections run before synonyms
+    """
+    vocabulary = {"spellings": {"iphnoe": "iphone", "televison": "tv"}, "synonyms": {"tv": "television"}}
+
+    assert canonicalize_query("iphnoe 15", vocabulary) == canonicalize_query("iPhone 15", vocabulary)
+    assert canonicalize_query("samsung televison", vocabulary) == "samsung television"
+
+
+def test_build_spelling_map_corrects_rare_close_tokens():
+    """
+    build_spelling_map: rare tokens close to a frequent one are mapped, numbers never are
+    """
+    counts = Counter({"iphone": 40, "iphnoe": 1, "phone": 1, "samsung": 20, "13": 10, "15": 1, "case": 30})
+
+    spellings = build_spelling_map(counts, min_count=3)
+
+    assert spellings == {"iphnoe": "iphone"}
+
+
+def test_load_query_vocabulary(tmp_path):
+    """
+    load_query_vocabulary: reads the maps from JSON, missing file means empty maps
+    """
+    path = tmp_path / "vocabulary.json"
+    assert load_query_vocabulary(str(path)) == {"synonyms": {}, "spellings": {}}
+
+    path.write_text(json.dumps({"synonyms": {"tv": "television"}}))
+    assert load_query_vocabulary(str(path)) == {"synonyms": {"tv": "television"}, "spellings": {}}
+
+
+def test_tokenize_query_splits_letters_from_digits():
+    """
+    tokenize_query: "ps5" and "128gb" are split into word and number
+    """
+    assert tokenize_query("PS5 128GB") == ["ps", "5", "128", "gb"]
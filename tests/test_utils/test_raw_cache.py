@@ -0,0 +1,85 @@
+import time
+import pytest
+from backend.utils.raw_cache import RawResponseCache, compress_payload, decompress_payload, source_ttl
+from backend.utils.shared_cache import SQLiteBackend
+
+
+def test_payload_round_trip_is_compressed():
+    """
+    compress_payload: payloads survive the round trip and repetitive JSON shrinks
+    """
+    payload = {"products": [{"title": "iphone case", "price": 9.99}] * 50}
+    blob = compress_payload(payload)
+
+    assert decompress_payload(blob) == payload
+    assert len(blob) < len(str(payload)) / 5
+
+
+@pytest.mark.asyncio
+async def test_raw_cache_memory_hit():
+    """
+    RawResponseCache: a stored payload is served from memory
+    """
+    cache = RawResponseCache(path=":memory:")
+    await cache.set("ebay", "iphone", {"itemSummaries": [{"itemId": "1"}]})
+
+    assert await cache.get("ebay", "iphone") == {"itemSummaries": [{"itemId": "1"}]}
+    assert await cache.get("amazon", "iphone") is None
+
+    stats = cache.stats()
+    assert stats["local"]["hits"] == 1
+    assert stats["local"]["bytes"] > 0
+    assert stats["store"]["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_raw_cache_disk_tier_survives_restart(tmp_path):
+    """
+    RawResponseCache: a new cache over the same file finds earlier payloads and promotes them to memory
+    """
+    path = str(tmp_path / "raw.db")
+    await RawResponseCache(path=path).set("amazon", "tv", {"products": [{"asin": "A1"}]})
+
+    restarted = RawResponseCache(path=path)
+    assert await restarted.get("amazon", "tv") == {"products": [{"asin": "A1"}]}
+    assert restarted.stats()["store"]["hits"] == 1
+    assert "raw:amazon:tv" in restarted.cache.local
+
+
+@pytest.mark.asyncio
+async def test_raw_cache_local_copy_capped_at_source_ttl(tmp_path):
+    """
+    RawResponseCache: a payload is kept in memory no longer than its source's TTL, not the longest source's
+    """
+    path = str(tmp_path / "raw.db")
+    await SQLiteBackend(path).set("raw:ebay:phone", compress_payload({"itemSummaries": []}), ttl=3600)
+
+    cache = RawResponseCache(path=path)
+    assert await cache.get("ebay", "phone") == {"itemSummaries": []}
+
+    _, expires_at = cache.cache.local._data["raw:ebay:phone"]
+    assert expires_at - time.monotonic() <= source_ttl("ebay") < 3600
+
+
+@pytest.mark.asyncio
+async def test_raw_cache_respects_source_ttl(monkeypatch):
+    """
+    RawResponseCache: a source TTL of zero means its payloads are never served
+    """
+    monkeypatch.setenv("EBAY_RAW_CACHE_TTL_SECONDS", "0")
+    cache = RawResponseCache(path=":memory:")
+    await cache.set("ebay", "iphone", {"itemSummaries": []})
+
+    assert await cache.get("ebay", "iphone") is None
+
+
+@pytest.mark.asyncio
+async def test_raw_cache_disabled():
+    """
+    RawResponseCache: when disabled nothing is stored
+    """
+    cache = RawResponseCache(path=":memory:", enabled=False)
+    await cache.set("ebay", "iphone", {"itemSummaries": []})
+
+    assert await cache.get("ebay", "iphone") is None
+    assert cache.stats() == {"enabled": False}
@@ -0,0 +1,71 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock
+from backend.utils.search_snapshot import SearchSnapshot, SearchSnapshotCache
+from backend.utils.shared_cache import SQLiteBackend
+
+
+def make_snapshot():
+    return SearchSnapshot.from_rows([
+        (4, Decimal("30.00"), None, "amazon"),
+        (1, Decimal("10.00"), 4.5, "ebay"),
+        (3, None, 3.0, "ebay"),
+        (2, Decimal("10.00"), 4.9, "dummyjson"),
+        (1, Decimal("10.00"), 4.5, "ebay"),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_stores_offers():
+    """
+    SearchSnapshotCache.store_offers: ingested offers become the search's snapshot
+    """
+    cache = SearchSnapshotCache(enabled=True, backend_kind="memory")
+    offers = [MagicMock(id=7, last_price=Decimal("5"), rating=None, source="ebay")]
+
+    await cache.store_offers(11, offers)
+
+    snapshot = await cache.get(11)
+    assert snapshot.select() == [7]
+    assert await cache.get(12) is None
+    assert cache.stats()["built"] == 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_disabled():
+    """
+    SearchSnapshotCache: when disabled nothing is stored and every lookup misses
+    """
+    cache = SearchSnapshotCache(enabled=False)
+
+    assert await cache.store_offers(1, [MagicMock(id=1, last_price=1, rating=1, source="ebay")]) is None
+    assert await cache.get(1) is None
+    assert cache.stats() == {"enabled": False}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_persists_on_sqlite(tmp_path):
+    """
+    SearchSnapshotCache: on the SQLite backend a new cache over the same file finds earlier snapshots
+    """
+    path = str(tmp_path / "snapshots.db")
+    await SearchSnapshotCache(enabled=True, backend=SQLiteBackend(path)).store(3, make_snapshot())
+
+    snapshot = await SearchSnapshotCache(enabled=True, backend=SQLiteBackend(path)).get(3)
+
+    assert snapshot.select({"source": "ebay"}) == [1, 3]
+
+
+def test_snapshot_agrees_with_loaded_offers():
+    """
+    SearchSnapshot.agrees_with: False once a loaded offer's price or rating moved, or an offer is gone
+    """
+    snapshot = make_snapshot()
+    offers = [MagicMock(id=1, last_price=Decimal("10.00"), rating=4.5), MagicMock(id=3, last_price=None, rating=3.0)]
+
+    assert snapshot.agrees_with([1, 3], offers)
+    assert not snapshot.agrees_with([1, 3, 4], offers)
+    offers[0].last_price = Decimal("8.00")
+    assert not snapshot.agrees_with([1, 3], offers)
+    offers[0].last_price, offers[1].rating = Decimal("10.00"), None
+    assert not snapshot.agrees_with([1, 3], offers)
@@ -0,0 +1,420 @@
+import asyncio
+import pickle
+import sqlite3
+import time
+import pytest
+import pytest_asyncio
+from backend.utils.shared_cache import (
+    Cache, CacheBackend, CacheBackendError, MemoryBackend, RedisBackend, RespConnection, SQLiteBackend,
+    dump_value, get_backend, load_value,
+)
+
+
+class FakeRedisServer:
+    """
+    Stand-in for a Redis server - the handful of commands RedisBackend uses, over real RESP
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.channels = {}
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    def reply(value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, str):
+            return b"+%s\r\n" % value.encode()
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(FakeRedisServer.reply(item) for item in value)
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def live(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] <= time.time():
+            del self.data[key]
+            return None
+        return entry
+
+    def command(self, args, writer):
+        name, args = args[0].upper(), args[1:]
+        if name in (b"SELECT", b"AUTH", b"PING"):
+            return "OK"
+        if name == b"GET":
+            entry = self.live(args[0])
+            return entry[0] if entry else None
+        if name == b"SET":
+            key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+            if b"NX" in options and self.live(key):
+                return None
+            ttl_ms = int(options[options.index(b"PX") + 1]) if b"PX" in options else 10 ** 9
+            self.data[key] = (value, time.time() + ttl_ms / 1000)
+            return "OK"
+        if name == b"PTTL":
+            entry = self.live(args[0])
+            return max(0, int((entry[1] - time.time()) * 1000)) if entry else -2
+        if name == b"DEL":
+            return sum(1 for key in args if self.data.pop(key, None) is not None)
+        if name == b"SCAN":
+            prefix = args[2].rstrip(b"*")
+            return [b"0", [key for key in list(self.data) if key.startswith(prefix)]]
+        if name == b"PUBLISH":
+            subscribers = self.channels.get(args[0], [])
+            for subscriber in subscribers:
+                subscriber.write(self.reply([b"message", args[0], args[1]]))
+            return len(subscribers)
+        if name == b"SUBSCRIBE":
+            for index, channel in enumerate(args, 1):
+                self.channels.setdefault(channel, []).append(writer)
+                writer.write(self.reply([b"subscribe", channel, index]))
+            return ...
+        raise ValueError(f"unsupported command {name}")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                result = self.command(args, writer)
+                if result is not ...:
+                    writer.write(self.reply(result))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest_asyncio.fixture
+async def redis_url():
+    server = FakeRedisServer()
+    url = await server.start()
+    yield url
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_cache_memory_backend_namespaces():
+    """
+    Cache: values round-trip, delete/clear only touch their own namespace
+    """
+    backend = MemoryBackend()
+    users, tokens = Cache("user", backend=backend), Cache("token", backend=backend)
+    await users.set(1, {"name": "a"})
+    await users.set(2, {"name": "b"})
+    await tokens.set(1, "payload")
+
+    assert await users.get(1) == {"name": "a"}
+    await users.delete(1)
+    assert await users.get(1) is None
+    await users.clear()
+    assert await users.get(2) is None
+    assert await tokens.get(1) == "payload"
+
+    stats = users.stats()
+    assert stats["backend"] == "memory"
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["local"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_concurrent_misses():
+    """
+    Cache.get_or_set: concurrent misses for one key share a single factory call, ttl may depend on the value
+    """
+    cache = Cache("ebay_token", backend=MemoryBackend())
+    calls = []
+
+    async def fetch_token():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return ("token", 0.05)
+
+    results = await asyncio.gather(*[
+        cache.get_or_set("access_token", fetch_token, ttl=lambda value: value[1]) for _ in range(5)
+    ])
+
+    assert results == [("token", 0.05)] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+    await asyncio.sleep(0.06)
+    await cache.get_or_set("access_token", fetch_token, ttl=lambda value: value[1])
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_failure_is_not_cached():
+    """
+    Cache.get_or_set: a failing factory raises to every waiter and the next call retries
+    """
+    cache = Cache("ebay_token", backend=MemoryBackend())
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(cache.get_or_set("k", failing), cache.get_or_set("k", failing),
+                                   return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def working():
+        return "ok"
+    assert await cache.get_or_set("k", working) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_shared_between_workers(tmp_path):
+    """
+    SQLiteBackend: two workers opening the same file see each other's entries, add is first-writer-wins
+    """
+    path = str(tmp_path / "shared.db")
+    worker_a, worker_b = SQLiteBackend(path), SQLiteBackend(path)
+
+    await worker_a.set("user:1", {"name": "a"}, ttl=60)
+    assert await worker_b.get("user:1") == {"name": "a"}
+
+    assert await worker_a.add("lock", "a", ttl=60) is True
+    assert await worker_b.add("lock", "b", ttl=60) is False
+    await worker_a.delete("lock")
+    assert await worker_b.add("lock", "b", ttl=60) is True
+
+    await worker_b.set("short", 1, ttl=0.01)
+    await asyncio.sleep(0.02)
+    assert await worker_a.get("short") is None
+    assert worker_a.stats()["entries"] == 2
+
+
+class Exploit:
+    """
+    Pickle that runs code when loaded
+    """
+    loaded = []
+
+    def __reduce__(self):
+        return (Exploit.loaded.append, ("ran",))
+
+
+def test_signed_values_round_trip():
+    """
+    dump_value/load_value: values are signed, a blob signed with another key or tampered with is refused
+    """
+    signed = dump_value({"name": "a"}, key="k1")
+
+    assert load_value(signed, key="k1") == {"name": "a"}
+    with pytest.raises(CacheBackendError):
+        load_value(signed, key="k2")
+    with pytest.raises(CacheBackendError):
+        load_value(signed[:32] + pickle.dumps({"name": "b"}), key="k1")
+
+
+@pytest.mark.asyncio
+async def test_sqlite_forged_entry_is_not_unpickled(tmp_path):
+    """
+    SQLiteBackend: an unsigned pickle written straight into the file is never loaded, the cache sees a miss
+    """
+    path = str(tmp_path / "shared.db")
+    backend = SQLiteBackend(path)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                 ("test:forged", pickle.dumps(Exploit()), time.time() + 60))
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(CacheBackendError):
+        await backend.get("test:forged")
+    assert await Cache("test", ttl=60, backend=backend).get("forged") is None
+    assert Exploit.loaded == []
+
+
+def test_cache_backend_is_abstract():
+    """
+    CacheBackend: a backend missing any of the storage methods can't be created
+    """
+    class GetOnly(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        CacheBackend()
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_invalidation_drops_other_workers_local_copy(tmp_path):
+    """
+    Cache: a write in one worker is published, and the other worker's local copy is dropped
+    """
+    path = str(tmp_path / "shared.db")
+    backend_a, backend_b = SQLiteBackend(path), SQLiteBackend(path)
+    cache_a = Cache("user", backend=backend_a, local_ttl=60)
+    cache_b = Cache("user", backend=backend_b, local_ttl=60)
+
+    await cache_a.set(7, "old")
+    assert await cache_b.get(7) == "old"
+    assert "user:7" in cache_b.local
+
+    await cache_a.set(7, "new")
+    assert await cache_b.get(7) == "old"  # local copy, until the invalidation arrives
+
+    await backend_b.poll_events()
+    assert "user:7" not in cache_b.local
+    assert await cache_b.get(7) == "new"
+
+
+@pytest.mark.asyncio
+async def test_local_copy_expires_with_shared_entry(tmp_path):
+    """
+    Cache.get: a local copy of an entry close to expiry in the shared backend expires with it
+    """
+    path = str(tmp_path / "cache.db")
+    backend = SQLiteBackend(path)
+    cache = Cache("raw", ttl=3600, backend=SQLiteBackend(path), local_ttl=3600)
+    # Written by another worker long ago, a moment left
+    await backend.set("raw:ebay:phone", "payload", ttl=0.1)
+
+    assert await cache.get("ebay:phone") == "payload"
+    await asyncio.sleep(0.15)
+
+    assert await cache.get("ebay:phone") is None
+    assert cache.local.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_across_workers(tmp_path):
+    """
+    Cache.get_or_set: with a shared backend only one worker runs the factory, the other waits for its value
+    """
+    path = str(tmp_path / "shared.db")
+    cache_a = Cache("ebay_token", backend=SQLiteBackend(path))
+    cache_b = Cache("ebay_token", backend=SQLiteBackend(path))
+    calls = []
+
+    async def fetch_token():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "token"
+
+    results = await asyncio.gather(cache_a.get_or_set("access_token", fetch_token),
+                                   cache_b.get_or_set("access_token", fetch_token))
+
+    assert results == ["token", "token"]
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_commands(redis_url):
+    """
+    RedisBackend: get/set with TTL, add, delete and prefix clear over the Redis protocol
+    """
+    backend = RedisBackend(redis_url)
+
+    await backend.set("user:1", {"name": "a"}, ttl=60)
+    await backend.set("user:2", {"name": "b"}, ttl=60)
+    await backend.set("token:1", "payload", ttl=60)
+    assert await backend.get("user:1") == {"name": "a"}
+
+    assert await backend.add("lock", "a", ttl=60) is True
+    assert await backend.add("lock", "b", ttl=60) is False
+    await backend.delete("lock")
+    assert await backend.add("lock", "b", ttl=60) is True
+
+    await backend.clear("user:")
+    assert await backend.get("user:2") is None
+    assert await backend.get("token:1") == "payload"
+
+    await backend.set("short", 1, ttl=0.01)
+    await asyncio.sleep(0.02)
+    assert await backend.get("short") is None
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_local_copy_capped_at_remaining_ttl(redis_url):
+    """
+    Cache.get: on Redis the local copy is kept only as long as the entry's remaining PTTL
+    """
+    backend = RedisBackend(redis_url)
+    cache = Cache("raw", ttl=3600, backend=backend, local_ttl=3600)
+    await backend.set("raw:amazon:tv", "payload", ttl=0.1)
+
+    assert await cache.get("amazon:tv") == "payload"
+    await asyncio.sleep(0.15)
+
+    assert await cache.get("amazon:tv") is None
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_pubsub_invalidation(redis_url):
+    """
+    RedisBackend: invalidations published by one worker reach the other's listener
+    """
+    backend_a, backend_b = RedisBackend(redis_url), RedisBackend(redis_url)
+    cache_a = Cache("user", backend=backend_a, local_ttl=60)
+    cache_b = Cache("user", backend=backend_b, local_ttl=60)
+    listener = asyncio.create_task(backend_b.listen())
+    await asyncio.sleep(0.05)
+
+    await cache_a.set(7, "old")
+    assert await cache_b.get(7) == "old"
+    await cache_a.delete(7)
+    await asyncio.sleep(0.05)
+
+    assert "user:7" not in cache_b.local
+    assert await cache_b.get(7) is None
+
+    listener.cancel()
+    await asyncio.gather(listener, return_exceptions=True)
+    await backend_a.close()
+    await backend_b.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_survives_unreachable_backend():
+    """
+    Cache: a backend that can't be reached counts errors, misses fall through and local copies still serve
+    """
+    cache = Cache("user", backend=RedisBackend("redis://127.0.0.1:1/0"))
+
+    await cache.set(1, "value")
+    assert await cache.get(1) == "value"
+    assert await cache.get(2) is None
+    assert cache.stats()["errors"] >= 2
+
+
+def test_resp_encoding():
+    """
+    RespConnection.encode: commands are arrays of bulk strings
+    """
+    assert RespConnection.encode("SET", "k", b"v", 5) == b"*4\r\n$3\r\nSET\r\n$1\r\nk\r\n$1\r\nv\r\n$1\r\n5\r\n"
+
+
+def test_get_backend_kinds(tmp_path):
+    """
+    get_backend: memory backends are private, sqlite ones are shared per file, unknown kinds are rejected
+    """
+    assert get_backend("memory") is not get_backend("memory")
+    path = str(tmp_path / "shared.db")
+    assert get_backend("sqlite", sqlite_path=path) is get_backend("sqlite", sqlite_path=path)
+    with pytest.raises(ValueError):
+        get_backend("memcached")
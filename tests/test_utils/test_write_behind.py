@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+
+from backend.utils.write_behind import WriteBehindQueue, write_behind_enabled
+
+
+class FakeSession:
+    """
+    Session stand-in recording which writes each transaction committed
+    """
+    transactions = []
+
+    def __init__(self):
+        self.writes = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def commit(self):
+        FakeSession.transactions.append(list(self.writes))
+
+
+def writer(name, delay: float = 0, fail: bool = False):
+    async def write(session):
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} failed")
+        session.writes.append(name)
+    return write
+
+
+@pytest.fixture(autouse=True)
+def reset_transactions():
+    FakeSession.transactions = []
+
+
+@pytest.mark.asyncio
+async def test_staged_writes_share_a_transaction():
+    """
+    WriteBehindQueue: writes staged while the writer is busy are committed together, up to max_batch
+    """
+    queue = WriteBehindQueue(FakeSession, maxsize=10, max_batch=3)
+    for index in range(5):
+        await queue.stage(index, writer(index))
+    await queue.close()
+
+    assert FakeSession.transactions == [[0, 1, 2], [3, 4]]
+    assert queue.stats()["transactions"] == 2
+    assert queue.stats()["written"] == 5
+    assert queue.stats()["largest_batch"] == 3
+    assert queue.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_isolated():
+    """
+    WriteBehindQueue: a failing write is retried alone and dropped, the rest of its batch is committed
+    """
+    queue = WriteBehindQueue(FakeSession, maxsize=10, max_batch=10)
+    await queue.stage("a", writer("a"))
+    bad = await queue.stage("b", writer("b", fail=True))
+    await queue.stage("c", writer("c"))
+    await queue.close()
+
+    assert FakeSession.transactions == [["a"], ["c"]]
+    assert isinstance(bad.error, RuntimeError)
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["written"] == 2
+
+
+@pytest.mark.asyncio
+async def test_wait_for_key_and_tag():
+    """
+    WriteBehindQueue.wait_for: readers wait for the staged writes of their key or tag, or give up at the timeout
+    """
+    queue = WriteBehindQueue(FakeSession, maxsize=10, max_batch=1)
+    await queue.stage(1, writer(1, delay=0.05), tags=("lamp",))
+    await queue.stage(2, writer(2, delay=0.05), tags=("desk",))
+
+    assert await queue.wait_for(key=1) is True
+    assert [1] in FakeSession.transactions
+    assert await queue.wait_for(tag="desk") is True
+    assert [2] in FakeSession.transactions
+    assert await queue.wait_for(key=99) is True  # nothing staged
+
+    await queue.stage(3, writer(3, delay=0.2))
+    assert await queue.wait_for(key=3, timeout=0.01) is False
+    assert queue.stats()["read_timeouts"] == 1
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure():
+    """
+    WriteBehindQueue.stage: with the queue full, staging waits for the writer to take a batch
+    """
+    queue = WriteBehindQueue(FakeSession, maxsize=1, max_batch=1)
+    await queue.stage(1, writer(1, delay=0.1))
+    await asyncio.sleep(0)  # the writer takes 1 and starts writing
+    await queue.stage(2, writer(2))
+
+    third = asyncio.create_task(queue.stage(3, writer(3)))
+    await asyncio.sleep(0.02)
+    assert not third.done()
+
+    await third
+    await queue.close()
+    assert FakeSession.transactions == [[1], [2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_staged_writes():
+    """
+    WriteBehindQueue.close: everything staged is written before the writer stops
+    """
+    queue = WriteBehindQueue(FakeSession, maxsize=10, max_batch=10)
+    for index in range(3):
+        await queue.stage(index, writer(index, delay=0.01))
+
+    await queue.close()
+
+    assert FakeSession.transactions == [[0, 1, 2]]
+    assert queue._writer is None
+
+
+def test_write_behind_needs_a_single_worker():
+    """
+    write_behind_enabled: refused beside a shared cache backend, since wait_for only sees its own process
+    """
+    assert write_behind_enabled(True, "memory") is True
+    assert write_behind_enabled(True, "redis") is False
+    assert write_behind_enabled(True, "sqlite") is False
+    assert write_behind_enabled(False, "memory") is False